@@ -1,56 +1,28 @@
 # app.py
 import streamlit as st
 import tempfile,os,shutil
-import logging
 
-from seating_allocator import SeatingAllocator
+from logging_setup import setup_logging, close_logger
 
-def setup_logging(logfile='seating.log'):
-    logger = logging.getLogger('seating')
+# attendance PDF layout -> generate_attendance_pdfs(booklet=...)
+PDF_LAYOUTS = {
+    "One PDF per room and subject": None,
+    "One booklet per slot": "slot",
+    "One booklet per building per slot": "building",
+}
 
-    # Prevent multiple handlers when Streamlit reloads
-    if getattr(logger, "_is_configured", False):
-        return logger
+# room packing -> SeatingAllocator(packing=...)
+PACKING = {
+    "Largest free room first": "greedy",
+    "Fewest rooms (optimized)": "optimize",
+}
 
-    logger.setLevel(logging.DEBUG)
+def run_allocation(uploaded_file, buffer, density, booklet=None, packing="greedy", memory_budget_mb=None,
+                   seat_layout=False, profile=False):
+    # Streamlit re-runs this script on every interaction; the pipeline (pandas,
+    # ReportLab, ...) is only imported once a schedule is actually generated
+    from seating_allocator import SeatingAllocator
 
-    fmt = logging.Formatter('%(asctime)s | %(levelname)s | %(message)s')
-
-    # 1) Main log file (INFO + ERROR + DEBUG)
-    fh = logging.FileHandler(logfile, mode='w')
-    fh.setLevel(logging.DEBUG)
-    fh.setFormatter(fmt)
-    logger.addHandler(fh)
-
-    # 2) Console output (only for display in Streamlit terminal)
-    ch = logging.StreamHandler()
-    ch.setLevel(logging.INFO)
-    ch.setFormatter(fmt)
-    logger.addHandler(ch)
-
-    # Mark as configured to avoid re-attaching handlers
-    logger._is_configured = True
-
-    return logger
-
-def close_logger(logger):
-    """Release file handles so TemporaryDirectory can clean up on Windows."""
-    if logger is None:
-        return
-    # Copy the list so we can modify logger.handlers while iterating
-    for h in list(logger.handlers):
-        try:
-            h.flush()
-        except Exception:
-            pass
-        try:
-            h.close()
-        except Exception:
-            pass
-        logger.removeHandler(h)
-
-
-def run_allocation(uploaded_file, buffer, density):
     # This temp dir (and everything inside) will be deleted automatically
     with tempfile.TemporaryDirectory() as tmpdir:
         # Save uploaded Excel to a temp path
@@ -67,64 +39,115 @@ def run_allocation(uploaded_file, buffer, density):
             logfile=os.path.join(outdir, "seating.log"),
         )
 
-        # Run allocation pipeline
-        alloc = SeatingAllocator(
-            input_file=excel_path,
-            buffer=buffer,
-            density=density,
-            outdir=outdir,
-            logger=logger,
-        )
-        with st.spinner("Reading excel sheet...", show_time=True):
-            alloc.load_inputs()
-        st.success("Done: Reading excel sheet...")
-        with st.spinner("Allocation in progress...", show_time=True):
-            alloc.allocate_all_days()
-        st.success("Done: Allocation in progress...")
-        with st.spinner("Saving outputs...", show_time=True):
-            alloc.write_outputs()
-        st.success("Done: Saving outputs...")
-
-        # Generate attendance PDFs
-        photos_dir = "photos"  # keep this dir next to the app
-        no_image_icon = os.path.join(photos_dir, "no_image_available.jpg")
-        alloc.generate_attendance_pdfs(photos_dir, no_image_icon)
-
-        # Zip the entire output folder
-        zip_base = os.path.join(tmpdir, "output")
-        with st.spinner("Compressing output to zip..", show_time=True):
-            shutil.make_archive(zip_base, "zip", outdir)
-        zip_path = zip_base + ".zip"
-
-        # Read the zip into memory BEFORE TemporaryDirectory is cleaned up
-        with open(zip_path, "rb") as f:
-            zip_bytes = f.read()
-
-        # Very important on Windows: release seating.log
-        close_logger(logger)
-
-        # Return bytes, not a path inside the soon-to-be-deleted temp dir
+        try:
+            # optional sampling profile of the whole run (profile.collapsed ends up in the zip);
+            # profiled() stops the sampler and writes the file even when a step fails
+            from profiler import PROFILE_FILE, profiled
+            profile_path = os.path.join(outdir, PROFILE_FILE) if profile else None
+            try:
+                with profiled(profile_path, logger) as sampler:
+                    # Run allocation pipeline
+                    alloc = SeatingAllocator(
+                        input_file=excel_path,
+                        buffer=buffer,
+                        density=density,
+                        outdir=outdir,
+                        logger=logger,
+                        packing=packing,
+                        memory_budget_mb=memory_budget_mb,
+                        archive=True,
+                        seat_layout=seat_layout,
+                    )
+                    with st.spinner("Reading excel sheet...", show_time=True):
+                        alloc.load_inputs()
+                    st.success("Done: Reading excel sheet...")
+                    if alloc.memory_plan is not None:
+                        st.info("\n\n".join(alloc.memory_plan.summary()))
+                    with st.spinner("Allocation in progress...", show_time=True):
+                        alloc.allocate_all_days()
+                    st.success("Done: Allocation in progress...")
+                    with st.spinner("Saving outputs...", show_time=True):
+                        alloc.write_outputs()
+                    st.success("Done: Saving outputs...")
+
+                    # Generate attendance PDFs
+                    photos_dir = "photos"  # keep this dir next to the app
+                    no_image_icon = os.path.join(photos_dir, "no_image_available.jpg")
+                    # a packed photos.bundle (python photo_bundle.py photos photos.bundle) is preferred if present
+                    photo_bundle = "photos.bundle" if os.path.exists("photos.bundle") else None
+                    alloc.generate_attendance_pdfs(photos_dir, no_image_icon, booklet=booklet, photo_bundle=photo_bundle)
+            except Exception:
+                if profile_path and os.path.exists(profile_path):
+                    # keep the partial profile: the temp dir is removed when the error propagates
+                    with open(profile_path, "rb") as f:
+                        st.session_state["failed_profile"] = f.read()
+                raise
+            if sampler is not None:
+                st.info(f"Profile: {sampler.summary()} ({PROFILE_FILE} in the zip)")
+
+            # Zip the entire output folder
+            zip_base = os.path.join(tmpdir, "output")
+            with st.spinner("Compressing output to zip..", show_time=True):
+                if alloc.memory_plan is not None and alloc.memory_plan.enabled["disk_archive"]:
+                    # memory budget: the zip stays on disk, outside the temp dir, and
+                    # offer_download() reads it through a file and deletes it afterwards
+                    from memory_budget import disk_archive
+                    zip_bytes = disk_archive(outdir)
+                else:
+                    shutil.make_archive(zip_base, "zip", outdir)
+                    # Read the zip into memory BEFORE TemporaryDirectory is cleaned up
+                    with open(zip_base + ".zip", "rb") as f:
+                        zip_bytes = f.read()
+        finally:
+            # Very important on Windows: release seating.log. Also on failure, or the
+            # listener keeps running and the next run reuses this run's stale logger
+            close_logger(logger)
+
+        # Return bytes (or a zip outside the temp dir), not a path inside the soon-to-be-deleted temp dir
         return zip_bytes
 
 
+def offer_download(zip_data):
+    """Download button for run_allocation's result: zip bytes, or the path of a zip on
+       disk (memory budget), passed as an open file and deleted once the button has it.
+    """
+    if isinstance(zip_data, bytes):
+        st.download_button("Download schedule", data=zip_data, file_name="schedule.zip",
+                           mime="application/zip")
+        return
+    try:
+        with open(zip_data, "rb") as f:
+            st.download_button("Download schedule", data=f, file_name="schedule.zip",
+                               mime="application/zip")
+    finally:
+        os.remove(zip_data)
+
+
 st.title("Exam scheduler")
 
 uploaded = st.file_uploader("Upload input Excel file", type=["xlsx"])
 buffer = st.number_input("Buffer seats per room", 0, 50, 0)
 density = st.radio("Seating density", ["Dense", "Sparse"])
+pdf_layout = st.selectbox("Attendance PDFs", list(PDF_LAYOUTS))
+packing = st.selectbox("Room packing", list(PACKING))
+seat_layout = st.checkbox("Seat numbers (interleave subjects inside rooms)")
+memory_budget = st.number_input("Memory budget in MB (0 = no limit)", 0, 65536, 0, step=256)
+profile = st.checkbox("Profile this run (profile.collapsed in the zip, for flame graphs)")
 
 if st.button("Generate schedule") and uploaded:
     with st.spinner("Generating schedule..."):
         try:
-            zip_bytes = run_allocation(uploaded, buffer, density)
-            st.download_button(
-                "Download schedule",
-                data=zip_bytes,
-                file_name="schedule.zip",
-                mime="application/zip",
-            )
+            zip_bytes = run_allocation(uploaded, buffer, density, booklet=PDF_LAYOUTS[pdf_layout],
+                                       packing=PACKING[packing],
+                                       memory_budget_mb=memory_budget or None,
+                                       seat_layout=seat_layout, profile=profile)
+            offer_download(zip_bytes)
         except Exception as e:
             st.error(f"Error: {e}")
+            if "failed_profile" in st.session_state:
+                st.download_button("Download profile of the failed run",
+                                   data=st.session_state.pop("failed_profile"),
+                                   file_name="profile.collapsed", mime="text/plain")
 else:
     if not uploaded:
         st.warning("Please upload an Excel file.")
\ No newline at end of file
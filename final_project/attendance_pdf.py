@@ -2,16 +2,22 @@
 import os
 from reportlab.lib.pagesizes import A4
 from reportlab.platypus import (
-    SimpleDocTemplate, Table, TableStyle, Image, Paragraph, Spacer
+    SimpleDocTemplate, Table, TableStyle, Image, Paragraph, Spacer, PageBreak, Flowable
 )
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
 
+from photo_bundle import photo_index
 
-def _make_card(roll, name, photo_path, no_image_path, styles):
+
+def _make_card(roll, name, photo_path, no_image_path, styles, seat=None):
     """Return a small table: [photo | text block] for one student."""
-    # Try to load the student's photo, else "no image" placeholder
-    img_path = photo_path if (photo_path and os.path.exists(photo_path)) else no_image_path
+    # Try to load the student's photo (a path or a file object from a photo bundle),
+    # else "no image" placeholder
+    if photo_path is not None and not isinstance(photo_path, str):
+        img_path = photo_path
+    else:
+        img_path = photo_path if (photo_path and os.path.exists(photo_path)) else no_image_path
     try:
         img = Image(img_path, width=40, height=40)
     except Exception:
@@ -22,7 +28,8 @@ def _make_card(roll, name, photo_path, no_image_path, styles):
     name_txt = name if name else "(name not found)"
     name_para = Paragraph(name_txt, styles["Normal"])
 
-    roll_para = Paragraph(f"Roll: {roll}", styles["Normal"])
+    roll_txt = f"Roll: {roll} | Seat: {seat}" if seat else f"Roll: {roll}"
+    roll_para = Paragraph(roll_txt, styles["Normal"])
     sign_para = Paragraph("Sign:__________________", styles["Normal"])
 
     text_flow = [name_para, roll_para, sign_para]
@@ -36,6 +43,116 @@ def _make_card(roll, name, photo_path, no_image_path, styles):
     return card_table
 
 
+def attendance_story(
+    date_str,
+    shift,
+    room_no,
+    subject_code,
+    subject_name,
+    roll_list,
+    roll_to_name,
+    photos_dir,
+    no_image_icon,
+    styles,
+    photo_bundle=None,
+    seats=None,
+):
+    """Flowables of one attendance sheet (header, photo cards, invigilator table).
+       Photos come from photo_bundle (a photo_bundle.PhotoBundle) when given, else photos_dir.
+       seats: optional roll -> seat label (seat_layout.py), shown on each card.
+    """
+    story = []
+
+    # ----- Header -----
+    title = Paragraph("IITP Attendance System", styles["Title"])
+    story.append(title)
+    story.append(Spacer(1, 6))
+
+    # First info line
+    student_count = len(roll_list)
+    info1 = (
+        f"Date: {date_str} | Shift: {shift} | "
+        f"Room No: {room_no} | Student count: {student_count}"
+    )
+    story.append(Paragraph(info1, styles["Normal"]))
+    story.append(Spacer(1, 4))
+
+    # Second info line
+    subj_line = f"Subject: {subject_name} ( {subject_code} ) | Stud Present: | Stud Absent:"
+    story.append(Paragraph(subj_line, styles["Normal"]))
+    story.append(Spacer(1, 10))
+
+    # ----- Cards grid -----
+    # Create per-student cards
+    cards = []
+
+    photos = photo_index(photos_dir) if photo_bundle is None else None
+
+    def find_photo_path(roll_str: str):
+        """
+        Photo for this roll if found: path (first of .jpg/.jpeg/.png) or a file
+        object over the bundle, else None (so _make_card will use no_image_icon).
+        """
+        if photo_bundle is not None:
+            return photo_bundle.open(roll_str.strip())
+        return photos.get(roll_str.strip())
+
+    for roll in roll_list:
+        roll_str = str(roll).strip()
+        name = roll_to_name.get(roll_str, "(name not found)")
+        photo_path = find_photo_path(roll_str)  # may be None
+        seat = seats.get(roll_str) if seats else None
+        card = _make_card(roll_str, name, photo_path, no_image_icon, styles, seat=seat)
+        cards.append(card)
+
+
+    # Lay them out 3 per row (like sample)
+    ncols = 3
+    rows = []
+    row = []
+    for card in cards:
+        row.append(card)
+        if len(row) == ncols:
+            rows.append(row)
+            row = []
+    if row:
+        # Pad last row with empty cells
+        while len(row) < ncols:
+            row.append(Spacer(1, 60))
+        rows.append(row)
+
+    table = Table(rows, colWidths=[170, 170, 170])
+    table.setStyle(TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("BOX", (0, 0), (-1, -1), 1, colors.black),
+        ("INNERGRID", (0, 0), (-1, -1), 1, colors.black),
+    ]))
+
+    story.append(table)
+    story.append(Spacer(1, 20))
+
+    # Invigilator section
+    story.append(Paragraph("Invigilator Name & Signature", styles["Normal"]))
+    story.append(Spacer(1, 4))
+
+    inv_table = Table(
+        [["Sl No.", "Name", "Signature"]] + [[""] * 3 for _ in range(5)],
+        colWidths=[50, 200, 150]
+    )
+    inv_table.setStyle(TableStyle([
+        ("BOX", (0, 0), (-1, -1), 1, colors.black),
+        ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.black),
+    ]))
+    story.append(inv_table)
+    return story
+
+
+def _document(out_path):
+    os.makedirs(os.path.dirname(out_path), exist_ok=True)
+    return SimpleDocTemplate(out_path, pagesize=A4,
+                             leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=40)
+
+
 def build_attendance_pdf(
     out_path,
     date_str,
@@ -48,6 +165,8 @@ def build_attendance_pdf(
     photos_dir,
     no_image_icon,
     logger=None,
+    photo_bundle=None,
+    seats=None,
 ):
     """
     Build a single attendance PDF at `out_path`.
@@ -60,105 +179,87 @@ def build_attendance_pdf(
     - roll_to_name: dict roll->name
     - photos_dir: folder containing ROLL.jpg
     - no_image_icon: path to 'no image available' PNG/JPG
+    - photo_bundle: optional PhotoBundle used instead of photos_dir
+    - seats: optional dict roll->seat label printed on the cards
     """
 
     try:
-        os.makedirs(os.path.dirname(out_path), exist_ok=True)
-
-        doc = SimpleDocTemplate(out_path, pagesize=A4,
-                                leftMargin=30, rightMargin=30, topMargin=30, bottomMargin=40)
+        doc = _document(out_path)
         styles = getSampleStyleSheet()
-        story = []
+        story = attendance_story(date_str, shift, room_no, subject_code, subject_name,
+                                 roll_list, roll_to_name, photos_dir, no_image_icon, styles,
+                                 photo_bundle=photo_bundle, seats=seats)
+        doc.build(story)
+        if logger:
+            logger.debug("Created attendance PDF: %s", out_path)
+
+    except Exception as e:
+        if logger:
+            logger.exception("Failed to build attendance PDF %s: %s", out_path, e)
+        else:
+            print(f"Error creating PDF {out_path}: {e}")
+        # Let caller decide whether to continue or not
+        raise
 
-        # ----- Header -----
-        title = Paragraph("IITP Attendance System", styles["Title"])
-        story.append(title)
-        story.append(Spacer(1, 6))
-
-        # First info line
-        student_count = len(roll_list)
-        info1 = (
-            f"Date: {date_str} | Shift: {shift} | "
-            f"Room No: {room_no} | Student count: {student_count}"
-        )
-        story.append(Paragraph(info1, styles["Normal"]))
-        story.append(Spacer(1, 4))
-
-        # Second info line
-        subj_line = f"Subject: {subject_name} ( {subject_code} ) | Stud Present: | Stud Absent:"
-        story.append(Paragraph(subj_line, styles["Normal"]))
-        story.append(Spacer(1, 10))
-
-        # ----- Cards grid -----
-        # Create per-student cards
-        cards = []
-
-        def find_photo_path(roll_str: str) -> str | None:
-            """
-            Try common extensions for this roll; return path if found,
-            else None (so _make_card will use no_image_icon).
-            """
-            roll_str = roll_str.strip()
-            for ext in (".jpg", ".jpeg", ".png"):
-                candidate = os.path.join(photos_dir, roll_str + ext)
-                if os.path.exists(candidate):
-                    return candidate
-            return None
-
-        for roll in roll_list:
-            roll_str = str(roll).strip()
-            name = roll_to_name.get(roll_str, "(name not found)")
-            photo_path = find_photo_path(roll_str)  # may be None
-            card = _make_card(roll_str, name, photo_path, no_image_icon, styles)
-            cards.append(card)
-
-
-        # Lay them out 3 per row (like sample)
-        ncols = 3
-        rows = []
-        row = []
-        for card in cards:
-            row.append(card)
-            if len(row) == ncols:
-                rows.append(row)
-                row = []
-        if row:
-            # Pad last row with empty cells
-            while len(row) < ncols:
-                row.append(Spacer(1, 60))
-            rows.append(row)
 
-        table = Table(rows, colWidths=[170, 170, 170])
-        table.setStyle(TableStyle([
-            ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ("BOX", (0, 0), (-1, -1), 1, colors.black),
-            ("INNERGRID", (0, 0), (-1, -1), 1, colors.black),
-        ]))
-
-        story.append(table)
-        story.append(Spacer(1, 20))
-
-        # Invigilator section
-        story.append(Paragraph("Invigilator Name & Signature", styles["Normal"]))
-        story.append(Spacer(1, 4))
-
-        inv_table = Table(
-            [["Sl No.", "Name", "Signature"]] + [[""] * 3 for _ in range(5)],
-            colWidths=[50, 200, 150]
-        )
-        inv_table.setStyle(TableStyle([
-            ("BOX", (0, 0), (-1, -1), 1, colors.black),
-            ("INNERGRID", (0, 0), (-1, -1), 0.5, colors.black),
-        ]))
-        story.append(inv_table)
+class _Bookmark(Flowable):
+    """Zero-size flowable that adds a PDF outline entry for the page it lands on."""
 
+    def __init__(self, key, title, level):
+        super().__init__()
+        self.key = key
+        self.title = title
+        self.level = level
+        self.width = self.height = 0
+
+    def draw(self):
+        self.canv.bookmarkPage(self.key)
+        self.canv.addOutlineEntry(self.title, self.key, level=self.level, closed=self.level > 0)
+
+
+def build_attendance_booklet(
+    out_path,
+    sheets,
+    roll_to_name,
+    photos_dir,
+    no_image_icon,
+    logger=None,
+    photo_bundle=None,
+):
+    """
+    Build one PDF holding many attendance sheets (e.g. every room of a slot).
+    - sheets: list of dicts with the build_attendance_pdf arguments
+      date_str, shift, room_no, subject_code, subject_name, roll_list
+      (and optionally seats: roll -> seat label)
+    Every sheet starts on a new page; the outline has one entry per room with its
+    subjects below. ReportLab embeds each distinct image once per document, so the
+    placeholder and repeated photos are shared by all sheets of the booklet.
+    """
+    try:
+        doc = _document(out_path)
+        styles = getSampleStyleSheet()
+        story = []
+        last_room = None
+        for i, sheet in enumerate(sheets):
+            if i:
+                story.append(PageBreak())
+            room = sheet["room_no"]
+            if room != last_room:
+                story.append(_Bookmark(f"room{i}", f"Room {room}", 0))
+                last_room = room
+            story.append(_Bookmark(f"sheet{i}", f"{sheet['subject_code']} ({len(sheet['roll_list'])} students)", 1))
+            story.extend(attendance_story(
+                sheet["date_str"], sheet["shift"], room, sheet["subject_code"], sheet["subject_name"],
+                sheet["roll_list"], roll_to_name, photos_dir, no_image_icon, styles,
+                photo_bundle=photo_bundle, seats=sheet.get("seats"),
+            ))
         doc.build(story)
         if logger:
-            logger.info("Created attendance PDF: %s", out_path)
+            logger.debug("Created attendance booklet: %s (%d sheets)", out_path, len(sheets))
 
     except Exception as e:
         if logger:
-            logger.exception("Failed to build attendance PDF %s: %s", out_path, e)
+            logger.exception("Failed to build attendance booklet %s: %s", out_path, e)
         else:
             print(f"Error creating PDF {out_path}: {e}")
         # Let caller decide whether to continue or not
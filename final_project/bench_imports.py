@@ -0,0 +1,75 @@
+#import-time benchmark: how long a cold interpreter needs to load each module
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# modules a fresh process loads for each entry point / phase
+TARGETS = [
+    "seating_allocator",
+    "seating_arrangement",
+    "seat_index",
+    "attendance_pdf",
+    "roster",
+    "photo_bundle",
+    "room_packing",
+    "sharding",
+    "memory_budget",
+    "seat_layout",
+    "exam_load",
+    "shared_data",
+    "slotting",
+    "profiler",
+]
+
+# heavy dependencies that should only appear once their phase runs
+HEAVY = ["reportlab", "xlsxwriter", "openpyxl", "streamlit", "scipy"]
+
+PROBE = """
+import sys, time
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+
+def measure(module, repeat=5):
+    """Median import time (ms) of `module` in fresh interpreters + heavy deps it pulled in."""
+    times = []
+    heavy = ""
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=HERE, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        times.append(float(out[0]) * 1000)
+        heavy = out[1] if len(out) > 1 else ""
+    return {"module": module, "median_ms": round(statistics.median(times), 1),
+            "heavy_deps_loaded": heavy.split(",") if heavy else []}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold import time of the seating modules.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="exit with 1 if seating_allocator takes longer than this")
+    args = parser.parse_args(argv)
+
+    results = [measure(m, args.repeat) for m in TARGETS]
+    for r in results:
+        print(f"{r['module']:<22} {r['median_ms']:>8.1f} ms   heavy: {', '.join(r['heavy_deps_loaded']) or '-'}")
+    print(json.dumps(results))
+
+    if args.max_ms is not None and results[0]["median_ms"] > args.max_ms:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
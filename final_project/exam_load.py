@@ -0,0 +1,269 @@
+#file with the student exam-load analytics (same slot, same day, back-to-back, busy windows)
+# One sparse student x slot incidence matrix is built from the loaded SeatingAllocator data
+# (student x course enrolments times course x slot timetable); every metric is a few sparse
+# products / comparisons on it instead of a loop over subject_rolls per timetable entry.
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SLOTS = ("Morning", "Evening")  # slot column = 2 * day offset + slot position
+
+
+def _day_offsets(timetable):
+    """Calendar day offset of every timetable row (row position if dates do not parse)."""
+    dates = pd.to_datetime(pd.Series([str(e['Date']).split()[0] for e in timetable]), errors='coerce')
+    if len(dates) and dates.notna().all():
+        return (dates - dates.min()).dt.days.to_numpy(), dates.dt.strftime('%Y-%m-%d').tolist()
+    return np.arange(len(timetable)), [str(e['Date']).split()[0] for e in timetable]
+
+
+class ExamLoad:
+    """Exam-load metrics per student (arrays aligned with `rolls`) plus the slot calendar."""
+
+    def __init__(self, rolls, names, incidence, day_labels, window_days, max_exams):
+        self.rolls = rolls
+        self.names = names
+        self.incidence = incidence  # CSR students x slot columns, exams per slot
+        self.day_labels = day_labels  # day offset -> 'YYYY-MM-DD' (None for gap days)
+        self.window_days = window_days
+        self.max_exams = max_exams
+        self._compute()
+
+    def _compute(self):
+        m = self.incidence
+        n_cols = m.shape[1]
+        n_days = n_cols // len(SLOTS)
+        taken = (m > 0).astype(np.int32)
+
+        # slot columns -> days, and -> the next slot column (evening follows morning,
+        # next morning follows evening)
+        to_day = sparse.csr_matrix((np.ones(n_cols, dtype=np.int32),
+                                    (np.arange(n_cols), np.arange(n_cols) // len(SLOTS))), shape=(n_cols, n_days))
+        shift = sparse.eye(n_cols, k=1, dtype=np.int32, format='csr')
+        per_day = (m @ to_day).tocsr()  # exams per student and day
+
+        starts = max(1, n_days - self.window_days + 1)
+        rows = np.concatenate([np.arange(s, min(s + self.window_days, n_days)) for s in range(starts)])
+        cols = np.concatenate([np.full(min(self.window_days, n_days - s), s) for s in range(starts)])
+        window = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n_days, starts))
+        per_window = (per_day @ window).tocsr()  # exams per student in each rolling window
+
+        self.exams = np.asarray(m.sum(axis=1)).ravel()
+        self.same_slot = np.asarray((m > 1).sum(axis=1)).ravel()
+        self.same_day = np.asarray((per_day > 1).sum(axis=1)).ravel()
+        self.back_to_back = np.asarray(taken.multiply(taken @ shift).sum(axis=1)).ravel()
+        self.window_max = per_window.max(axis=1).toarray().ravel()
+        self.window_start = np.asarray(per_window.argmax(axis=1)).ravel()
+        self.per_day = per_day
+        self.per_slot = np.asarray(taken.sum(axis=0)).ravel()
+        self.clash_per_slot = np.asarray((m > 1).sum(axis=0)).ravel()
+
+    # -----------------------------------------------------------------
+    def exceptions(self):
+        """One row per student with at least one exception, worst first."""
+        over = self.window_max > self.max_exams
+        flagged = np.flatnonzero((self.same_slot > 0) | (self.same_day > 0) | (self.back_to_back > 0) | over)
+
+        # dates with 2+ exams, joined per student
+        busy = self.per_day[flagged]
+        busy.data = (busy.data > 1).astype(busy.data.dtype)
+        busy.eliminate_zeros()
+        labels = np.asarray(self.day_labels, dtype=object)
+        busy_dates = [", ".join(labels[busy.indices[a:b]]) for a, b in zip(busy.indptr[:-1], busy.indptr[1:])]
+
+        df = pd.DataFrame({
+            "Roll": self.rolls[flagged],
+            "Name": self.names[flagged] if self.names is not None else "",
+            "Exams": self.exams[flagged],
+            "Same-slot clashes": self.same_slot[flagged],
+            "Days with 2+ exams": self.same_day[flagged],
+            "Dates with 2+ exams": busy_dates,
+            "Back-to-back slots": self.back_to_back[flagged],
+            f"Max exams in {self.window_days} days": self.window_max[flagged],
+            "Busiest window from": [self.day_labels[s] for s in self.window_start[flagged]],
+            f"Over {self.max_exams} in window": over[flagged],
+        })
+        return df.sort_values(["Same-slot clashes", "Days with 2+ exams", "Back-to-back slots",
+                               f"Max exams in {self.window_days} days"], ascending=False, kind="stable")
+
+    def summary(self):
+        """Counts of students per exception type."""
+        return pd.DataFrame({
+            "Metric": ["Students with exams", "Same-slot clash", "Two or more exams on one day",
+                       "Back-to-back slots", f"More than {self.max_exams} exams in {self.window_days} days"],
+            "Students": [int((self.exams > 0).sum()), int((self.same_slot > 0).sum()),
+                         int((self.same_day > 0).sum()), int((self.back_to_back > 0).sum()),
+                         int((self.window_max > self.max_exams).sum())],
+        })
+
+    def distributions(self):
+        """Distribution tables: exams per student, busiest window, and load per slot."""
+        active = self.exams > 0
+
+        def counts(values, label):
+            vc = pd.Series(values[active]).value_counts().sort_index()
+            return pd.DataFrame({label: vc.index, "Students": vc.to_numpy()})
+
+        cols = np.flatnonzero(self.per_slot)
+        slot_load = pd.DataFrame({
+            "Date": [self.day_labels[c // len(SLOTS)] for c in cols],
+            "Slot": [SLOTS[c % len(SLOTS)] for c in cols],
+            "Students": self.per_slot[cols],
+            "Students with a clash": self.clash_per_slot[cols],
+        })
+        return {
+            "Exams per student": counts(self.exams, "Exams"),
+            "Busiest window": counts(self.window_max, f"Exams in {self.window_days} days"),
+            "Back-to-back": counts(self.back_to_back, "Back-to-back slots"),
+            "Slot load": slot_load,
+        }
+
+    def write(self, path):
+        """Excel report: Summary, Exceptions and one sheet per distribution."""
+        with pd.ExcelWriter(path, engine="xlsxwriter") as writer:
+            self.summary().to_excel(writer, sheet_name="Summary", index=False)
+            self.exceptions().to_excel(writer, sheet_name="Exceptions", index=False)
+            for name, df in self.distributions().items():
+                df.to_excel(writer, sheet_name=name, index=False)
+
+
+def analyze(alloc, window_days=3, max_exams=2):
+    """Exam-load metrics for a SeatingAllocator after load_inputs().
+       window_days / max_exams: flag students with more than max_exams exams in any
+       window_days consecutive calendar days.
+    """
+    offsets, labels = _day_offsets(alloc.timetable)
+    n_days = int(offsets.max()) + 1 if len(offsets) else 1
+    day_labels = [None] * n_days
+    for off, label in zip(offsets, labels):
+        day_labels[off] = label
+
+    # course x slot column from the timetable
+    courses = {c: i for i, c in enumerate(alloc.subject_rolls)}
+    t_rows, t_cols = [], []
+    for entry, off in zip(alloc.timetable, offsets):
+        for pos, slot in enumerate(SLOTS):
+            for subj in entry[slot]:
+                subj = str(subj).strip()
+                if subj in courses:
+                    t_rows.append(courses[subj])
+                    t_cols.append(len(SLOTS) * off + pos)
+    n_cols = len(SLOTS) * n_days
+    course_slot = sparse.csr_matrix((np.ones(len(t_rows), dtype=np.int32), (t_rows, t_cols)),
+                                    shape=(len(courses), n_cols))
+
+    # student x course enrolment (roster row ids), duplicate enrolments counted once
+    lengths = np.fromiter((len(r) for r in alloc.subject_rolls.values()), dtype=np.int64, count=len(courses))
+    all_rolls = [roll for rolls in alloc.subject_rolls.values() for roll in rolls]
+    ids = alloc.roster.ids(all_rolls) if all_rolls else np.empty(0, dtype=np.int64)
+    course_ids = np.repeat(np.arange(len(courses)), lengths)
+    known = ids >= 0
+    enrol = sparse.csr_matrix((np.ones(int(known.sum()), dtype=np.int32), (ids[known], course_ids[known])),
+                              shape=(len(alloc.roster), len(courses)))
+    enrol.data[:] = 1  # csr_matrix summed duplicates
+
+    incidence = (enrol @ course_slot).tocsr()
+    names = alloc.roster.names
+    if names is not None:
+        names = pd.Series(names, dtype=object).fillna("Unknown Name").to_numpy()
+    return ExamLoad(np.asarray(alloc.roster.rolls, dtype=object), names, incidence, day_labels,
+                    window_days, max_exams)
+
+
+# ---------------------------------------------------------------------
+def _naive_metrics(timetable, subject_rolls, window_days=3):
+    """The loops the sparse version replaces (duplicate enrolments counted once): roll ->
+       (same-slot clashes, days with 2+ exams, back-to-back slots, max exams in window_days days).
+    """
+    offsets, _ = _day_offsets(timetable)
+    slots = {}  # roll -> {slot column: exams}
+    for entry, off in zip(timetable, offsets):
+        for pos, slot in enumerate(SLOTS):
+            for subj in entry[slot]:
+                for roll in set(subject_rolls.get(str(subj).strip(), ())):
+                    col = len(SLOTS) * off + pos
+                    taken = slots.setdefault(roll, {})
+                    taken[col] = taken.get(col, 0) + 1
+    metrics = {}
+    for roll, taken in slots.items():
+        days = {}
+        for col, n in taken.items():
+            days[col // len(SLOTS)] = days.get(col // len(SLOTS), 0) + n
+        window = max(sum(days.get(d, 0) for d in range(start, start + window_days)) for d in days
+                     for start in range(max(0, d - window_days + 1), d + 1))
+        metrics[roll] = (sum(n > 1 for n in taken.values()), sum(n > 1 for n in days.values()),
+                         sum(col + 1 in taken for col in taken), window)
+    return metrics
+
+
+def benchmark(n_students=50_000, n_courses=1500, courses_per_student=6, n_days=20, seed=0):
+    """Synthetic campus: time the sparse analysis against the per-entry loop."""
+    from types import SimpleNamespace
+    from roster import Roster
+
+    rng = np.random.default_rng(seed)
+    rolls = np.array([f"{20 + i % 6}01CS{i:06d}" for i in range(n_students)], dtype=object)
+    picks = rng.integers(0, n_courses, (n_students, courses_per_student))
+    subject_rolls = {f"C{c:04d}": [] for c in range(n_courses)}
+    for roll, row in zip(rolls, picks):
+        for c in row:
+            subject_rolls[f"C{c:04d}"].append(roll)
+    slots = rng.integers(0, 2 * n_days, n_courses)
+    timetable = []
+    for d in range(n_days):
+        entry = {'Date': str(pd.Timestamp("2026-05-01") + pd.Timedelta(days=d)).split()[0]}
+        for pos, slot in enumerate(SLOTS):
+            entry[slot] = [f"C{c:04d}" for c in np.flatnonzero(slots == 2 * d + pos)] or ['NO EXAM']
+        timetable.append(entry)
+    alloc = SimpleNamespace(timetable=timetable, subject_rolls=subject_rolls,
+                            roster=Roster.from_rolls(rolls))
+
+    start = time.perf_counter()
+    _naive_metrics(timetable, subject_rolls)
+    naive = time.perf_counter() - start
+    start = time.perf_counter()
+    load = analyze(alloc)
+    load.exceptions()
+    return {"students": n_students, "enrolments": n_students * courses_per_student,
+            "naive loops": naive, "sparse (all metrics + report)": time.perf_counter() - start}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Student exam-load report for an exam workbook.")
+    parser.add_argument("input", nargs="?", help="input Excel workbook")
+    parser.add_argument("--out", default="op_exam_load.xlsx")
+    parser.add_argument("--window", type=int, default=3, help="rolling window in days")
+    parser.add_argument("--max-exams", type=int, default=2, help="flag more exams than this in a window")
+    parser.add_argument("--profile", action="store_true",
+                        help="sample the run's stacks into profile.collapsed next to --out")
+    parser.add_argument("--benchmark", action="store_true", help="time against the naive loop (50k students)")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        for label, value in benchmark().items():
+            print(f"{label}: {value:.3f}s" if isinstance(value, float) else f"{label}: {value}")
+        return 0
+    if not args.input:
+        parser.error("input workbook required")
+
+    from seating_allocator import SeatingAllocator
+    logger = logging.getLogger("exam_load")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    from profiler import PROFILE_FILE, profiled
+    profile = os.path.join(os.path.dirname(os.path.abspath(args.out)), PROFILE_FILE) if args.profile else None
+    with profiled(profile, logger):
+        alloc = SeatingAllocator(args.input, outdir=".", logger=logger)
+        alloc.load_inputs()
+        load = analyze(alloc, window_days=args.window, max_exams=args.max_exams)
+        load.write(args.out)
+    print(load.summary().to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#file with small helpers to measure time and memory of pipeline phases
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peak_memory_mb():
+    """Return peak resident memory of this process in MB (None if unknown)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    if sys.platform == 'darwin':
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_rss_mb():
+    """Return current resident memory of this process in MB (None if unknown)."""
+    try:
+        with open('/proc/self/statm') as fh:  # Linux: size resident ... in pages
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+@contextmanager
+def timed_phase(logger, name):
+    """Log wall time and memory once the wrapped phase finishes: the change of resident
+       memory over the phase and the process peak so far (ru_maxrss covers the whole
+       process lifetime, so it is not attributed to this phase).
+    """
+    start = time.perf_counter()
+    rss_start = current_rss_mb()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        rss_end = current_rss_mb()
+        peak = peak_memory_mb()
+        if logger:
+            memory = []
+            if rss_start is not None and rss_end is not None:
+                memory.append(f"RSS {rss_end - rss_start:+.1f} MB")
+            if peak is not None:
+                memory.append(f"process peak so far {peak:.1f} MB")
+            if memory:
+                logger.info("Phase %s took %.3fs (%s)", name, elapsed, ", ".join(memory))
+            else:
+                logger.info("Phase %s took %.3fs", name, elapsed)
+
+
+class ProgressLog:
+    """Aggregate per-item events of a hot loop into periodic INFO summaries
+       (one line every `every` seconds plus a final one); per-item detail is
+       left to DEBUG records by the caller.
+    """
+
+    def __init__(self, logger, label, total=None, every=5.0):
+        self.logger = logger
+        self.label = label
+        self.total = total
+        self.every = every
+        self.ok = 0
+        self.failed = 0
+        self.start = self.last = time.perf_counter()
+
+    def tick(self, ok=True):
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        now = time.perf_counter()
+        if now - self.last >= self.every:
+            self.last = now
+            self._report("progress", now)
+
+    def done(self):
+        self._report("done", time.perf_counter())
+
+    def _report(self, stage, now):
+        if not self.logger:
+            return
+        count = self.ok + self.failed
+        of = f"/{self.total}" if self.total is not None else ""
+        rate = count / (now - self.start) if now > self.start else 0.0
+        self.logger.info("%s %s: %d%s (%d failed, %.1f/s)",
+                         self.label, stage, count, of, self.failed, rate)
@@ -0,0 +1,98 @@
+#file with the logging setup shared by the Streamlit app and the CLI
+# Records are put on a queue by the calling thread and written to the file/console
+# by a QueueListener thread, so slow disks never block the pipeline.
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s | %(levelname)s | %(message)s'
+
+
+def setup_logging(logfile='seating.log', name='seating', console=True, parent_queue=None):
+    """Configure `name` with a DEBUG log file and an INFO console, both behind a queue.
+       parent_queue: optional multiprocessing queue of a parent process (see
+       start_queue_listener); INFO records are then also forwarded there.
+    """
+    logger = logging.getLogger(name)
+
+    # Prevent multiple handlers when Streamlit reloads
+    if getattr(logger, "_is_configured", False):
+        return logger
+
+    logger.setLevel(logging.DEBUG)
+    # keep messages out of the root logger (avoids duplicates in batch runs)
+    logger.propagate = False
+
+    fmt = logging.Formatter(LOG_FORMAT)
+    handlers = []
+
+    # 1) Main log file (INFO + ERROR + DEBUG)
+    fh = logging.FileHandler(logfile, mode='w')
+    fh.setLevel(logging.DEBUG)
+    fh.setFormatter(fmt)
+    handlers.append(fh)
+
+    # 2) Console output (only for display in Streamlit terminal)
+    if console:
+        ch = logging.StreamHandler()
+        ch.setLevel(logging.INFO)
+        ch.setFormatter(fmt)
+        handlers.append(ch)
+
+    # 3) Forward to the parent process (batch runs with --verbose)
+    if parent_queue is not None:
+        ph = QueueHandler(parent_queue)
+        ph.setLevel(logging.INFO)
+        handlers.append(ph)
+
+    # the logger itself only enqueues; the listener thread does the I/O
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    logger.addHandler(QueueHandler(log_queue))
+    logger._queue_listener = listener
+
+    # Mark as configured to avoid re-attaching handlers
+    logger._is_configured = True
+
+    return logger
+
+
+def start_queue_listener(log_queue, level=logging.INFO):
+    """Print records that worker processes put on `log_queue` (a multiprocessing queue)
+       to the parent's stderr. Returns the listener; call .stop() when the pool is done.
+    """
+    ch = logging.StreamHandler()
+    ch.setLevel(level)
+    ch.setFormatter(logging.Formatter('%(name)s | ' + LOG_FORMAT))
+    listener = QueueListener(log_queue, ch, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def close_logger(logger):
+    """Flush the queue and release file handles so TemporaryDirectory can clean up on Windows."""
+    if logger is None:
+        return
+    # stop() drains the queue before returning, so nothing logged so far is lost
+    listener = getattr(logger, "_queue_listener", None)
+    if listener is not None:
+        listener.stop()
+        logger._queue_listener = None
+        targets = list(listener.handlers)
+    else:
+        targets = []
+    # Copy the list so we can modify logger.handlers while iterating
+    for h in targets + list(logger.handlers):
+        try:
+            h.flush()
+        except Exception:
+            pass
+        try:
+            h.close()
+        except Exception:
+            pass
+        if h in logger.handlers:
+            logger.removeHandler(h)
+    # allow the next run to attach fresh handlers
+    logger._is_configured = False
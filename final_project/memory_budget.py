@@ -0,0 +1,187 @@
+#file with the memory-budget governor for SeatingAllocator
+# A quick pre-scan reads only row counts of the input sheets; a simple per-row model turns
+# them into a footprint estimate, and bounded-memory strategies are switched on (cheapest
+# first) until the estimate fits the budget. Per-row costs were measured (resident memory)
+# on a generated 300k-row course-roll mapping.
+import os
+import shutil
+import tempfile
+
+MB = 1024 * 1024
+
+BASE_MB = 100                 # interpreter + pandas/numpy, before any input is read
+INDEX_ROW_BYTES = 350         # subject_rolls / roll_courses / roster per mapping row
+SHEET_ROW_BYTES = 80          # in_course_roll_mapping parsed as one DataFrame
+OUTPUT_ROW_BYTES = 50         # op_overall_seating_arrangement rows + DataFrame
+ALLOC_ROW_BYTES = 15          # allocation lists (and again for the PDF grouping)
+ARCHIVE_ROW_BYTES = 170       # zipped outputs incl. PDFs: our bytes copy plus Streamlit's copy
+BOOKLET_STUDENT_BYTES = 7000  # ReportLab story of one booklet, per student in it
+
+# bounded strategies, in the order they are switched on
+STRATEGIES = ("chunked_ingestion", "streaming_writers", "release_slots", "disk_archive")
+STRATEGY_TEXT = {
+    "chunked_ingestion": "stream in_course_roll_mapping in chunks of {chunksize} rows",
+    "streaming_writers": "write op_overall_seating_arrangement row by row (constant memory)",
+    "release_slots": "group and release allocations slot by slot while writing PDFs",
+    "disk_archive": "write the output zip to a file and let the download read it from disk",
+}
+MIN_CHUNK, MAX_CHUNK = 5000, 50000
+
+
+# ---------------------------------------------------------------------
+def _xlsx_rows(path):
+    """{sheet: rows} from the dimension records of a read-only workbook (no cell parsing)."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return {ws.title: ws.max_row or 0 for ws in wb.worksheets}
+    finally:
+        wb.close()
+
+
+def _csv_rows(path, block=1 << 20):
+    lines = 0
+    with open(path, "rb") as fh:
+        while True:
+            chunk = fh.read(block)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+    return lines
+
+
+def _timetable_slots(path):
+    """Exam slots (non 'NO EXAM' cells) of in_timetable, read row by row."""
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if "in_timetable" not in wb.sheetnames:
+            return 0
+        rows = wb["in_timetable"].iter_rows(values_only=True)
+        header = [str(h).strip() if h is not None else "" for h in next(rows, ())]
+        cols = [i for i, h in enumerate(header) if h in ("Morning", "Evening")]
+        slots = 0
+        for row in rows:
+            for i in cols:
+                text = str(row[i]).strip() if i < len(row) and row[i] is not None else ""
+                slots += bool(text) and text.upper() != "NO EXAM"
+        return slots
+    finally:
+        wb.close()
+
+
+def prescan(input_file, course_roll_file=None):
+    """Sizes of a run's inputs without loading them: mapping rows, name rows,
+       exam slots and file sizes. course_roll_file: optional separate mapping
+       (.xlsx/.csv/.parquet) as in SeatingAllocator.
+    """
+    sheets = _xlsx_rows(input_file)
+    scan = {
+        "input_mb": os.path.getsize(input_file) / MB,
+        "name_rows": max(0, sheets.get("in_roll_name_mapping", 1) - 1),
+        "slots": _timetable_slots(input_file),
+    }
+    source = course_roll_file or input_file
+    ext = os.path.splitext(str(source))[1].lower()
+    if source == input_file:
+        rows = sheets.get("in_course_roll_mapping", 1)
+    elif ext == ".csv":
+        rows = _csv_rows(source)
+    elif ext == ".parquet":
+        import pyarrow.parquet as pq
+        rows = pq.ParquetFile(source).metadata.num_rows + 1
+    else:
+        rows = _xlsx_rows(source).get("in_course_roll_mapping", 1)
+    scan["mapping_rows"] = max(0, rows - 1)  # minus the header row
+    return scan
+
+
+# ---------------------------------------------------------------------
+class MemoryPlan:
+    """Footprint estimate of a run and the bounded strategies chosen for a budget."""
+
+    def __init__(self, budget_mb, scan, archive=False):
+        self.budget_mb = budget_mb
+        self.scan = scan
+        self.archive = archive  # the caller keeps a zip of the outputs (Streamlit app)
+        self.enabled = {name: False for name in STRATEGIES}
+        rows_for_chunk = int(budget_mb * MB * 0.05 / SHEET_ROW_BYTES)  # a chunk costs <= 5% of the budget
+        self.chunksize = max(MIN_CHUNK, min(MAX_CHUNK, rows_for_chunk))
+
+    def estimate(self):
+        """Estimated peak contributions in MB per component."""
+        rows = self.scan["mapping_rows"]
+        slots = max(1, self.scan.get("slots", 1))
+        sheet_rows = min(rows, self.chunksize) if self.enabled["chunked_ingestion"] else rows
+        alloc = rows * ALLOC_ROW_BYTES
+        return {
+            "base": BASE_MB,
+            "inputs": rows * INDEX_ROW_BYTES / MB,
+            "mapping sheet": sheet_rows * SHEET_ROW_BYTES / MB,
+            "outputs": 0.0 if self.enabled["streaming_writers"] else rows * OUTPUT_ROW_BYTES / MB,
+            "allocations": (alloc + alloc / slots if self.enabled["release_slots"] else 2 * alloc) / MB,
+            # Streamlit keeps its own copy of a download, so a zip on disk only saves ours
+            "archive": (rows * ARCHIVE_ROW_BYTES / MB / (2 if self.enabled["disk_archive"] else 1)
+                        if self.archive else 0.0),
+        }
+
+    def total_mb(self):
+        return sum(self.estimate().values())
+
+    @property
+    def over_budget(self):
+        return self.total_mb() > self.budget_mb
+
+    def decisions(self):
+        """Human-readable list of the strategies that were switched on."""
+        return [STRATEGY_TEXT[name].format(chunksize=self.chunksize)
+                for name in STRATEGIES if self.enabled[name]]
+
+    def summary(self):
+        lines = [f"Memory budget {self.budget_mb:.0f} MB; estimated peak {self.total_mb():.0f} MB "
+                 f"for {self.scan['mapping_rows']} course-roll rows"]
+        lines += [f"- {text}" for text in self.decisions()] or ["- default in-memory pipeline"]
+        if self.over_budget:
+            lines.append("- estimate still exceeds the budget with every bounded strategy on")
+        return lines
+
+    def as_dict(self):
+        return {
+            "budget_mb": self.budget_mb,
+            "estimate_mb": {k: round(v, 1) for k, v in self.estimate().items()},
+            "strategies": [name for name in STRATEGIES if self.enabled[name]],
+            "chunksize": self.chunksize if self.enabled["chunked_ingestion"] else None,
+            "over_budget": self.over_budget,
+        }
+
+
+def plan_memory(scan, budget_mb, archive=False):
+    """Switch strategies on, in STRATEGIES order, until the estimate fits budget_mb."""
+    plan = MemoryPlan(budget_mb, scan, archive=archive)
+    for name in STRATEGIES:
+        if not plan.over_budget:
+            break
+        if name == "disk_archive" and not archive:
+            continue
+        plan.enabled[name] = True
+    return plan
+
+
+def booklet_mb(students):
+    """Estimated ReportLab memory (MB) for one attendance booklet with this many students."""
+    return students * BOOKLET_STUDENT_BYTES / MB
+
+
+def disk_archive(src_dir):
+    """Zip src_dir into a new file in the system temp folder (outside the run's own temp
+       folder, so it outlives it) and return its path; the caller deletes it once served.
+    """
+    fd, path = tempfile.mkstemp(prefix="schedule_", suffix=".zip")
+    os.close(fd)
+    try:
+        # same layout as the in-memory path's make_archive, just a different home
+        shutil.make_archive(path[:-len(".zip")], "zip", src_dir)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,226 @@
+#file with the student photo store: a photos/ directory or one packed, memory-mapped bundle
+# Bundle layout: MAGIC | photo bytes ... | JSON index | <index length: uint64> MAGIC
+# The index maps roll -> [offset, length, size, mtime_ns] of the source file.
+import argparse
+import functools
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+
+PHOTO_EXTENSIONS = (".jpg", ".jpeg", ".png")
+MAGIC = b"PHB1"
+FOOTER = struct.Struct("<Q4s")
+# an incremental update rewrites the whole bundle once this share of it is stale bytes
+MAX_GARBAGE_RATIO = 0.5
+
+
+@functools.lru_cache(maxsize=8)
+def _photo_index(photos_dir, dir_mtime_ns):
+    """{roll: photo path} from one listing of photos_dir (earlier extensions win)."""
+    rank = {ext: i for i, ext in enumerate(PHOTO_EXTENSIONS)}
+    best = {}
+    with os.scandir(photos_dir) as entries:
+        for entry in entries:
+            stem, ext = os.path.splitext(entry.name)
+            if ext in rank and entry.is_file() and rank[ext] < best.get(stem, (len(rank), None))[0]:
+                best[stem] = (rank[ext], entry.path)
+    return {stem: path for stem, (_, path) in best.items()}
+
+
+def photo_index(photos_dir):
+    """Roll -> photo path for a directory, listed once and reused until the directory changes
+       (instead of one exists() call per roll and extension).
+    """
+    try:
+        mtime = os.stat(photos_dir).st_mtime_ns
+    except (OSError, TypeError):
+        return {}
+    return _photo_index(photos_dir, mtime)
+
+
+# ---------------------------------------------------------------------
+class _SliceReader(io.RawIOBase):
+    """Read-only, seekable file object over a memoryview (no copy of the photo bytes)."""
+
+    def __init__(self, view):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer):
+        chunk = self._view[self._pos:self._pos + len(buffer)]
+        n = len(chunk)
+        buffer[:n] = chunk
+        self._pos += n
+        return n
+
+
+def _read_index(buf):
+    """Return (entries, data_end) of a bundle held in `buf` (bytes-like)."""
+    if len(buf) < len(MAGIC) + FOOTER.size or bytes(buf[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not a photo bundle")
+    length, magic = FOOTER.unpack(bytes(buf[-FOOTER.size:]))
+    if magic != MAGIC:
+        raise ValueError("Photo bundle footer is damaged (interrupted update?)")
+    data_end = len(buf) - FOOTER.size - length
+    entries = json.loads(bytes(buf[data_end:len(buf) - FOOTER.size]).decode("utf-8"))
+    return entries, data_end
+
+
+class PhotoBundle:
+    """Memory-mapped photo bundle: one open() and one mmap for all photos.
+       get(roll) returns a memoryview into the map, open(roll) a file object over it
+       (what ReportLab / PIL read from); nothing is copied until the PDF embeds it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._fh = open(path, "rb")
+        self._mm = mmap.mmap(self._fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        self.index, _ = _read_index(self._view)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, roll):
+        return roll in self.index
+
+    def get(self, roll):
+        entry = self.index.get(roll)
+        if entry is None:
+            return None
+        offset, length = entry[0], entry[1]
+        return self._view[offset:offset + length]
+
+    def open(self, roll):
+        view = self.get(roll)
+        return None if view is None else _SliceReader(view)
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+        self._fh.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------------------------------------------------------------
+def _sources(photos_dir):
+    """roll -> (path, size, mtime_ns) for every photo in the directory."""
+    sources = {}
+    for roll, path in photo_index(photos_dir).items():
+        st = os.stat(path)
+        sources[roll] = (path, st.st_size, st.st_mtime_ns)
+    return sources
+
+
+def _write_footer(fh, entries):
+    index = json.dumps(entries, separators=(",", ":")).encode("utf-8")
+    fh.write(index)
+    fh.write(FOOTER.pack(len(index), MAGIC))
+
+
+def _write_full(photos_dir, bundle_path, sources):
+    tmp_path = bundle_path + ".tmp"
+    entries = {}
+    with open(tmp_path, "wb") as fh:
+        fh.write(MAGIC)
+        for roll in sorted(sources):
+            path, size, mtime = sources[roll]
+            with open(path, "rb") as src:
+                data = src.read()
+            entries[roll] = [fh.tell(), len(data), size, mtime]
+            fh.write(data)
+        _write_footer(fh, entries)
+    os.replace(tmp_path, bundle_path)
+    return entries
+
+
+def build_bundle(photos_dir, bundle_path, full=False, logger=None):
+    """Pack photos_dir into bundle_path. An existing bundle is updated incrementally:
+       new or changed photos (size / mtime) are appended, removed ones dropped from the
+       index; the file is rewritten only when `full` is set or too much of it is stale.
+       Returns counts: added, updated, removed, unchanged, bytes.
+    """
+    sources = _sources(photos_dir)
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    existing = None
+    if not full and os.path.exists(bundle_path):
+        try:
+            with open(bundle_path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                existing, data_end = _read_index(mm)
+        except ValueError:
+            if logger:
+                logger.warning("Photo bundle %s is unreadable; rebuilding it", bundle_path)
+
+    if existing is None:
+        entries = _write_full(photos_dir, bundle_path, sources)
+        stats["added"] = len(entries)
+    else:
+        changed = {r for r, (_, size, mtime) in sources.items()
+                   if r not in existing or existing[r][2:] != [size, mtime]}
+        removed = [r for r in existing if r not in sources]
+        stats["added"] = sum(r not in existing for r in changed)
+        stats["updated"] = len(changed) - stats["added"]
+        stats["removed"] = len(removed)
+        stats["unchanged"] = len(sources) - len(changed)
+
+        live = sum(e[1] for r, e in existing.items() if r in sources and r not in changed)
+        garbage = data_end - len(MAGIC) - live
+        if garbage / data_end > MAX_GARBAGE_RATIO:
+            _write_full(photos_dir, bundle_path, sources)
+        elif changed or removed:
+            entries = {r: e for r, e in existing.items() if r in sources}
+            with open(bundle_path, "r+b") as fh:
+                # new photo bytes overwrite the old index, then the new index follows
+                fh.seek(data_end)
+                for roll in sorted(changed):
+                    path, size, mtime = sources[roll]
+                    with open(path, "rb") as src:
+                        data = src.read()
+                    entries[roll] = [fh.tell(), len(data), size, mtime]
+                    fh.write(data)
+                _write_footer(fh, entries)
+                fh.truncate()
+
+    stats["bytes"] = os.path.getsize(bundle_path)
+    if logger:
+        logger.info("Photo bundle %s: %s", bundle_path, stats)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack a photos/ directory into one memory-mapped bundle.")
+    parser.add_argument("photos_dir")
+    parser.add_argument("bundle", help="bundle file to create or update (e.g. photos.bundle)")
+    parser.add_argument("--full", action="store_true", help="rewrite the bundle instead of updating it")
+    args = parser.parse_args(argv)
+    print(json.dumps(build_bundle(args.photos_dir, args.bundle, full=args.full)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#file with the on-demand sampling profiler for production runs
+# A daemon thread wakes every `interval` seconds, takes the current stack of the profiled
+# thread (sys._current_frames) and counts it. The counts are written in the collapsed-stack
+# format ("frame;frame;...;leaf count" per line) read by flamegraph.pl, speedscope and
+# inferno. The sampler measures its own CPU time, which bounds the slowdown of the run.
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_FILE = "profile.collapsed"  # name inside the output folder / zip
+DEFAULT_INTERVAL = 0.01             # 100 samples per second
+
+
+class StackSampler:
+    """Periodic stack sampler for one thread (default: the thread calling start())."""
+
+    def __init__(self, interval=DEFAULT_INTERVAL, thread_id=None):
+        self.interval = float(interval)
+        self.thread_id = thread_id
+        self.counts = Counter()
+        self.samples = 0
+        self.cpu = 0.0  # seconds the sampler thread spent sampling
+        self.wall = 0.0
+        self._labels = {}  # code object -> frame label
+        self._stop = threading.Event()
+        self._thread = None
+        self._start = None
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.wall += time.perf_counter() - self._start
+        return self
+
+    def _run(self):
+        own = time.thread_time
+        while not self._stop.wait(self.interval):
+            t0 = own()
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:  # the profiled thread has finished
+                break
+            self.counts[self._stack(frame)] += 1
+            self.samples += 1
+            self.cpu += own() - t0
+
+    def _stack(self, frame):
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_name} ({os.path.basename(code.co_filename)})"
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    # -----------------------------------------------------------------
+    @property
+    def overhead(self):
+        """Sampler CPU as a fraction of wall time (it holds the GIL while sampling)."""
+        return self.cpu / self.wall if self.wall else 0.0
+
+    def add_collapsed(self, path, prefix=None):
+        """Merge a collapsed-stack file (e.g. of a worker process) under an optional root frame."""
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack:
+                    self.counts[f"{prefix};{stack}" if prefix else stack] += int(count)
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as fh:
+            for stack, count in sorted(self.counts.items()):
+                fh.write(f"{stack} {count}\n")
+
+    def summary(self):
+        return (f"{self.samples} samples in {self.wall:.2f}s every {self.interval * 1000:.0f} ms, "
+                f"sampler overhead {self.overhead:.2%}")
+
+    def as_dict(self):
+        return {"samples": self.samples, "interval_ms": self.interval * 1000,
+                "overhead_pct": round(self.overhead * 100, 3)}
+
+
+@contextmanager
+def profiled(path, logger=None, interval=DEFAULT_INTERVAL):
+    """Sample the calling thread while the block runs and write `path` afterwards.
+       path None: profiling off (yields None), so callers can wrap unconditionally.
+    """
+    if path is None:
+        yield None
+        return
+    sampler = StackSampler(interval).start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        sampler.write(path)
+        if logger:
+            logger.info("Profile written to %s: %s", path, sampler.summary())
+
+
+# ---------------------------------------------------------------------
+def benchmark(input_file, interval=DEFAULT_INTERVAL, repeat=3):
+    """Wall time of the no-PDF pipeline with and without the sampler (best of `repeat`)."""
+    import logging
+    import tempfile
+    from seating_allocator import SeatingAllocator
+
+    logger = logging.getLogger("profiler.benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+
+    def run(path):
+        with tempfile.TemporaryDirectory() as outdir:
+            start = time.perf_counter()
+            with profiled(path and os.path.join(outdir, path), interval=interval) as sampler:
+                alloc = SeatingAllocator(input_file, outdir=outdir, logger=logger)
+                alloc.load_inputs()
+                alloc.allocate_all_days()
+                alloc.write_outputs()
+            return time.perf_counter() - start, sampler
+
+    plain = min(run(None)[0] for _ in range(repeat))
+    runs = [run(PROFILE_FILE) for _ in range(repeat)]
+    seconds, sampler = min(runs, key=lambda r: r[0])
+    return {"plain_s": plain, "profiled_s": seconds, "slowdown_pct": (seconds / plain - 1) * 100,
+            "sampler_cpu_pct": sampler.overhead * 100, "samples": sampler.samples}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python profiler.py input.xlsx [interval_ms]")
+    ms = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_INTERVAL * 1000
+    for label, value in benchmark(sys.argv[1], interval=ms / 1000).items():
+        print(f"{label}: {value:.3f}" if isinstance(value, float) else f"{label}: {value}")
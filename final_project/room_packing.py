@@ -0,0 +1,259 @@
+#file with the per-slot room packers used by SeatingAllocator.allocate_all_days
+# A slot is a bin-packing problem: subjects (items, splittable) go into rooms (bins of
+# different capacity). A plan is a list per subject of [(room index, count), ...].
+# subject_caps (optional, per room): most students of one subject a room may hold; the
+# seat layout uses half the room's grid so a subject never has to sit next to itself.
+import time
+
+
+def greedy_pack(sizes, capacities, subject_caps=None):
+    """The original allocator: subjects in the given order, each one poured into the
+       rooms with the most remaining seats first. With subject_caps a first pass keeps
+       every room within its cap and a second pass fills the rest (as allocate_subject).
+       Returns (plan, leftover per subject).
+    """
+    remaining = list(capacities)
+    plan, leftover = [], []
+    for size in sizes:
+        placed = {}  # room -> students of this subject
+        pending = size
+        order = sorted(range(len(remaining)), key=lambda r: remaining[r], reverse=True)
+        for caps in ((subject_caps, None) if subject_caps is not None else (None,)):
+            for r in order:
+                if not pending:
+                    break
+                room = remaining[r] if caps is None else min(remaining[r], caps[r] - placed.get(r, 0))
+                if room <= 0:
+                    continue
+                take = min(pending, room)
+                placed[r] = placed.get(r, 0) + take
+                remaining[r] -= take
+                pending -= take
+        plan.append(list(placed.items()))
+        leftover.append(pending)
+    return plan, leftover
+
+
+def rooms_lower_bound(sizes, capacities):
+    """Fewest rooms that can seat everybody (largest rooms first; subjects may split)."""
+    need = sum(sizes)
+    used = 0
+    for cap in sorted(capacities, reverse=True):
+        if need <= 0:
+            break
+        need -= cap
+        used += 1
+    return used if need <= 0 else None
+
+
+def plan_score(plan, buildings=None):
+    """(rooms used, subjects spread over several buildings, subject pieces) - lower is better."""
+    rooms = {r for pieces in plan for r, c in pieces if c > 0}
+    pieces = sum(1 for p in plan for _, c in p if c > 0)
+    spread = 0
+    if buildings is not None:
+        spread = sum(len({buildings[r] for r, c in p if c > 0}) > 1 for p in plan)
+    return len(rooms), spread, pieces
+
+
+class _Packing:
+    """Mutable packing state: per room {subject: count} and free seats."""
+
+    def __init__(self, sizes, capacities, buildings, subject_caps=None):
+        self.sizes = sizes
+        self.cap = capacities
+        self.buildings = buildings
+        self.subject_cap = list(subject_caps) if subject_caps is not None else list(capacities)
+        self.free = list(capacities)
+        self.room_items = [dict() for _ in capacities]  # room -> {subject: count}
+        self.subject_rooms = [dict() for _ in sizes]    # subject -> {room: count}
+
+    def put(self, s, r, count):
+        self.room_items[r][s] = self.room_items[r].get(s, 0) + count
+        self.subject_rooms[s][r] = self.subject_rooms[s].get(r, 0) + count
+        self.free[r] -= count
+
+    def take(self, s, r):
+        count = self.room_items[r].pop(s)
+        del self.subject_rooms[s][r]
+        self.free[r] += count
+        return count
+
+    def room_for(self, s, r):
+        """Students of subject s that room r can still take."""
+        return min(self.free[r], self.subject_cap[r] - self.room_items[r].get(s, 0))
+
+    def is_open(self, r):
+        return bool(self.room_items[r])
+
+    def open_rooms(self):
+        return [r for r in range(len(self.cap)) if self.room_items[r]]
+
+    def plan(self):
+        return [sorted(rooms.items()) for rooms in self.subject_rooms]
+
+    def snapshot(self):
+        return [dict(items) for items in self.room_items]
+
+    def restore(self, snap):
+        self.room_items = [dict(items) for items in snap]
+        self.subject_rooms = [dict() for _ in self.sizes]
+        self.free = list(self.cap)
+        for r, items in enumerate(self.room_items):
+            for s, c in items.items():
+                self.subject_rooms[s][r] = c
+                self.free[r] -= c
+
+
+def _best_fit_decreasing(state, order):
+    """Place whole subjects where they fit tightest; split only subjects that fit nowhere."""
+    n_rooms = len(state.cap)
+    for s in order:
+        pending = state.sizes[s]
+        while pending:
+            open_fit = [r for r in range(n_rooms) if state.is_open(r) and state.room_for(s, r) >= pending]
+            if open_fit:
+                # tightest open room that holds the whole rest of the subject
+                r = min(open_fit, key=lambda r: (state.free[r], r))
+            else:
+                closed = [r for r in range(n_rooms) if not state.is_open(r) and state.room_for(s, r) > 0]
+                closed_fit = [r for r in closed if state.room_for(s, r) >= pending]
+                if closed_fit:
+                    r = min(closed_fit, key=lambda r: (state.free[r], r))  # smallest room that fits
+                else:
+                    candidates = closed or [r for r in range(n_rooms) if state.room_for(s, r) > 0]
+                    if not candidates:
+                        return False
+                    r = max(candidates, key=lambda r: (state.room_for(s, r), -r))  # largest room, split
+            count = min(pending, state.room_for(s, r))
+            state.put(s, r, count)
+            pending -= count
+    return True
+
+
+def _spread_into(state, s, count, exclude, allowed):
+    """Seat `count` students of subject s in open rooms from `allowed` (not `exclude`):
+       rooms already holding s first, then tightest fit, then the roomiest. False if no space.
+    """
+    rooms = [r for r in allowed if r != exclude and state.room_for(s, r) > 0]
+    if sum(state.room_for(s, r) for r in rooms) < count:
+        return False
+    same = [r for r in rooms if s in state.room_items[r]]
+    fit = sorted((r for r in rooms if state.room_for(s, r) >= count), key=lambda r: state.free[r])
+    rest = sorted(rooms, key=lambda r: -state.room_for(s, r))
+    for r in same + fit + rest:
+        if not count:
+            break
+        c = min(count, state.room_for(s, r))
+        if c:
+            state.put(s, r, c)
+            count -= c
+    return True
+
+
+def _local_search(state, deadline):
+    """Improve the packing until nothing helps or the deadline passes:
+       1) empty the least-loaded open room into free seats of the other open rooms
+       2) replace two open rooms by one closed room that holds both
+       3) merge pieces of a split subject into one of its rooms
+    """
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+
+        # 1) close a room by spreading its students over the other open rooms
+        for r in sorted(state.open_rooms(), key=lambda r: state.cap[r] - state.free[r]):
+            if time.perf_counter() >= deadline:
+                return
+            load = state.cap[r] - state.free[r]
+            others = [o for o in state.open_rooms() if o != r]
+            if sum(state.free[o] for o in others) < load:
+                continue
+            snap = state.snapshot()
+            ok = True
+            for s in list(state.room_items[r]):
+                if not _spread_into(state, s, state.take(s, r), r, others):
+                    ok = False
+                    break
+            if ok:
+                improved = True
+                break
+            state.restore(snap)
+        if improved:
+            continue
+
+        # 2) two open rooms -> one (smallest) closed room that holds both loads
+        open_rooms = sorted(state.open_rooms(), key=lambda r: state.cap[r] - state.free[r])
+        closed = sorted((r for r in range(len(state.cap)) if not state.is_open(r)), key=lambda r: state.cap[r])
+        for i in range(len(open_rooms)):
+            for j in range(i + 1, len(open_rooms)):
+                if time.perf_counter() >= deadline:
+                    return
+                a, b = open_rooms[i], open_rooms[j]
+                load = (state.cap[a] - state.free[a]) + (state.cap[b] - state.free[b])
+                both = {}
+                for src in (a, b):
+                    for s, c in state.room_items[src].items():
+                        both[s] = both.get(s, 0) + c
+                target = next((r for r in closed if state.cap[r] >= load
+                               and all(c <= state.subject_cap[r] for c in both.values())), None)
+                if target is None:
+                    continue
+                for src in (a, b):
+                    for s in list(state.room_items[src]):
+                        state.put(s, target, state.take(s, src))
+                improved = True
+                break
+            if improved:
+                break
+        if improved:
+            continue
+
+        # 3) merge split subjects (fewer pieces per subject, no new rooms)
+        for s, rooms in enumerate(state.subject_rooms):
+            if len(rooms) < 2:
+                continue
+            for src in sorted(rooms, key=rooms.get):
+                dst = next((r for r in rooms if r != src and state.room_for(s, r) >= rooms[src]), None)
+                if dst is not None:
+                    state.put(s, dst, state.take(s, src))
+                    improved = True
+                    break
+            if improved:
+                break
+
+
+def optimized_pack(sizes, capacities, buildings=None, time_budget=0.2, subject_caps=None):
+    """Best-fit-decreasing + local search within `time_budget` seconds.
+       sizes: students per subject; capacities: seats per room (index order = room order);
+       subject_caps: per room, most students of one subject (never exceeded by the packed
+       plan; the greedy fallback may exceed it like allocate_subject's second pass).
+       Returns (plan, info) where info has rooms_greedy, rooms_packed, lower_bound,
+       seconds and fallback (True when the greedy plan was kept). plan is None if the
+       rooms cannot seat everybody.
+    """
+    start = time.perf_counter()
+    deadline = start + max(0.0, time_budget)
+    greedy_plan, leftover = greedy_pack(sizes, capacities, subject_caps)
+    info = {
+        "rooms_greedy": plan_score(greedy_plan)[0],
+        "lower_bound": rooms_lower_bound(sizes, capacities),
+        "fallback": True,
+    }
+    if any(leftover):
+        info.update(rooms_packed=info["rooms_greedy"], seconds=time.perf_counter() - start)
+        return None, info
+
+    plan = greedy_plan
+    state = _Packing(sizes, capacities, buildings, subject_caps)
+    order = sorted(range(len(sizes)), key=lambda s: sizes[s], reverse=True)
+    if _best_fit_decreasing(state, order):
+        _local_search(state, deadline)
+        candidate = state.plan()
+        if plan_score(candidate, buildings) < plan_score(greedy_plan, buildings):
+            plan = candidate
+            info["fallback"] = False
+
+    info["rooms_packed"] = plan_score(plan)[0]
+    info["seconds"] = time.perf_counter() - start
+    return plan, info
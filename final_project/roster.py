@@ -0,0 +1,161 @@
+#file with the shared roll-number parser and compact student roster
+# used by the seating tool, tut_01 (grouping) and tut_02 (faculty allocation)
+import time
+
+import numpy as np
+import pandas as pd
+
+# 2511AI07 -> year 25, program 11, branch AI, serial 07 (year/program/serial are optional,
+# so short forms such as AI123 still give a branch)
+ROLL_PATTERN = r'(?P<year>\d{2})?(?P<program>\d{2})?(?P<branch>[A-Z]+)(?P<serial>\d+)?'
+
+
+def normalize_rolls(values):
+    """Rolls as stripped strings in one vectorized pass (missing values stay NaN)."""
+    rolls = pd.Series(values).reset_index(drop=True)
+    if rolls.dtype != object:
+        rolls = rolls.astype(object)
+    mask = rolls.notna()
+    rolls[mask] = rolls[mask].astype(str).str.strip()
+    return rolls
+
+
+def parse_rolls(values):
+    """Parse roll numbers into Roll, Year, Program, Branch, Serial columns.
+       Each distinct roll is parsed once (rolls repeat a lot in enrolment sheets),
+       the result is broadcast back with one take. Parts that are not present are
+       NaN; Branch is categorical.
+    """
+    rolls = normalize_rolls(values)
+    codes, uniques = pd.factorize(rolls)
+    parts = pd.Series(uniques, dtype=object).str.extract(ROLL_PATTERN)
+
+    def expand(col, dtype):
+        column = parts[col].astype(dtype)
+        taken = column.take(np.where(codes >= 0, codes, 0)).reset_index(drop=True)
+        return taken.where(codes >= 0)
+
+    return pd.DataFrame({
+        "Roll": rolls,
+        "Year": expand("year", "Int16"),
+        "Program": expand("program", "Int16"),
+        "Branch": expand("branch", "category"),
+        "Serial": expand("serial", "Int32"),
+    })
+
+
+class Roster:
+    """Columnar table with one row per distinct roll.
+       - rolls: interned roll strings (row id = position), looked up through a hash index
+       - year / program / serial: small integers, -1 when the roll has no such part
+       - branch: Categorical (one code per student, names stored once)
+       - names: optional names, aligned with rolls
+    """
+
+    def __init__(self, rolls, year, program, branch, serial, names=None):
+        self.rolls = rolls
+        self.year = year
+        self.program = program
+        self.branch = branch
+        self.serial = serial
+        self.names = names
+        self._index = pd.Index(rolls)
+
+    @classmethod
+    def from_rolls(cls, values, names=None):
+        """Build a roster from any iterable of rolls (duplicates and blanks are dropped,
+           first occurrence wins). `names` may be a {roll: name} mapping.
+        """
+        rolls = normalize_rolls(values)
+        rolls = rolls[rolls.notna() & (rolls != "")]
+        parsed = parse_rolls(pd.unique(rolls.to_numpy()))
+        name_arr = None
+        if names is not None:
+            name_arr = parsed["Roll"].map(names).to_numpy(dtype=object)
+        return cls(
+            parsed["Roll"].to_numpy(dtype=object),
+            parsed["Year"].fillna(-1).to_numpy(dtype=np.int16),
+            parsed["Program"].fillna(-1).to_numpy(dtype=np.int16),
+            pd.Categorical(parsed["Branch"]),
+            parsed["Serial"].fillna(-1).to_numpy(dtype=np.int32),
+            name_arr,
+        )
+
+    def __len__(self):
+        return len(self.rolls)
+
+    def ids(self, values):
+        """Row ids for a batch of rolls (-1 for rolls not in the roster)."""
+        return self._index.get_indexer(normalize_rolls(values))
+
+    def frame(self):
+        """The roster as a DataFrame (Roll, Year, Program, Branch, Serial[, Name])."""
+        df = pd.DataFrame({
+            "Roll": self.rolls,
+            "Year": self.year,
+            "Program": self.program,
+            "Branch": self.branch,
+            "Serial": self.serial,
+        })
+        if self.names is not None:
+            df["Name"] = self.names
+        return df
+
+    def memory_bytes(self):
+        return int(self.frame().memory_usage(deep=True).sum())
+
+
+def _synthetic_rolls(n_rolls, rng, unique):
+    """n rolls (years 14-25, 4 programs, 12 branches). unique: all distinct (4-digit serials);
+       else serials 01-99, so 1M rolls repeat ~57k distinct values as in enrolment sheets.
+    """
+    branches = np.array(["AI", "CB", "CE", "CH", "CS", "EE", "EP", "MA", "ME", "MM", "MT", "PH"])
+    programs = np.array(["01", "11", "12", "21"])
+    if unique:
+        code = rng.choice(12 * 4 * 12 * 10_000, n_rolls, replace=False)
+        code, serial = np.divmod(code, 10_000)
+        code, branch = np.divmod(code, 12)
+        year, program = np.divmod(code, 4)
+        width = 4
+    else:
+        year, program = rng.integers(0, 12, n_rolls), rng.integers(0, 4, n_rolls)
+        branch, serial = rng.integers(0, 12, n_rolls), rng.integers(1, 100, n_rolls)
+        width = 2
+    return pd.Series((year + 14).astype(str)).str.cat([
+        pd.Series(programs[program]),
+        pd.Series(branches[branch]),
+        pd.Series(serial).astype(str).str.zfill(width),
+    ])
+
+
+def benchmark(n_rolls=1_000_000, seed=0):
+    """Parse n synthetic rolls, all distinct and with repeats (parse_rolls parses each
+       distinct roll once, so repeats flatter it); returns {case: seconds per step}.
+    """
+    rng = np.random.default_rng(seed)
+    results = {}
+    for case, unique in [("unique", True), ("duplicated", False)]:
+        rolls = _synthetic_rolls(n_rolls, rng, unique)
+        timings = {"distinct rolls": rolls.nunique()}
+        start = time.perf_counter()
+        regex = rolls.str.extract(ROLL_PATTERN)  # naive: one regex per row
+        timings["per-row regex extract"] = time.perf_counter() - start
+        start = time.perf_counter()
+        parsed = parse_rolls(rolls)
+        timings["parse_rolls"] = time.perf_counter() - start
+        assert (parsed["Branch"].astype(object) == regex["branch"]).all()
+        start = time.perf_counter()
+        roster = Roster.from_rolls(rolls)
+        timings["Roster.from_rolls"] = time.perf_counter() - start
+        start = time.perf_counter()
+        roster.ids(rolls)
+        timings["Roster.ids"] = time.perf_counter() - start
+        results[case] = timings
+    return results
+
+
+if __name__ == "__main__":
+    for case, timings in benchmark().items():
+        print(f"{case} ({timings.pop('distinct rolls')} distinct of 1M rolls):")
+        for label, secs in timings.items():
+            print(f"  {label}: {secs * 1000:.1f} ms")
@@ -0,0 +1,190 @@
+#file for the seat lookup index (SQLite) and a small lookup service
+import argparse
+import json
+import os
+import sqlite3
+
+SEAT_INDEX_FILE = "seat_index.sqlite"
+
+COLUMNS = ["roll", "name", "date", "slot", "subject", "building", "room"]
+
+SCHEMA = """
+CREATE TABLE seats (
+    roll TEXT NOT NULL,
+    name TEXT,
+    date TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    building TEXT,
+    room TEXT NOT NULL
+);
+CREATE INDEX idx_seats_roll ON seats (roll, date, slot);
+CREATE INDEX idx_seats_room ON seats (date, slot, room);
+"""
+
+
+def _date_only(date):
+    """'2016-05-01 00:00:00' -> '2016-05-01' (same rule as the output folders)."""
+    return str(date).split()[0]
+
+
+def write_seat_index(db_path, allocations, roll_to_name=None, logger=None):
+    """Write one row per (roll, date, slot, subject, building, room) into a fresh SQLite file.
+       allocations: SeatingAllocator.allocations (slot_key -> list of allocation dicts)
+    """
+    roll_to_name = roll_to_name or {}
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.executescript(SCHEMA)
+
+        def rows():
+            for allocs in allocations.values():
+                for a in allocs:
+                    date = _date_only(a["date"])
+                    for roll in a["rolls"]:
+                        yield (roll, roll_to_name.get(roll, "Unknown Name"), date,
+                               str(a["slot"]), str(a["subject"]), str(a["building"]), str(a["room"]))
+
+        with conn:
+            conn.executemany("INSERT INTO seats VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+        count = conn.execute("SELECT COUNT(*) FROM seats").fetchone()[0]
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+    # swap in atomically so a running lookup service never sees a half-written file
+    os.replace(tmp_path, db_path)
+    if logger:
+        logger.info("Wrote seat index with %d seats: %s", count, db_path)
+    return count
+
+
+class SeatIndex:
+    """Read-only queries over a seat index file. Keep one instance alive for fast lookups."""
+
+    def __init__(self, db_path):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(f"Seat index not found: {db_path}")
+        self.db_path = db_path
+        # read-only connection, shareable between the service's threads
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+
+    def _query(self, sql, params):
+        cur = self.conn.execute(sql, params)
+        return [dict(zip(COLUMNS, r)) for r in cur.fetchall()]
+
+    def lookup_roll(self, roll, date=None, slot=None):
+        """All seats of one student, optionally for one date and/or slot."""
+        sql = "SELECT roll, name, date, slot, subject, building, room FROM seats WHERE roll = ?"
+        params = [str(roll).strip()]
+        if date:
+            sql += " AND date = ?"
+            params.append(_date_only(date))
+        if slot:
+            sql += " AND slot = ?"
+            params.append(slot)
+        return self._query(sql + " ORDER BY date, slot", params)
+
+    def lookup_room(self, date, slot, room):
+        """Everyone seated in one room for one date + slot."""
+        sql = ("SELECT roll, name, date, slot, subject, building, room FROM seats "
+               "WHERE date = ? AND slot = ? AND room = ? ORDER BY subject, roll")
+        return self._query(sql, [_date_only(date), slot, str(room).strip()])
+
+    def close(self):
+        self.conn.close()
+
+
+def make_handler(index):
+    """HTTP handler answering GET /roll/<ROLL>?date=&slot= and GET /room/<ROOM>?date=&slot=."""
+    # only the service needs the HTTP stack
+    from http.server import BaseHTTPRequestHandler
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [p for p in url.path.split("/") if p]
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            try:
+                if len(parts) == 2 and parts[0] == "roll":
+                    result = index.lookup_roll(parts[1], query.get("date"), query.get("slot"))
+                elif len(parts) == 2 and parts[0] == "room":
+                    if "date" not in query or "slot" not in query:
+                        return self._send(400, {"error": "room lookup needs date and slot"})
+                    result = index.lookup_room(query["date"], query["slot"], parts[1])
+                else:
+                    return self._send(404, {"error": "use /roll/<ROLL> or /room/<ROOM>"})
+            except Exception as e:
+                return self._send(500, {"error": str(e)})
+            self._send(200, result)
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            pass  # keep the help-desk console quiet
+
+    return Handler
+
+
+def serve(db_path, host="127.0.0.1", port=8600):
+    from http.server import ThreadingHTTPServer
+
+    index = SeatIndex(db_path)
+    server = ThreadingHTTPServer((host, port), make_handler(index))
+    print(f"Serving seat lookups from {db_path} on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        index.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up exam seats from a seat index.")
+    parser.add_argument("db", help=f"path to {SEAT_INDEX_FILE} (inside the output folder)")
+    parser.add_argument("--roll", help="roll number to look up")
+    parser.add_argument("--room", help="room to look up (needs --date and --slot)")
+    parser.add_argument("--date", help="exam date, e.g. 2016-05-01")
+    parser.add_argument("--slot", choices=["Morning", "Evening"])
+    parser.add_argument("--serve", action="store_true", help="run the HTTP lookup service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.db, args.host, args.port)
+        return 0
+
+    index = SeatIndex(args.db)
+    try:
+        if args.roll:
+            result = index.lookup_roll(args.roll, args.date, args.slot)
+        elif args.room:
+            if not (args.date and args.slot):
+                parser.error("--room needs --date and --slot")
+            result = index.lookup_room(args.date, args.slot, args.room)
+        else:
+            parser.error("give --roll, --room or --serve")
+    finally:
+        index.close()
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
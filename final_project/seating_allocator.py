@@ -1,10 +1,18 @@
 #file for seat allocation
 import os
+import sys
 import pandas as pd
 from collections import defaultdict
-from attendance_pdf import build_attendance_pdf
+from instrumentation import timed_phase, ProgressLog
+from roster import Roster, normalize_rolls
 
-def read_excel_file(path, logger=None):
+PACKING_MODES = ("greedy", "optimize")
+BOOKLET_MODES = ("slot", "building")  # attendance booklets: per date+slot, or per date+slot+building
+
+# attendance_pdf (ReportLab) and seat_index are imported inside the phase that
+# needs them, so runs without PDFs never pay for loading ReportLab
+
+def read_excel_file(path, logger=None, exclude=()):
     try:
         xls = pd.ExcelFile(path)
     except Exception:
@@ -12,23 +20,118 @@ def read_excel_file(path, logger=None):
             logger.exception('Unable to open Excel file: %s', path)
         raise
 
-    sheets = {name: xls.parse(name) for name in xls.sheet_names}
+    names = [name for name in xls.sheet_names if name not in exclude]
+    sheets = {name: xls.parse(name) for name in names}
     if logger:
-        logger.debug('Read sheets: %s', xls.sheet_names)
+        logger.debug('Read sheets: %s', names)
     return sheets
 
 
+def iter_sheet_chunks(path, sheet_name, chunksize=50000, logger=None):
+    """Yield a sheet as DataFrames of at most `chunksize` rows.
+       - .xlsx/.xlsm: rows are streamed from a read-only workbook
+       - .csv / .parquet: the whole file is treated as the sheet
+       Only one chunk is held in memory at a time.
+    """
+    ext = os.path.splitext(str(path))[1].lower()
+    if logger:
+        logger.debug('Streaming %s from %s in chunks of %d rows', sheet_name, path, chunksize)
+
+    if ext == '.csv':
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize)
+        return
+
+    if ext == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading parquet input requires the 'pyarrow' package")
+        pf = pq.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+        return
+
+    from openpyxl import load_workbook
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        if sheet_name not in wb.sheetnames:
+            raise ValueError(f"Missing required sheet: {sheet_name}")
+        rows = wb[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunksize:
+                yield pd.DataFrame(batch, columns=header)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=header)
+    finally:
+        wb.close()
+
+
 def write_output_excel(filepath, df):
     df.to_excel(filepath, index=False)
 
 
+def write_output_excel_streaming(filepath, columns, rows):
+    """Write dict rows to one sheet with xlsxwriter's constant_memory mode: each row is
+       flushed to disk as it is written, so neither a row list nor a DataFrame is built.
+    """
+    import xlsxwriter
+
+    wb = xlsxwriter.Workbook(filepath, {'constant_memory': True})
+    try:
+        ws = wb.add_worksheet()
+        # same header look as DataFrame.to_excel
+        header = wb.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        ws.write_row(0, 0, columns, header)
+        for i, row in enumerate(rows, start=1):
+            ws.write_row(i, 0, [row[c] for c in columns])
+    finally:
+        wb.close()
+
+
 class SeatingAllocator:
-    def __init__(self, input_file, buffer=0, density='Dense', outdir='output', logger=None):
+    def __init__(self, input_file, buffer=0, density='Dense', outdir='output', logger=None,
+                 stream_chunksize=None, course_roll_file=None, packing='greedy', pack_time_budget=0.2, dates=None,
+                 memory_budget_mb=None, archive=False, seat_layout=False, memory_plan=None):
         self.input_file = input_file
         self.buffer = int(buffer)
         self.density = density  # 'Dense' or 'Sparse' (case-insensitive)
         self.outdir = outdir
         self.logger = logger
+        # streaming ingestion of in_course_roll_mapping (None = read whole sheet)
+        self.stream_chunksize = stream_chunksize
+        # optional .xlsx/.csv/.parquet holding the course-roll mapping (default: input_file)
+        self.course_roll_file = course_roll_file
+        # room packing per slot: 'greedy' (largest free room first) or 'optimize'
+        # (best-fit decreasing + local search within pack_time_budget seconds per slot)
+        if packing not in PACKING_MODES:
+            raise ValueError(f"packing must be one of {PACKING_MODES}")
+        self.packing = packing
+        self.pack_time_budget = float(pack_time_budget)
+        self.packing_report = []  # one row per slot: rooms used vs greedy (optimize mode)
+        # optional subset of timetable dates to allocate (date part, e.g. '2016-05-01');
+        # used by sharded runs (sharding.py), None = the whole timetable
+        self.dates = None if dates is None else {str(d).split()[0] for d in dates}
+        # memory budget (MB): load_inputs pre-scans the inputs and switches on bounded
+        # strategies when the estimate exceeds it (see memory_budget.py); archive: the
+        # caller buffers a zip of outdir (Streamlit app), which counts towards the budget;
+        # memory_plan: a MemoryPlan already made by a coordinator (sharded runs), applied
+        # as is so worker processes never pre-scan the workbook
+        self.memory_budget_mb = memory_budget_mb
+        self.archive = archive
+        self.memory_plan = memory_plan
+        self.streaming_writers = False  # op_overall written row by row
+        self.release_slots = False      # PDFs grouped per slot, allocations released after
+        # seat numbers inside rooms (seat_layout.py); switched on as well by an
+        # in_room_layout sheet (Room No., Rows, Columns) in the input workbook
+        self.seat_layout = seat_layout
+        self.layout_report = []  # one row per (slot, room): students, seats, conflicting seats
 
         # loaded data
         self.sheets = {}
@@ -36,6 +139,8 @@ class SeatingAllocator:
         self.course_roll_map = None  # dataframe from in_course_roll_mapping
         self.roll_name_map = {}  # roll -> name
         self.subject_rolls = defaultdict(list)  # course_code -> [rollno, ...]
+        self.roll_courses = defaultdict(list)  # rollno -> [course_code, ...]
+        self.roster = None  # Roster built from the loaded rolls (see roster.py)
         self.room_capacity = []  # list of dicts with building, room_code, capacity, capacity_effective
         self.allocations = defaultdict(list)  # slot_key -> list of allocations
 
@@ -49,133 +154,235 @@ class SeatingAllocator:
            - in_room_capacity (Room No., Exam Capacity, Block [, sparse...])
         """
         try:
-            self.logger.info("Loading Excel input file: %s", self.input_file)
-            self.sheets = read_excel_file(self.input_file, logger=self.logger)
-
-            # -------- in_timetable --------
-            if 'in_timetable' not in self.sheets:
-                raise ValueError("Missing required sheet: in_timetable")
-
-            df_tt = self.sheets['in_timetable']
-            required_cols = ['Date', 'Day', 'Morning', 'Evening']
-            for col in required_cols:
-                if col not in df_tt.columns:
-                    raise ValueError(f"in_timetable missing required column: {col}")
-
-            # build self.timetable as list of dicts (keeps NO EXAM explicitly)
-            self.timetable = []
-            for _, row in df_tt.iterrows():
-                date = str(row['Date']).strip()
-                day = str(row['Day']).strip()
-
-                def parse_cell(raw):
-                    if pd.isna(raw):
-                        return ['NO EXAM']
-                    text = str(raw).strip()
-                    if text.upper() == 'NO EXAM' or text == '':
-                        return ['NO EXAM']
-                    return [s.strip() for s in text.split(';') if s.strip()]
-
-                morning_subjects = parse_cell(row['Morning'])
-                evening_subjects = parse_cell(row['Evening'])
-
-                self.timetable.append({
-                    'Date': date,
-                    'Day': day,
-                    'Morning': morning_subjects,
-                    'Evening': evening_subjects
-                })
-            self.logger.info("Loaded timetable with %d days.", len(self.timetable))
-
-            # -------- in_roll_name_mapping --------
-            if 'in_roll_name_mapping' in self.sheets:
-                df = self.sheets['in_roll_name_mapping']
-                # normalize column names
-                cols = {c.lower(): c for c in df.columns}
-
-                if 'roll' in cols and 'name' in cols:
-                    roll_col, name_col = cols['roll'], cols['name']
-                    for _, r in df.iterrows():
-                        roll = str(r[roll_col]).strip()
-                        name = str(r[name_col]).strip() or "Unknown Name"
-                        if roll:
-                            self.roll_name_map[roll] = name
-                else:
-                    self.logger.warning("'in_roll_name_mapping' missing Roll/Name columns; defaulting names.")
+            if self.memory_budget_mb or self.memory_plan is not None:
+                self._apply_memory_budget()
+            with timed_phase(self.logger, "load_inputs"):
+                self._load_inputs()
+        except Exception as e:
+            self.logger.exception("Error loading inputs: %s", e)
+            raise
 
-                self.logger.info("Loaded %d roll-name entries.", len(self.roll_name_map))
+    def load_shared(self, handle):
+        """load_inputs() for a worker process: attach the inputs a coordinator published
+           with shared_data.SharedInputs.publish() instead of reading the workbook.
+        """
+        from shared_data import SharedInputs
 
+        try:
+            if self.memory_budget_mb or self.memory_plan is not None:
+                self._apply_memory_budget()
+            with timed_phase(self.logger, "load_inputs"):
+                shared = SharedInputs.attach(handle)
+                try:
+                    shared.load_into(self)
+                finally:
+                    shared.close()
+        except Exception as e:
+            self.logger.exception("Error attaching shared inputs: %s", e)
+            raise
+
+    def _apply_memory_budget(self):
+        """Pre-scan the inputs and switch on the bounded strategies the estimate needs
+           (or apply the plan given to the constructor without a pre-scan).
+        """
+        plan = self.memory_plan
+        if plan is None:
+            from memory_budget import prescan, plan_memory
+
+            scan = prescan(self.input_file, self.course_roll_file)
+            plan = plan_memory(scan, float(self.memory_budget_mb), archive=self.archive)
+        if plan.enabled['chunked_ingestion'] and not self.stream_chunksize:
+            self.stream_chunksize = plan.chunksize
+        self.streaming_writers = plan.enabled['streaming_writers']
+        self.release_slots = plan.enabled['release_slots']
+        self.memory_plan = plan
+
+        lines = plan.summary()
+        for line in lines[:-1] if plan.over_budget else lines:
+            self.logger.info(line)
+        if plan.over_budget:
+            self.logger.warning(lines[-1][2:])
+
+    def _load_inputs(self):
+        """Body of load_inputs (timed and error-logged by the caller)."""
+        streaming = bool(self.stream_chunksize)
+        stream_source = self.course_roll_file or self.input_file
+        # in streaming mode the (large) mapping sheet is never parsed as a whole
+        exclude = ('in_course_roll_mapping',) if streaming else ()
+
+        self.logger.info("Loading Excel input file: %s", self.input_file)
+        self.sheets = read_excel_file(self.input_file, logger=self.logger, exclude=exclude)
+
+        # -------- in_timetable --------
+        if 'in_timetable' not in self.sheets:
+            raise ValueError("Missing required sheet: in_timetable")
+
+        df_tt = self.sheets['in_timetable']
+        required_cols = ['Date', 'Day', 'Morning', 'Evening']
+        for col in required_cols:
+            if col not in df_tt.columns:
+                raise ValueError(f"in_timetable missing required column: {col}")
+
+        # build self.timetable as list of dicts (keeps NO EXAM explicitly)
+        self.timetable = []
+        for _, row in df_tt.iterrows():
+            date = str(row['Date']).strip()
+            day = str(row['Day']).strip()
+
+            def parse_cell(raw):
+                if pd.isna(raw):
+                    return ['NO EXAM']
+                text = str(raw).strip()
+                if text.upper() == 'NO EXAM' or text == '':
+                    return ['NO EXAM']
+                return [s.strip() for s in text.split(';') if s.strip()]
+
+            morning_subjects = parse_cell(row['Morning'])
+            evening_subjects = parse_cell(row['Evening'])
+
+            self.timetable.append({
+                'Date': date,
+                'Day': day,
+                'Morning': morning_subjects,
+                'Evening': evening_subjects
+            })
+        self.logger.info("Loaded timetable with %d days.", len(self.timetable))
+        if self.dates is not None:
+            self.timetable = [e for e in self.timetable if e['Date'].split()[0] in self.dates]
+            self.logger.info("Keeping %d of those days (date subset).", len(self.timetable))
+
+        # -------- in_roll_name_mapping --------
+        if 'in_roll_name_mapping' in self.sheets:
+            df = self.sheets['in_roll_name_mapping']
+            # normalize column names
+            cols = {c.lower(): c for c in df.columns}
+
+            if 'roll' in cols and 'name' in cols:
+                roll_col, name_col = cols['roll'], cols['name']
+                rolls = normalize_rolls(df[roll_col])
+                names = df[name_col].astype(str).str.strip().replace('', "Unknown Name")
+                keep = (rolls.notna() & (rolls != '')).to_numpy()
+                self.roll_name_map.update(zip(rolls[keep], names.to_numpy()[keep]))
             else:
-                self.logger.warning("'in_roll_name_mapping' sheet missing; names default to 'Unknown Name'.")
+                self.logger.warning("'in_roll_name_mapping' missing Roll/Name columns; defaulting names.")
+
+            self.logger.info("Loaded %d roll-name entries.", len(self.roll_name_map))
+
+        else:
+            self.logger.warning("'in_roll_name_mapping' sheet missing; names default to 'Unknown Name'.")
 
-            # -------- in_course_roll_mapping --------
+        # -------- in_course_roll_mapping --------
+        if streaming:
+            # build subject_rolls / roll_courses chunk by chunk; the sheet itself is not kept
+            count = 0
+            chunks = iter_sheet_chunks(stream_source, 'in_course_roll_mapping',
+                                       chunksize=int(self.stream_chunksize), logger=self.logger)
+            for n_chunk, chunk in enumerate(chunks, start=1):
+                roll_col, course_col = self._course_roll_columns(chunk)
+                count += self._add_course_rolls(chunk, roll_col, course_col)
+                self.logger.debug("Streamed chunk %d (%d mappings so far)", n_chunk, count)
+        else:
             if 'in_course_roll_mapping' not in self.sheets:
                 raise ValueError("Missing required sheet: in_course_roll_mapping")
             df_map = self.sheets['in_course_roll_mapping']
-            # expected columns: rollno, course_code
-            if not {'rollno', 'course_code'}.issubset({c.lower() for c in df_map.columns}):
-                # try fuzzy match: lowercase mapping
-                cols_lower = {c.lower(): c for c in df_map.columns}
-                if 'rollno' in cols_lower and 'course_code' in cols_lower:
-                    roll_col = cols_lower['rollno']
-                    course_col = cols_lower['course_code']
-                else:
-                    raise ValueError("in_course_roll_mapping must contain columns: rollno, course_code")
-            else:
-                cols_lower = {c.lower(): c for c in df_map.columns}
-                roll_col = cols_lower['rollno']
-                course_col = cols_lower['course_code']
+            roll_col, course_col = self._course_roll_columns(df_map)
 
-            # store df_map for clash checks and also populate subject_rolls
+            # store df_map for reference and also populate subject_rolls
             self.course_roll_map = df_map
-            count = 0
-            for _, r in df_map.iterrows():
-                roll = str(r[roll_col]).strip()
-                subj = str(r[course_col]).strip()
-                if roll and subj:
-                    self.subject_rolls[subj].append(roll)
-                    count += 1
-            self.logger.info("Loaded course-roll mapping: %d mappings, %d distinct subjects.", count, len(self.subject_rolls))
-
-            # -------- in_room_capacity --------
-            if 'in_room_capacity' not in self.sheets:
-                raise ValueError("Missing required sheet: in_room_capacity")
-            df_room = self.sheets['in_room_capacity']
-            # required columns: Room No., Exam Capacity, Block
-            # attempt to find matching names (strip case)
-            col_map = {c.strip().lower(): c for c in df_room.columns}
-            required_room_cols = ['room no.', 'exam capacity', 'block']
-            for rc in required_room_cols:
-                if rc not in col_map:
-                    raise ValueError("in_room_capacity must contain columns: 'Room No.', 'Exam Capacity', 'Block' (case-insensitive)")
-
-            room_col = col_map['room no.']
-            cap_col = col_map['exam capacity']
-            block_col = col_map['block']
-
-            self.room_capacity = []
-            for _, r in df_room.iterrows():
-                room_code = str(r[room_col]).strip()
-                try:
-                    capacity = int(r[cap_col])
-                except Exception:
-                    # try to coerce
-                    capacity = int(float(r[cap_col]))
-                block = str(r[block_col]).strip()
-                eff = self.effective_capacity(capacity)
-                self.room_capacity.append({
-                    'building': block,
-                    'room_code': room_code,
-                    'capacity': capacity,
-                    'capacity_effective': eff
-                })
-            self.logger.info("Loaded %d rooms from in_room_capacity.", len(self.room_capacity))
+            count = self._add_course_rolls(df_map, roll_col, course_col)
+        self.logger.info("Loaded course-roll mapping: %d mappings, %d distinct subjects.", count, len(self.subject_rolls))
+
+        # -------- in_room_capacity --------
+        if 'in_room_capacity' not in self.sheets:
+            raise ValueError("Missing required sheet: in_room_capacity")
+        df_room = self.sheets['in_room_capacity']
+        # required columns: Room No., Exam Capacity, Block
+        # attempt to find matching names (strip case)
+        col_map = {c.strip().lower(): c for c in df_room.columns}
+        required_room_cols = ['room no.', 'exam capacity', 'block']
+        for rc in required_room_cols:
+            if rc not in col_map:
+                raise ValueError("in_room_capacity must contain columns: 'Room No.', 'Exam Capacity', 'Block' (case-insensitive)")
+
+        room_col = col_map['room no.']
+        cap_col = col_map['exam capacity']
+        block_col = col_map['block']
+
+        self.room_capacity = []
+        for _, r in df_room.iterrows():
+            room_code = str(r[room_col]).strip()
+            try:
+                capacity = int(r[cap_col])
+            except Exception:
+                # try to coerce
+                capacity = int(float(r[cap_col]))
+            block = str(r[block_col]).strip()
+            eff = self.effective_capacity(capacity)
+            self.room_capacity.append({
+                'building': block,
+                'room_code': room_code,
+                'capacity': capacity,
+                'capacity_effective': eff
+            })
+        self.logger.info("Loaded %d rooms from in_room_capacity.", len(self.room_capacity))
+
+        # -------- in_room_layout (optional seat grids) --------
+        from seat_layout import LAYOUT_SHEET
+        if LAYOUT_SHEET in self.sheets:
+            self.seat_layout = True
+        if self.seat_layout:
+            self._load_room_grids(self.sheets.get(LAYOUT_SHEET))
+
+        # -------- roster (one row per student, parsed rolls) --------
+        self.roster = Roster.from_rolls(list(self.roll_name_map) + list(self.roll_courses),
+                                        names=self.roll_name_map)
+        self.logger.info("Roster: %d students in %d branches.",
+                         len(self.roster), len(self.roster.branch.categories))
+
+        self.logger.info("All required sheets loaded successfully.")
+
+    def _load_room_grids(self, df_layout):
+        """Attach a (rows, columns) seat grid to every room: from in_room_layout when it
+           lists the room, else a default grid for its capacity. Rooms never take more
+           students than their grid has seats.
+        """
+        from seat_layout import read_room_layouts, default_grid
+
+        layouts = read_room_layouts(df_layout) if df_layout is not None else {}
+        for r in self.room_capacity:
+            rows, cols = layouts.get(r['room_code']) or default_grid(r['capacity'])
+            r['grid'] = (rows, cols)
+            if r['capacity_effective'] > rows * cols:
+                self.logger.warning("Room %s: %d seats in its %dx%d grid, capacity %d reduced to match",
+                                    r['room_code'], rows * cols, rows, cols, r['capacity_effective'])
+                r['capacity_effective'] = rows * cols
+        self.logger.info("Seat layout on: %d of %d rooms have a grid in the workbook.",
+                         sum(r['room_code'] in layouts for r in self.room_capacity), len(self.room_capacity))
 
-            self.logger.info("All required sheets loaded successfully.")
+    # ---------------------------------------------------------------------
+    @staticmethod
+    def _course_roll_columns(df_map):
+        """Return the actual (rollno, course_code) column names (case-insensitive)."""
+        cols_lower = {str(c).strip().lower(): c for c in df_map.columns}
+        if 'rollno' not in cols_lower or 'course_code' not in cols_lower:
+            raise ValueError("in_course_roll_mapping must contain columns: rollno, course_code")
+        return cols_lower['rollno'], cols_lower['course_code']
+
+    def _add_course_rolls(self, df_map, roll_col, course_col):
+        """Add one block of mapping rows to subject_rolls and roll_courses; return rows added."""
+        df_map = df_map[[roll_col, course_col]].dropna()
+        rolls = normalize_rolls(df_map[roll_col])
+        subjects = df_map[course_col].astype(str).str.strip()
+        count = 0
+        for roll, subj in zip(rolls, subjects):
+            if roll and subj:
+                # one string object per student / course instead of one per mapping row
+                roll, subj = sys.intern(roll), sys.intern(subj)
+                self.subject_rolls[subj].append(roll)
+                self.roll_courses[roll].append(subj)
+                count += 1
+        return count
 
-        except Exception as e:
-            self.logger.exception("Error loading inputs: %s", e)
-            raise
     # ---------------------------------------------------------------------
     def effective_capacity(self, capacity):
         """Return adjusted capacity based on buffer and density type."""
@@ -191,18 +398,9 @@ class SeatingAllocator:
     def check_clashes(self):
         """Check if any student (rollno) appears in multiple courses on same date + slot."""
         try:
-            if self.course_roll_map is None:
+            if self.course_roll_map is None and not self.subject_rolls:
                 raise ValueError("course_roll_map not loaded; cannot check clashes.")
 
-            # Normalize names for lookups
-            df_map = self.course_roll_map
-            # find actual column names
-            cols_lower = {c.lower(): c for c in df_map.columns}
-            roll_col = cols_lower.get('rollno', None)
-            course_col = cols_lower.get('course_code', None)
-            if not roll_col or not course_col:
-                raise ValueError("in_course_roll_mapping must contain rollno and course_code columns")
-
             conflict_found = False
 
             for entry in self.timetable:
@@ -211,15 +409,12 @@ class SeatingAllocator:
                     if subjects == ['NO EXAM']:
                         continue
 
-                    # map subject -> set(rolls)
+                    # map subject -> set(rolls); subject_rolls is filled in both
+                    # the in-memory and the streaming ingestion path
                     subj_rolls = {}
                     for subj in subjects:
                         subj = str(subj).strip()
-                        rolls = set(
-                            str(x).strip()
-                            for x in df_map.loc[df_map[course_col].astype(str).str.strip() == subj, roll_col].dropna()
-                        )
-                        subj_rolls[subj] = rolls
+                        subj_rolls[subj] = set(self.subject_rolls.get(subj, []))
 
                     # pairwise intersection
                     subjects_list = list(subj_rolls.keys())
@@ -229,9 +424,12 @@ class SeatingAllocator:
                             inter = subj_rolls[a] & subj_rolls[b]
                             if inter:
                                 conflict_found = True
-                                for r in inter:
-                                    msg = f"Clash on {date} {slot_name}: {a} & {b} -> {r}"
-                                    self.logger.error(msg)
+                                # one summary per subject pair; the full roll list only at DEBUG
+                                rolls = sorted(inter)
+                                self.logger.error("Clash on %s %s: %s & %s -> %d students (e.g. %s)",
+                                                  date, slot_name, a, b, len(rolls), ", ".join(rolls[:5]))
+                                self.logger.debug("Clash on %s %s: %s & %s rolls: %s",
+                                                  date, slot_name, a, b, ", ".join(rolls))
 
             if conflict_found:
                 print("⚠️ Clash detected — check log for details.")
@@ -256,25 +454,91 @@ class SeatingAllocator:
             # sort rooms by remaining effective capacity descending (to minimize number of rooms used)
             sorted_rooms = sorted(room_pool, key=lambda r: r.get('capacity_effective', 0), reverse=True)
 
-            for room in sorted_rooms:
-                if not pending:
-                    break
-                cap = int(room.get('capacity_effective', 0))
-                if cap <= 0:
-                    continue
-                take = min(len(pending), cap)
-                to_assign = pending[:take]
-                pending = pending[take:]
-                assignments.append({
-                    'building': room.get('building'),
-                    'room': room.get('room_code'),
-                    'rolls': to_assign
-                })
+            # seat_layout: a first pass fills at most half of each room's seats (one colour
+            # of the seat chessboard) so the subject only sits next to other subjects; the
+            # rest of the room is used only if the subject does not fit otherwise
+            passes = (True, False) if self.seat_layout else (False,)
+            placed = {}  # id(room) -> index in assignments
+            for capped in passes:
+                for room in sorted_rooms:
+                    if not pending:
+                        break
+                    i = placed.get(id(room))
+                    used = len(assignments[i]['rolls']) if i is not None else 0
+                    cap = int(room.get('capacity_effective', 0)) - used
+                    if capped and 'grid' in room:
+                        rows, cols = room['grid']
+                        cap = min(cap, (rows * cols + 1) // 2 - used)
+                    if cap <= 0:
+                        continue
+                    take = min(len(pending), cap)
+                    to_assign = pending[:take]
+                    pending = pending[take:]
+                    if i is not None:
+                        assignments[i]['rolls'] = assignments[i]['rolls'] + to_assign
+                        continue
+                    placed[id(room)] = len(assignments)
+                    assignments.append({
+                        'building': room.get('building'),
+                        'room': room.get('room_code'),
+                        'rolls': to_assign
+                    })
             return assignments, pending
         except Exception as e:
             self.logger.exception("Error in allocate_subject for %s: %s", subject, e)
             raise
     # ---------------------------------------------------------------------
+    def _pack_slot(self, date, slot_name, subjects_sizes, room_pool):
+        """Plan every subject of one slot with room_packing.optimized_pack.
+           Returns {subject: (assignments, leftover)} in allocate_subject's format,
+           or None when the rooms cannot seat the slot (greedy then reports it).
+        """
+        from room_packing import optimized_pack
+
+        subjects = [str(s).strip() for s, _ in subjects_sizes]
+        sizes = [len(self.subject_rolls.get(s, [])) for s in subjects]
+        capacities = [int(r.get('capacity_effective', 0)) for r in room_pool]
+        buildings = [r.get('building') for r in room_pool]
+        subject_caps = None
+        if self.seat_layout:
+            # as allocate_subject: one colour of the seat chessboard per subject and room
+            subject_caps = [min(c, (r['grid'][0] * r['grid'][1] + 1) // 2) if 'grid' in r else c
+                            for r, c in zip(room_pool, capacities)]
+        plan, info = optimized_pack(sizes, capacities, buildings, time_budget=self.pack_time_budget,
+                                    subject_caps=subject_caps)
+
+        self.packing_report.append({
+            'Date': str(date).split()[0],
+            'Slot': slot_name,
+            'Students': sum(sizes),
+            'Rooms (greedy)': info['rooms_greedy'],
+            'Rooms (packed)': info['rooms_packed'],
+            'Rooms (lower bound)': info['lower_bound'],
+            'Greedy kept': info['fallback'],
+            'Time (ms)': round(info['seconds'] * 1000, 2),
+        })
+        self.logger.info("Packed %s %s into %d rooms (greedy %d, lower bound %s) in %.1f ms",
+                         date, slot_name, info['rooms_packed'], info['rooms_greedy'],
+                         info['lower_bound'], info['seconds'] * 1000)
+        if plan is None:
+            return None
+
+        result = {}
+        for subj, pieces in zip(subjects, plan):
+            rolls = self.subject_rolls.get(subj, [])
+            assignments, pos = [], 0
+            for r, count in pieces:
+                room = room_pool[r]
+                assignments.append({
+                    'building': room.get('building'),
+                    'room': room.get('room_code'),
+                    'rolls': rolls[pos:pos + count],
+                })
+                pos += count
+            result[subj] = (assignments, rolls[pos:])
+        return result
+
+    # ---------------------------------------------------------------------
     def allocate_all_days(self):
         """Iterate through timetable and allocate all subjects in each slot to rooms."""
         try:
@@ -319,6 +583,12 @@ class SeatingAllocator:
                     subjects_sizes = [(s, len(self.subject_rolls.get(s, []))) for s in subjects]
                     subjects_sizes.sort(key=lambda x: x[1], reverse=True)
 
+                    # optimize mode plans the whole slot at once (None -> per-subject greedy)
+                    slot_plan = None
+                    if self.packing == 'optimize':
+                        slot_plan = self._pack_slot(date, slot_name, subjects_sizes, room_pool)
+
+                    slot_subjects = []  # (subject, its allocation records) in allocation order
                     for subj, size in subjects_sizes:
                         subj = str(subj).strip()
                         rolls = self.subject_rolls.get(subj, [])
@@ -333,7 +603,10 @@ class SeatingAllocator:
                             continue
 
                         # allocate this subject into room_pool
-                        assignments, leftover = self.allocate_subject(subj, rolls, room_pool)
+                        if slot_plan is not None:
+                            assignments, leftover = slot_plan[subj]
+                        else:
+                            assignments, leftover = self.allocate_subject(subj, rolls, room_pool)
                         if leftover:
                             # Not enough capacity in this slot across all rooms
                             msg = f"Cannot allocate {len(leftover)} students for {subj} on {date} {slot_name}"
@@ -341,6 +614,7 @@ class SeatingAllocator:
                             raise RuntimeError("Cannot allocate due to excess students across rooms")
 
                         # update room_pool capacities and record allocations
+                        subject_allocs = []
                         for a in assignments:
                             # deduct capacity
                             for r in room_pool:
@@ -350,7 +624,7 @@ class SeatingAllocator:
 
                             # register allocation in master dict
                             slot_key = f"{date}_{slot_name}"
-                            self.allocations[slot_key].append({
+                            record = {
                                 'date': date,
                                 'day': day,
                                 'slot': slot_name,
@@ -358,22 +632,18 @@ class SeatingAllocator:
                                 'building': a['building'],
                                 'room': a['room'],
                                 'rolls': a['rolls']
-                            })
+                            }
+                            self.allocations[slot_key].append(record)
+                            subject_allocs.append(record)
+                        slot_subjects.append((subj, subject_allocs))
 
-                        # write subject file inside the slot folder (one xlsx per subject)
-                        try:
-                            rows = []
-                            for a in assignments:
-                                rows.append({
-                                    'Room': a['room'],
-                                    'Rolls (semicolon separated)': ';'.join(a['rolls']),
-                                    'Count': len(a['rolls'])
-                                })
-                            df_sub = pd.DataFrame(rows)
-                            out_path = os.path.join(slot_folder, f"{subj}.xlsx")
-                            df_sub.to_excel(out_path, index=False)
-                        except Exception:
-                            self.logger.exception("Failed to write subject file for %s in %s", subj, slot_folder)
+                    # seat numbers need every subject of the slot in place
+                    if self.seat_layout:
+                        self._layout_slot(date, slot_name, [a for _, allocs in slot_subjects for a in allocs])
+
+                    # write subject files inside the slot folder (one xlsx per subject)
+                    for subj, subject_allocs in slot_subjects:
+                        self._write_subject_file(slot_folder, subj, subject_allocs)
 
                     self.logger.info("Allocated slot %s for date %s (subjects: %s)", slot_name, date, ','.join(subjects))
 
@@ -381,29 +651,88 @@ class SeatingAllocator:
             self.logger.exception("Error allocating all days: %s", e)
             raise
 
+    def _write_subject_file(self, slot_folder, subj, subject_allocs):
+        """<slot folder>/<subject>.xlsx: one row per room (plus seats with seat_layout)."""
+        try:
+            rows = []
+            for a in subject_allocs:
+                row = {
+                    'Room': a['room'],
+                    'Rolls (semicolon separated)': ';'.join(a['rolls']),
+                    'Count': len(a['rolls'])
+                }
+                if 'seats' in a:
+                    row['Seats (semicolon separated)'] = ';'.join(a['seats'])
+                rows.append(row)
+            df_sub = pd.DataFrame(rows)
+            out_path = os.path.join(slot_folder, f"{subj}.xlsx")
+            df_sub.to_excel(out_path, index=False)
+        except Exception:
+            self.logger.exception("Failed to write subject file for %s in %s", subj, slot_folder)
+
+    def _layout_slot(self, date, slot_name, slot_allocs):
+        """Give every allocation of one slot its seat labels (a['seats'], aligned with
+           a['rolls']): per room, subjects are interleaved so that no student sits next
+           to (or in front of / behind) someone writing the same subject.
+        """
+        from seat_layout import layout_room, seats_of
+
+        grids = {(r['building'], r['room_code']): r['grid'] for r in self.room_capacity}
+        by_room = defaultdict(list)
+        for a in slot_allocs:
+            by_room[(a['building'], a['room'])].append(a)
+
+        conflicting = 0
+        for (building, room), allocs in by_room.items():
+            rows, cols = grids[(building, room)]
+            grid, bad = layout_room([len(a['rolls']) for a in allocs], rows, cols)
+            for i, a in enumerate(allocs):
+                a['seats'] = seats_of(grid, i)
+            conflicting += bad
+            self.layout_report.append({
+                'Date': str(date).split()[0],
+                'Slot': slot_name,
+                'Block': building,
+                'Room': room,
+                'Grid': f"{rows}x{cols}",
+                'Subjects': len(allocs),
+                'Students': sum(len(a['rolls']) for a in allocs),
+                'Conflicting seats': bad,
+            })
+        if conflicting:
+            # only when one subject fills more than half of a room's seats
+            self.logger.warning("Seat layout %s %s: %d students sit next to the same subject",
+                                date, slot_name, conflicting)
+
     # ---------------------------------------------------------------------
     def write_outputs(self):
         """Write:
         1) master overall seating file
         2) per-day, per-slot seats-left file (multi-sheet XLSX)
+        3) seat_index.sqlite for per-student / per-room lookups
         """
         try:
             # -------- 1. Overall seating arrangement (same as before) ----------
-            rows = []
-            for slot_key, allocs in self.allocations.items():
-                for a in allocs:
-                    rows.append({
-                        "Date": a["date"],
-                        "Day": a.get("day", ""),
-                        "course_code": a["subject"],
-                        "Room": a["room"],
-                        "Allocated_students_count": len(a["rolls"]),
-                        "Roll_list (semicolon separated)": ";".join(a["rolls"]),
-                    })
+            def overall_rows():
+                for slot_key, allocs in self.allocations.items():
+                    for a in allocs:
+                        yield {
+                            "Date": a["date"],
+                            "Day": a.get("day", ""),
+                            "course_code": a["subject"],
+                            "Room": a["room"],
+                            "Allocated_students_count": len(a["rolls"]),
+                            "Roll_list (semicolon separated)": ";".join(a["rolls"]),
+                        }
 
-            df_overall = pd.DataFrame(rows)
             op1 = os.path.join(self.outdir, "op_overall_seating_arrangement.xlsx")
-            df_overall.to_excel(op1, index=False)
+            if self.streaming_writers:
+                columns = ["Date", "Day", "course_code", "Room", "Allocated_students_count",
+                           "Roll_list (semicolon separated)"]
+                write_output_excel_streaming(op1, columns, overall_rows())
+            else:
+                df_overall = pd.DataFrame(list(overall_rows()))
+                df_overall.to_excel(op1, index=False)
 
             # -------- 2. Seats left: per date & slot in one workbook ----------
 
@@ -454,20 +783,60 @@ class SeatingAllocator:
 
             self.logger.info("Wrote output files: %s and %s", op1, op2)
 
+            # seats per room and slot (seat_layout only)
+            if self.layout_report:
+                op4 = os.path.join(self.outdir, "op_seat_layout_report.xlsx")
+                pd.DataFrame(self.layout_report).to_excel(op4, index=False)
+                self.logger.info("Wrote seat layout report: %s", op4)
+
+            # rooms used per slot, optimized vs greedy (packing='optimize' only)
+            if self.packing_report:
+                op3 = os.path.join(self.outdir, "op_packing_report.xlsx")
+                pd.DataFrame(self.packing_report).to_excel(op3, index=False)
+                self.logger.info("Wrote packing report: %s", op3)
+
+            # -------- 3. Seat lookup index (roll/room queries without spreadsheets) ----------
+            from seat_index import SEAT_INDEX_FILE, write_seat_index
+            write_seat_index(
+                os.path.join(self.outdir, SEAT_INDEX_FILE),
+                self.allocations,
+                roll_to_name=self.roll_name_map,
+                logger=self.logger,
+            )
+
         except Exception as e:
             self.logger.exception("Error writing outputs: %s", e)
             raise
 
         # ---------------------------------------------------------------------
         # ---------------------------------------------------------------------
-    def generate_attendance_pdfs(self, photos_dir, no_image_icon, pdf_outdir=None):
+    def generate_attendance_pdfs(self, photos_dir, no_image_icon, pdf_outdir=None, booklet=None,
+                                 photo_bundle=None):
         """
         Generate one attendance PDF per (date, slot, room, subject).
 
         photos_dir: folder containing ROLL.jpg (e.g. 'photos/')
         no_image_icon: path to generic 'no image available' icon
         pdf_outdir: root folder for PDFs (default: <self.outdir>/attendance)
+        booklet: None (one file per sheet), 'slot' (one booklet per date + slot) or
+                 'building' (one booklet per date + slot + building)
+        photo_bundle: optional bundle built by photo_bundle.py; photos are then read
+                      from one memory-mapped file instead of photos_dir
+        With release_slots (set by a memory budget) self.allocations is emptied slot by
+        slot as the PDFs are written, so this must be the last step of a run.
         """
+        if booklet is not None and booklet not in BOOKLET_MODES:
+            raise ValueError(f"booklet must be one of {BOOKLET_MODES} or None")
+        if photo_bundle is None:
+            return self._write_attendance_pdfs(photos_dir, no_image_icon, pdf_outdir, booklet, None)
+
+        from photo_bundle import PhotoBundle
+        with PhotoBundle(photo_bundle) as bundle:
+            self.logger.info("Reading %d photos from bundle %s", len(bundle), photo_bundle)
+            return self._write_attendance_pdfs(photos_dir, no_image_icon, pdf_outdir, booklet, bundle)
+
+    def _write_attendance_pdfs(self, photos_dir, no_image_icon, pdf_outdir, booklet, bundle):
+        """Body of generate_attendance_pdfs (bundle: open PhotoBundle or None)."""
         # Decide where PDFs will be stored
         if pdf_outdir is None:
             pdf_outdir = os.path.join(self.outdir, "attendance")
@@ -477,10 +846,56 @@ class SeatingAllocator:
 
         self.logger.info("Generating attendance PDFs in %s", pdf_outdir)
 
-        # Group allocations by (date, slot, room, subject)
-        grouped = {}  # key -> list of rolls
-        for slot_key, allocs in self.allocations.items():
+        def _sanitize(s: str) -> str:
+            """Remove characters not allowed in Windows filenames."""
+            bad = '<>:"/\\|?*'
+            for ch in bad:
+                s = s.replace(ch, "_")
+            return s.replace(" ", "_")
+
+        # one file per sheet, or per booklet: (date, slot[, building])
+        units = set()
+        for allocs in self.allocations.values():
             for a in allocs:
+                if booklet:
+                    building = (str(a.get("building")),) if booklet == "building" else ()
+                    units.add((str(a["date"]), str(a["slot"])) + building)
+                else:
+                    units.add((str(a["date"]), str(a["slot"]), str(a["room"]), str(a["subject"])))
+        progress = ProgressLog(self.logger, "Attendance booklets" if booklet else "Attendance PDFs",
+                               total=len(units))
+
+        # release_slots (memory budget): group, render and drop one slot at a time
+        batches = [[k] for k in self.allocations] if self.release_slots else [list(self.allocations)]
+        sheets = 0
+        for slot_keys in batches:
+            grouped, room_building, seat_maps = self._group_sheets(slot_keys)
+            sheets += len(grouped)
+            if booklet:
+                self._generate_booklets(grouped, room_building, booklet, photos_dir, no_image_icon,
+                                        pdf_outdir, _sanitize, bundle, progress, seat_maps)
+            else:
+                self._generate_sheet_pdfs(grouped, photos_dir, no_image_icon, pdf_outdir, _sanitize,
+                                          bundle, progress, seat_maps)
+            if self.release_slots:
+                for slot_key in slot_keys:
+                    del self.allocations[slot_key]
+
+        progress.done()
+        if booklet:
+            self.logger.info("Finished generating all attendance booklets (%d sheets).", sheets)
+        else:
+            self.logger.info("Finished generating all attendance PDFs.")
+
+    def _group_sheets(self, slot_keys):
+        """Group the allocations of these slots by (date, slot, room, subject).
+           Returns (key -> list of rolls, room -> building, key -> {roll: seat}).
+        """
+        grouped = {}  # key -> list of rolls
+        room_building = {}  # room -> building (for booklets per building)
+        seat_maps = {}  # key -> {roll: seat label} (seat_layout only)
+        for slot_key in slot_keys:
+            for a in self.allocations[slot_key]:
                 key = (
                     str(a["date"]),
                     str(a["slot"]),
@@ -488,13 +903,15 @@ class SeatingAllocator:
                     str(a["subject"]),
                 )
                 grouped.setdefault(key, []).extend(a["rolls"])
+                room_building.setdefault(str(a["room"]), str(a.get("building")))
+                if "seats" in a:
+                    seat_maps.setdefault(key, {}).update(zip(a["rolls"], a["seats"]))
+        return grouped, room_building, seat_maps
 
-        def _sanitize(s: str) -> str:
-            """Remove characters not allowed in Windows filenames."""
-            bad = '<>:"/\\|?*'
-            for ch in bad:
-                s = s.replace(ch, "_")
-            return s.replace(" ", "_")
+    def _generate_sheet_pdfs(self, grouped, photos_dir, no_image_icon, pdf_outdir, _sanitize,
+                             bundle, progress, seat_maps=None):
+        """One PDF per (date, slot, room, subject): YYYY_MM_DD_<SESSION>_<ROOM>_<SUBCODE>.pdf"""
+        from attendance_pdf import build_attendance_pdf
 
         for (date, slot, room, subj), rolls in grouped.items():
             # Keep order but also ensure unique
@@ -533,14 +950,72 @@ class SeatingAllocator:
                     photos_dir=photos_dir,
                     no_image_icon=no_image_icon,
                     logger=self.logger,
+                    photo_bundle=bundle,
+                    seats=(seat_maps or {}).get((date, slot, room, subj)),
                 )
-                self.logger.info("Created attendance PDF: %s", out_path)
+                progress.tick()
             except Exception:
                 # Don't stop the whole run; just log and continue.
                 self.logger.error(
                     "Error while generating attendance for %s %s %s %s",
                     date, slot, room, subj,
                 )
+                progress.tick(ok=False)
                 continue
 
-        self.logger.info("Finished generating all attendance PDFs.")
\ No newline at end of file
+    def _generate_booklets(self, grouped, room_building, booklet, photos_dir, no_image_icon,
+                           pdf_outdir, sanitize, bundle, progress, seat_maps=None):
+        """One PDF per (date, slot[, building]) with a bookmark per room and subject:
+           YYYY_MM_DD_<SESSION>[_<BUILDING>].pdf
+        """
+        from attendance_pdf import build_attendance_booklet
+
+        booklets = {}  # (date, slot[, building]) -> list of sheets
+        for (date, slot, room, subj), rolls in grouped.items():
+            building = room_building.get(room, "")
+            key = (date, slot, building) if booklet == "building" else (date, slot)
+            date_clean = str(date).split()[0]
+            booklets.setdefault(key, []).append({
+                "building": building,
+                "date_str": date_clean,
+                "shift": slot,
+                "room_no": room,
+                "subject_code": subj,
+                "subject_name": subj,
+                "roll_list": list(dict.fromkeys(rolls)),
+                "seats": (seat_maps or {}).get((date, slot, room, subj)),
+            })
+
+        if self.memory_plan is not None:
+            from memory_budget import booklet_mb
+            largest = max((sum(len(sh["roll_list"]) for sh in sheets) for sheets in booklets.values()), default=0)
+            if booklet_mb(largest) > self.memory_plan.budget_mb / 2:
+                self.logger.warning("A booklet of %d students needs about %.0f MB of the %.0f MB budget; "
+                                    "booklet='building' or one PDF per room keeps PDFs smaller",
+                                    largest, booklet_mb(largest), self.memory_plan.budget_mb)
+
+        for key, sheets in booklets.items():
+            # rooms together (building, room order of first use), subjects in allocation order
+            first_use = {}
+            for sheet in sheets:
+                first_use.setdefault((sheet["building"], sheet["room_no"]), len(first_use))
+            sheets.sort(key=lambda sh: first_use[(sh["building"], sh["room_no"])])
+
+            date_sanitized = str(key[0]).split()[0].replace("-", "_").replace("/", "_")
+            filename = sanitize("_".join([date_sanitized] + list(key[1:])) + ".pdf")
+            out_path = os.path.join(pdf_outdir, filename)
+            try:
+                build_attendance_booklet(
+                    out_path=out_path,
+                    sheets=sheets,
+                    roll_to_name=self.roll_name_map,
+                    photos_dir=photos_dir,
+                    no_image_icon=no_image_icon,
+                    logger=self.logger,
+                    photo_bundle=bundle,
+                )
+                progress.tick()
+            except Exception:
+                # Don't stop the whole run; just log and continue.
+                self.logger.error("Error while generating attendance booklet %s", " ".join(key))
+                progress.tick(ok=False)
\ No newline at end of file
@@ -0,0 +1,241 @@
+#headless command-line runner for the seating pipeline (no Streamlit needed)
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from logging_setup import setup_logging, close_logger, start_queue_listener
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_one(job):
+    """Run the full pipeline for one workbook. Returns a JSON-friendly result dict.
+       Runs inside a worker process, so every run gets its own logger and output folder.
+    """
+    from seating_allocator import SeatingAllocator
+
+    outdir = job["outdir"]
+    os.makedirs(outdir, exist_ok=True)
+    logfile = os.path.join(outdir, "seating.log")
+    logger = setup_logging(logfile=logfile, name=f"seating.{job['run_id']}", console=False,
+                           parent_queue=job.get("log_queue"))
+
+    result = {
+        "input": job["input"],
+        "outdir": outdir,
+        "log": logfile,
+        "status": "ok",
+        "error": None,
+    }
+    sampler = None
+    if job.get("profile"):
+        from profiler import StackSampler
+        sampler = StackSampler(job.get("profile_interval", 0.01)).start()
+    start = time.perf_counter()
+    try:
+        alloc = SeatingAllocator(
+            input_file=job["input"],
+            buffer=job["buffer"],
+            density=job["density"],
+            outdir=outdir,
+            logger=logger,
+            stream_chunksize=job.get("stream_chunksize"),
+            packing=job.get("packing", "greedy"),
+            pack_time_budget=job.get("pack_time_budget", 0.2),
+            memory_budget_mb=job.get("memory_budget_mb"),
+            seat_layout=job.get("seat_layout", False),
+        )
+        alloc.load_inputs()
+        if alloc.memory_plan is not None:
+            result["memory_plan"] = alloc.memory_plan.as_dict()
+        if job.get("exam_load"):
+            from exam_load import analyze
+            load = analyze(alloc, window_days=job.get("load_window", 3), max_exams=job.get("load_max", 2))
+            load.write(os.path.join(outdir, "op_exam_load.xlsx"))
+            counts = load.summary()
+            result["exam_load"] = dict(zip(counts["Metric"], counts["Students"].tolist()))
+            logger.info("Exam load: %s", result["exam_load"])
+        pdf = None
+        if not job.get("no_pdf"):
+            photos_dir = job["photos_dir"]
+            pdf = {"photos_dir": photos_dir,
+                   "no_image_icon": os.path.join(photos_dir, "no_image_available.jpg"),
+                   "booklet": job.get("booklet"), "photo_bundle": job.get("photo_bundle")}
+        if job.get("shards", 1) > 1:
+            # date-range shards on worker processes, merged into outdir (see sharding.py)
+            from sharding import run_sharded
+            shards = run_sharded(alloc, job["shards"], workers=job.get("shard_workers"), pdf=pdf,
+                                 log_queue=job.get("log_queue"), profiler=sampler)
+            result["shards"] = [{"dates": r["dates"], "seconds": r["seconds"]} for r in shards]
+            _count_seats(result, alloc)
+        else:
+            alloc.allocate_all_days()
+            alloc.write_outputs()
+            _count_seats(result, alloc)  # PDFs may release allocations (memory budget)
+            if pdf is not None:
+                alloc.generate_attendance_pdfs(**pdf)
+    except Exception as e:
+        logger.exception("Run failed for %s", job["input"])
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        if sampler is not None:
+            from profiler import PROFILE_FILE
+            sampler.stop().write(os.path.join(outdir, PROFILE_FILE))
+            result["profile"] = dict(sampler.as_dict(), file=os.path.join(outdir, PROFILE_FILE))
+            logger.info("Profile: %s", sampler.summary())
+        close_logger(logger)
+    return result
+
+
+def _count_seats(result, alloc):
+    result["slots"] = len(alloc.allocations)
+    result["students_seated"] = sum(len(a["rolls"]) for allocs in alloc.allocations.values() for a in allocs)
+
+
+def build_jobs(args):
+    """One job per input workbook; each gets its own folder under --outdir."""
+    jobs = []
+    used = set()
+    for i, path in enumerate(args.input):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        run_id = stem if stem not in used else f"{stem}_{i}"
+        used.add(run_id)
+        outdir = args.outdir if len(args.input) == 1 else os.path.join(args.outdir, run_id)
+        jobs.append({
+            "run_id": run_id,
+            "input": os.path.abspath(path),
+            "outdir": os.path.abspath(outdir),
+            "buffer": args.buffer,
+            "density": args.density,
+            "photos_dir": os.path.abspath(args.photos),
+            "no_pdf": args.no_pdf,
+            "stream_chunksize": args.stream_chunksize,
+            "booklet": args.booklet,
+            "packing": args.packing,
+            "shards": args.shards,
+            "memory_budget_mb": args.memory_budget,
+            "seat_layout": args.seat_layout,
+            "exam_load": args.exam_load,
+            "load_window": args.load_window,
+            "load_max": args.load_max,
+            "profile": args.profile,
+            "profile_interval": args.profile_interval / 1000,
+            "shard_workers": args.workers,
+            "pack_time_budget": args.pack_time_budget,
+            "photo_bundle": os.path.abspath(args.photo_bundle) if args.photo_bundle else None,
+        })
+    return jobs
+
+
+def run_batch(jobs, workers=1, verbose=False):
+    """Run jobs (in input order in the summary); workers > 1 uses a process pool.
+       verbose: INFO records of every run (including worker processes) are sent
+       through one queue and printed to stderr by this process.
+    """
+    if not verbose:
+        return _run_jobs(jobs, workers)
+
+    # sharded runs start their own worker processes, which need a process-safe queue
+    sharded = any(job.get("shards", 1) > 1 for job in jobs)
+    in_process = (workers <= 1 or len(jobs) == 1) and not sharded
+    manager = None if in_process else multiprocessing.Manager()
+    log_queue = queue.SimpleQueue() if in_process else manager.Queue()
+    listener = start_queue_listener(log_queue)
+    try:
+        return _run_jobs([dict(job, log_queue=log_queue) for job in jobs], workers)
+    finally:
+        listener.stop()
+        if manager is not None:
+            manager.shutdown()
+
+
+def _run_jobs(jobs, workers):
+    if workers <= 1 or len(jobs) == 1:
+        return [run_one(job) for job in jobs]
+
+    results = [None] * len(jobs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, job): i for i, job in enumerate(jobs)}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:  # worker crashed before it could report
+                results[i] = {"input": jobs[i]["input"], "outdir": jobs[i]["outdir"],
+                              "status": "failed", "error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate exam seating arrangements without the UI.")
+    parser.add_argument("--input", nargs="+", required=True, help="one or more input Excel workbooks")
+    parser.add_argument("--buffer", type=int, default=0, help="buffer seats per room")
+    parser.add_argument("--density", choices=["Dense", "Sparse"], default="Dense")
+    parser.add_argument("--outdir", default="output", help="output folder (one sub-folder per workbook)")
+    parser.add_argument("--photos", default=os.path.join(HERE, "photos"), help="folder with ROLL.jpg photos")
+    parser.add_argument("--no-pdf", action="store_true", help="skip attendance PDFs")
+    parser.add_argument("--photo-bundle", default=None,
+                        help="read photos from this bundle (see photo_bundle.py) instead of --photos")
+    parser.add_argument("--booklet", choices=["slot", "building"], default=None,
+                        help="one attendance PDF per slot (or per building per slot) with bookmarks")
+    parser.add_argument("--packing", choices=["greedy", "optimize"], default="greedy",
+                        help="room packing per slot: greedy, or optimize (fewest rooms)")
+    parser.add_argument("--pack-time-budget", type=float, default=0.2,
+                        help="seconds of local search per slot with --packing optimize")
+    parser.add_argument("--seat-layout", action="store_true",
+                        help="assign seat numbers, interleaving subjects inside rooms "
+                             "(always on when the workbook has an in_room_layout sheet)")
+    parser.add_argument("--exam-load", action="store_true",
+                        help="write op_exam_load.xlsx: same-slot clashes, two exams a day, back-to-back "
+                             "slots and busy windows per student")
+    parser.add_argument("--load-window", type=int, default=3, help="--exam-load rolling window in days")
+    parser.add_argument("--load-max", type=int, default=2,
+                        help="--exam-load flags more exams than this in one window")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="parallel runs (with --shards: parallel shards of each workbook)")
+    parser.add_argument("--shards", type=int, default=1,
+                        help="split each workbook's timetable into this many date-range shards")
+    parser.add_argument("--stream-chunksize", type=int, default=None,
+                        help="stream in_course_roll_mapping in chunks of this many rows")
+    parser.add_argument("--memory-budget", type=float, default=None, metavar="MB",
+                        help="memory budget per run; bounded-memory modes are chosen to fit it")
+    parser.add_argument("--profile", action="store_true",
+                        help="sample the run's stacks into <outdir>/profile.collapsed (flamegraph format)")
+    parser.add_argument("--profile-interval", type=float, default=10, metavar="MS",
+                        help="milliseconds between --profile samples")
+    parser.add_argument("--summary", help="also write the JSON summary to this file")
+    parser.add_argument("--verbose", action="store_true", help="print INFO logs of all runs to stderr")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = build_jobs(args)
+    start = time.perf_counter()
+    # sharded workbooks run one after the other, each spreading its shards over --workers
+    workers = 1 if args.shards > 1 else min(args.workers, len(jobs))
+    results = run_batch(jobs, workers=workers, verbose=args.verbose)
+
+    summary = {
+        "runs": results,
+        "ok": sum(r["status"] == "ok" for r in results),
+        "failed": sum(r["status"] != "ok" for r in results),
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    text = json.dumps(summary, indent=2)
+    print(text)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as fh:
+            fh.write(text)
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#file with the sharded runner: one timetable split into date-range shards run by worker processes
+# Every slot starts with a fresh room pool, so slots are independent: each shard allocates
+# and renders its own dates, and the coordinator merges the shards back (in timetable order)
+# into the same layout as a single run.
+import os
+import shutil
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from logging_setup import setup_logging, close_logger
+
+SHARD_DIR = "_shards"  # per-shard work folders inside outdir (removed after the merge)
+LOG_DIR = "logs"       # shard_XX.log files end up here
+
+
+def date_key(date):
+    """'2016-05-01 00:00:00' -> '2016-05-01' (the key used for SeatingAllocator(dates=...))."""
+    return str(date).split()[0]
+
+
+def plan_shards(timetable, subject_rolls, n_shards):
+    """Split the timetable dates into at most n_shards contiguous ranges of similar load
+       (students sitting an exam; PDFs dominate the run time and scale with them).
+       Returns a list of date lists, in timetable order.
+    """
+    weights = {}  # date -> load, in first-seen order
+    for entry in timetable:
+        load = sum(len(subject_rolls.get(str(s).strip(), []))
+                   for slot in ('Morning', 'Evening') for s in entry[slot] if s != 'NO EXAM')
+        key = date_key(entry['Date'])
+        weights[key] = weights.get(key, 0) + load + 1  # +1: empty days still cost a little
+
+    dates = list(weights)
+    n = max(1, min(int(n_shards), len(dates)))
+    total = sum(weights.values())
+    shards, current, cum = [], [], 0
+    for i, d in enumerate(dates):
+        current.append(d)
+        cum += weights[d]
+        shards_left = n - len(shards) - 1
+        dates_left = len(dates) - i - 1
+        if shards_left and (cum >= total * (len(shards) + 1) / n or dates_left == shards_left):
+            shards.append(current)
+            current = []
+    if current:
+        shards.append(current)
+    return shards
+
+
+# ---------------------------------------------------------------------
+def run_shard(job):
+    """Allocate (and render) one shard in a worker process. Returns a picklable result
+       with the shard's allocations; outputs are written under job['outdir'].
+    """
+    from seating_allocator import SeatingAllocator
+
+    os.makedirs(job["outdir"], exist_ok=True)
+    logger = setup_logging(logfile=job["log"], name=f"seating.shard{job['index']}", console=False,
+                           parent_queue=job.get("log_queue"))
+    result = {"index": job["index"], "dates": job["dates"], "status": "ok", "error": None}
+    sampler = None
+    if job.get("profile"):
+        from profiler import StackSampler
+        sampler = StackSampler(job["profile"]["interval"]).start()
+    start = time.perf_counter()
+    try:
+        alloc = SeatingAllocator(outdir=job["outdir"], logger=logger, dates=job["dates"], **job["allocator"])
+        if job.get("shared") is not None:
+            alloc.load_shared(job["shared"])
+        else:
+            alloc.load_inputs()
+        alloc.allocate_all_days()
+        result["allocations"] = dict(alloc.allocations)  # before PDFs may release them
+        if job.get("pdf") is not None:
+            alloc.generate_attendance_pdfs(**job["pdf"])
+        result["packing_report"] = alloc.packing_report
+        result["layout_report"] = alloc.layout_report
+    except Exception as e:
+        logger.exception("Shard %d failed (%s)", job["index"], ", ".join(job["dates"]))
+        result["status"] = "failed"
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["seconds"] = round(time.perf_counter() - start, 3)
+        if sampler is not None:
+            sampler.stop().write(job["profile"]["path"])
+            logger.info("Profile: %s", sampler.summary())
+        close_logger(logger)
+    return result
+
+
+def _move_into(src_dir, dst_dir):
+    """Move every entry of src_dir into dst_dir, replacing what a previous run left there."""
+    os.makedirs(dst_dir, exist_ok=True)
+    for name in sorted(os.listdir(src_dir)):
+        src, dst = os.path.join(src_dir, name), os.path.join(dst_dir, name)
+        if os.path.isdir(src) and os.path.isdir(dst):
+            shutil.rmtree(dst)
+        os.replace(src, dst)
+
+
+def run_sharded(alloc, n_shards, workers=None, pdf=None, log_queue=None, shared=True, profiler=None):
+    """Run a loaded SeatingAllocator as n_shards date-range shards on `workers` processes
+       and merge them into alloc.outdir: per-slot folders, attendance/, then
+       write_outputs() over the merged allocations (op_overall_seating_arrangement,
+       op_seats_left, seat index). The result is the same as alloc.allocate_all_days().
+       pdf: None (no attendance PDFs) or generate_attendance_pdfs keyword arguments;
+            pdf_outdir defaults to <outdir>/attendance as in a single run.
+       log_queue: optional multiprocessing queue for the workers' INFO records.
+       shared: publish the loaded inputs once in shared memory (shared_data.py) for the
+               workers to attach; False makes every shard read the workbook again.
+       profiler: the caller's profiler.StackSampler; each shard then samples itself too
+                 and its stacks are merged into it under a 'shard_XX' root frame.
+       Returns the shard results (dates, seconds per shard).
+    """
+    logger = alloc.logger
+    shard_dates = plan_shards(alloc.timetable, alloc.subject_rolls, n_shards)
+    workers = max(1, min(workers or len(shard_dates), len(shard_dates)))
+    logger.info("Running %d shards on %d workers: %s", len(shard_dates), workers,
+                "; ".join(f"{d[0]}..{d[-1]}" for d in shard_dates))
+
+    work_root = os.path.join(alloc.outdir, SHARD_DIR)
+    log_dir = os.path.join(alloc.outdir, LOG_DIR)
+    os.makedirs(log_dir, exist_ok=True)
+    pdf = dict(pdf) if pdf is not None else None
+    pdf_outdir = pdf.pop("pdf_outdir", None) if pdf is not None else None
+    published = None
+    if shared:
+        from shared_data import SharedInputs
+        published = SharedInputs.publish(alloc)
+        logger.info("Published inputs to shared memory %s (%.1f MB)",
+                    published.handle["name"], published.nbytes / 2**20)
+    jobs = []
+    for i, dates in enumerate(shard_dates):
+        jobs.append({
+            "index": i,
+            "dates": dates,
+            "outdir": os.path.join(work_root, f"shard_{i:02d}"),
+            "log": os.path.join(log_dir, f"shard_{i:02d}.log"),
+            "allocator": {
+                "input_file": alloc.input_file,
+                "buffer": alloc.buffer,
+                "density": alloc.density,
+                "stream_chunksize": alloc.stream_chunksize,
+                "course_roll_file": alloc.course_roll_file,
+                "packing": alloc.packing,
+                "pack_time_budget": alloc.pack_time_budget,
+                "memory_budget_mb": alloc.memory_budget_mb,
+                "memory_plan": alloc.memory_plan,  # planned once here: workers never pre-scan
+                "seat_layout": alloc.seat_layout,
+            },
+            "pdf": pdf,
+            "log_queue": log_queue,
+            "shared": published.handle if published is not None else None,
+            "profile": ({"interval": profiler.interval, "path": os.path.join(log_dir, f"shard_{i:02d}.collapsed")}
+                        if profiler is not None else None),
+        })
+
+    try:
+        if workers == 1:
+            results = [run_shard(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run_shard, jobs))  # map keeps shard order
+    finally:
+        if published is not None:
+            published.close()
+
+    failed = [r for r in results if r["status"] != "ok"]
+    if failed:
+        for r in failed:
+            logger.error("Shard %d (%s) failed: %s", r["index"], ", ".join(r["dates"]), r["error"])
+        raise RuntimeError(f"{len(failed)} of {len(results)} shards failed; see {log_dir}")
+
+    # -------- merge in shard (= timetable) order ----------
+    merged = defaultdict(list)
+    alloc.packing_report = []
+    alloc.layout_report = []
+    for job, r in zip(jobs, results):
+        for slot_key, allocs in r.pop("allocations").items():
+            merged[slot_key].extend(allocs)
+        alloc.packing_report.extend(r.pop("packing_report"))
+        alloc.layout_report.extend(r.pop("layout_report"))
+        if job["profile"] is not None:
+            profiler.add_collapsed(job["profile"]["path"], prefix=f"shard_{job['index']:02d}")
+            os.remove(job["profile"]["path"])
+
+        shard_attendance = os.path.join(job["outdir"], "attendance")
+        if os.path.isdir(shard_attendance):
+            _move_into(shard_attendance, pdf_outdir or os.path.join(alloc.outdir, "attendance"))
+            os.rmdir(shard_attendance)
+        _move_into(job["outdir"], alloc.outdir)  # date folders
+        logger.info("Merged shard %d (%s..%s) in %.2fs", r["index"], r["dates"][0], r["dates"][-1], r["seconds"])
+    shutil.rmtree(work_root, ignore_errors=True)
+
+    alloc.allocations = merged
+    alloc.write_outputs()
+    return results
@@ -0,0 +1,203 @@
+#file with the shared-memory data plane for worker processes (sharded runs)
+# The coordinator loads the workbook once and publishes the roster, enrolment and room
+# arrays plus one string table into a single multiprocessing.shared_memory block. Workers
+# attach by name and rebuild only the slice they need (the courses of their dates), so a
+# job carries a small handle instead of data and no worker parses the workbook again.
+import sys
+import time
+from collections import defaultdict
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+class _StringTable:
+    """Distinct strings -> ids; stored as one UTF-8 blob plus character offsets."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def id(self, s):
+        return self.ids.setdefault(s, len(self.ids))
+
+    def arrays(self):
+        strings = list(self.ids)
+        offsets = np.zeros(len(strings) + 1, dtype=np.int64)
+        np.cumsum([len(s) for s in strings], out=offsets[1:])
+        return np.frombuffer("".join(strings).encode("utf-8"), dtype=np.uint8), offsets
+
+
+def _layout(arrays):
+    """Byte offsets of the arrays inside one block (8-byte aligned)."""
+    spec, pos = {}, 0
+    for key, arr in arrays.items():
+        spec[key] = (pos, arr.dtype.str, arr.shape)
+        pos += -(-arr.nbytes // 8) * 8
+    return spec, max(pos, 8)
+
+
+# ---------------------------------------------------------------------
+class SharedInputs:
+    """Loaded SeatingAllocator inputs in one shared-memory block.
+       Coordinator: publish(alloc) ... handle ... close() (unlinks the block).
+       Worker: SharedInputs.attach(handle).load_into(alloc) ... close().
+    """
+
+    def __init__(self, shm, handle, owner):
+        self.shm = shm
+        self.handle = handle  # small and picklable: block name, array layout, timetable
+        self.owner = owner
+        self.arrays = {key: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=off)
+                       for key, (off, dtype, shape) in handle["arrays"].items()}
+
+    @classmethod
+    def publish(cls, alloc):
+        """Copy the inputs of a loaded SeatingAllocator into a new shared-memory block."""
+        table = _StringTable()
+        students = {}  # roll -> student index
+        for roll in list(alloc.roll_name_map) + list(alloc.roll_courses):
+            students.setdefault(roll, len(students))
+        roll_ids = np.fromiter((table.id(r) for r in students), dtype=np.int32, count=len(students))
+        name_ids = np.fromiter((table.id(alloc.roll_name_map[r]) if r in alloc.roll_name_map else -1
+                                for r in students), dtype=np.int32, count=len(students))
+
+        # enrolment as CSR: course i holds enrol_students[course_ptr[i]:course_ptr[i + 1]]
+        courses = list(alloc.subject_rolls)
+        course_ptr = np.zeros(len(courses) + 1, dtype=np.int64)
+        np.cumsum([len(alloc.subject_rolls[c]) for c in courses], out=course_ptr[1:])
+        enrol_students = np.fromiter((students[r] for c in courses for r in alloc.subject_rolls[c]),
+                                     dtype=np.int32, count=int(course_ptr[-1]))
+        course_ids = np.array([table.id(c) for c in courses], dtype=np.int32)
+
+        rooms = alloc.room_capacity
+        room_cols = np.array([[table.id(r['building']), table.id(r['room_code']), r['capacity'],
+                               r['capacity_effective'], *(r.get('grid') or (-1, -1))] for r in rooms],
+                             dtype=np.int32).reshape(len(rooms), 6)
+
+        blob, offsets = table.arrays()
+        arrays = {"blob": blob, "offsets": offsets, "roll_ids": roll_ids, "name_ids": name_ids,
+                  "course_ids": course_ids, "course_ptr": course_ptr, "enrol_students": enrol_students,
+                  "rooms": room_cols}
+        spec, size = _layout(arrays)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        handle = {"name": shm.name, "arrays": spec, "timetable": alloc.timetable,
+                  "seat_layout": alloc.seat_layout}
+        shared = cls(shm, handle, owner=True)
+        for key, arr in arrays.items():
+            shared.arrays[key][...] = arr
+        return shared
+
+    @classmethod
+    def attach(cls, handle):
+        """Map the block published by the coordinator (no copy)."""
+        return cls(shared_memory.SharedMemory(name=handle["name"]), handle, owner=False)
+
+    @property
+    def nbytes(self):
+        return self.shm.size
+
+    def close(self):
+        """Drop the array views and unmap; the owner also unlinks the block."""
+        self.arrays = {}
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+    # -----------------------------------------------------------------
+    def load_into(self, alloc):
+        """Fill a SeatingAllocator as load_inputs() would, for its dates only: timetable,
+           subject_rolls / roll_courses / roll_name_map of the courses on those dates,
+           rooms and roster. Only the needed strings are decoded (and interned).
+        """
+        from roster import Roster
+
+        a = self.arrays
+        text = bytes(a["blob"]).decode("utf-8")
+        offsets = a["offsets"]
+        decoded = {}
+
+        def string(i):
+            s = decoded.get(i)
+            if s is None:
+                s = decoded[i] = sys.intern(text[offsets[i]:offsets[i + 1]])
+            return s
+
+        alloc.timetable = list(self.handle["timetable"])
+        if alloc.dates is not None:
+            alloc.timetable = [e for e in alloc.timetable if e['Date'].split()[0] in alloc.dates]
+        wanted = {str(s).strip() for e in alloc.timetable for slot in ('Morning', 'Evening') for s in e[slot]}
+
+        alloc.subject_rolls = defaultdict(list)
+        alloc.roll_courses = defaultdict(list)
+        roll_ids, ptr, enrol = a["roll_ids"], a["course_ptr"], a["enrol_students"]
+        seen = []
+        for i, cid in enumerate(a["course_ids"]):
+            course = string(int(cid))
+            if course not in wanted:
+                continue
+            members = enrol[ptr[i]:ptr[i + 1]]
+            seen.append(members)
+            rolls = [string(int(r)) for r in roll_ids[members]]
+            alloc.subject_rolls[course] = rolls
+            for roll in rolls:
+                alloc.roll_courses[roll].append(course)
+
+        alloc.roll_name_map = {}
+        if seen:
+            members = np.unique(np.concatenate(seen))
+            named = members[a["name_ids"][members] >= 0]
+            alloc.roll_name_map = {string(int(r)): string(int(n))
+                                   for r, n in zip(roll_ids[named], a["name_ids"][named])}
+
+        alloc.room_capacity = []
+        for building, room, capacity, eff, rows, cols in a["rooms"].tolist():
+            r = {'building': string(building), 'room_code': string(room),
+                 'capacity': capacity, 'capacity_effective': eff}
+            if rows >= 0:
+                r['grid'] = (rows, cols)
+            alloc.room_capacity.append(r)
+        alloc.seat_layout = self.handle["seat_layout"]
+
+        alloc.roster = Roster.from_rolls(list(alloc.roll_name_map) + list(alloc.roll_courses),
+                                         names=alloc.roll_name_map)
+        alloc.logger.info("Attached shared inputs %s (%.1f MB): %d days, %d courses, %d students, %d rooms.",
+                          self.handle["name"], self.nbytes / 2**20, len(alloc.timetable),
+                          len(alloc.subject_rolls), len(alloc.roster), len(alloc.room_capacity))
+
+
+# ---------------------------------------------------------------------
+def benchmark(input_file, n_shards=4):
+    """Seconds for a shard to get its inputs: parse the workbook vs attach the block."""
+    import logging
+    import tempfile
+    from seating_allocator import SeatingAllocator
+    from sharding import plan_shards
+
+    logger = logging.getLogger("shared_data.benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    outdir = tempfile.mkdtemp()
+    alloc = SeatingAllocator(input_file, outdir=outdir, logger=logger)
+    alloc.load_inputs()
+    dates = plan_shards(alloc.timetable, alloc.subject_rolls, n_shards)[0]
+
+    start = time.perf_counter()
+    SeatingAllocator(input_file, outdir=outdir, logger=logger, dates=dates).load_inputs()
+    parse = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = SharedInputs.publish(alloc)
+    publish = time.perf_counter() - start
+    start = time.perf_counter()
+    view = SharedInputs.attach(shared.handle)
+    view.load_into(SeatingAllocator(input_file, outdir=outdir, logger=logger, dates=dates))
+    attach = time.perf_counter() - start
+    view.close()
+    shared.close()
+    return {"block_mb": shared.nbytes / 2**20, "parse_workbook_s": parse, "publish_once_s": publish,
+            "attach_s": attach}
+
+
+if __name__ == "__main__":
+    for label, value in benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 4).items():
+        print(f"{label}: {value:.3f}")
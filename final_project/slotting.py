@@ -0,0 +1,323 @@
+#file with the exam slotting engine: a clash-free in_timetable from in_course_roll_mapping
+# Courses sharing students are joined in a weighted conflict graph (edge weight = shared
+# students). DSatur colouring puts the most constrained course first into the cheapest
+# (date, Morning/Evening) slot that still has room capacity; a local search then moves
+# courses while that lowers clashes, two-exam days and back-to-back slots.
+import argparse
+import logging
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+SLOTS = ("Morning", "Evening")
+
+# cost of two courses sharing one student, by how close their slots are
+CLASH = 1000       # same slot: the student cannot sit both
+SAME_DAY = 10      # morning and evening of one day
+BACK_TO_BACK = 3   # evening, then the next morning
+
+
+def slots_from_timetable(timetable):
+    """[(date, day, slot), ...] of every Morning/Evening cell of a loaded timetable."""
+    return [(e['Date'], e['Day'], slot) for e in timetable for slot in SLOTS]
+
+
+def slots_from_dates(start, days, skip_sundays=True):
+    """[(date, day, slot), ...] for `days` exam days from `start` (Sundays skipped)."""
+    out, date = [], pd.Timestamp(start)
+    while len(out) < days * len(SLOTS):
+        if not (skip_sundays and date.dayofweek == 6):
+            out += [(str(date), date.day_name(), slot) for slot in SLOTS]
+        date += pd.Timedelta(days=1)
+    return out
+
+
+def penalty_matrix(slots):
+    """slots x slots cost of one shared student between courses in slot i and slot j."""
+    day = pd.to_datetime(pd.Series([str(d).split()[0] for d, _, _ in slots]), errors='coerce')
+    if day.isna().any():  # unparseable dates: keep the given order, one day per two slots
+        day = pd.Series(np.arange(len(slots)) // len(SLOTS))
+    else:
+        day = (day - day.min()).dt.days
+    day = day.to_numpy()
+    order = day * len(SLOTS) + np.array([SLOTS.index(s) for _, _, s in slots])
+    p = np.zeros((len(slots), len(slots)), dtype=np.int64)
+    p[np.abs(order[:, None] - order[None, :]) == 1] = BACK_TO_BACK
+    p[(day[:, None] == day[None, :])] = SAME_DAY
+    np.fill_diagonal(p, CLASH)
+    return p
+
+
+def conflict_graph(subject_rolls, courses):
+    """Sparse courses x courses matrix of shared students (zero diagonal) and course sizes."""
+    rolls = [r for c in courses for r in subject_rolls[c]]
+    codes, _ = pd.factorize(pd.Series(rolls, dtype=object))
+    lengths = [len(subject_rolls[c]) for c in courses]
+    enrol = sparse.csr_matrix((np.ones(len(codes), dtype=np.int32),
+                               (np.repeat(np.arange(len(courses)), lengths), codes)),
+                              shape=(len(courses), int(codes.max()) + 1 if len(codes) else 0))
+    enrol.data[:] = 1  # duplicate enrolments count once
+    shared = (enrol @ enrol.T).tocsr()
+    shared.setdiag(0)
+    shared.eliminate_zeros()
+    return shared, np.asarray(enrol.sum(axis=1)).ravel()
+
+
+# ---------------------------------------------------------------------
+class Slotting:
+    """Course -> slot assignment on a conflict graph.
+       load[s]: students seated in slot s; capacity: seats per slot (every slot starts
+       with the full room pool); near[c, s]: shared students of course c with the
+       courses currently in slot s.
+    """
+
+    def __init__(self, courses, graph, sizes, slots, capacity):
+        self.courses = courses
+        self.graph = graph
+        self.sizes = sizes
+        self.slots = slots
+        self.capacity = capacity
+        self.penalty = penalty_matrix(slots)
+        self.slot_of = np.full(len(courses), -1)
+        self.load = np.zeros(len(slots), dtype=np.int64)
+        self.near = np.zeros((len(courses), len(slots)), dtype=np.int64)
+
+    def _place(self, c, s, sign=1):
+        lo, hi = self.graph.indptr[c], self.graph.indptr[c + 1]
+        self.near[self.graph.indices[lo:hi], s] += sign * self.graph.data[lo:hi]
+        self.load[s] += sign * self.sizes[c]
+        self.slot_of[c] = s if sign > 0 else -1
+
+    def _costs(self, c):
+        """Cost of course c in every slot; slots without room for it cost more than any clash."""
+        cost = self.near[c] @ self.penalty
+        full = self.load + self.sizes[c] > self.capacity
+        if self.slot_of[c] >= 0:
+            full[self.slot_of[c]] = False  # its own slot already holds it
+        return np.where(full, np.iinfo(np.int64).max // 4 + self.load, cost)
+
+    def _best(self, costs):
+        """Cheapest slot; ties go to the emptiest one (spreads exams and seats)."""
+        tied = np.flatnonzero(costs == costs.min())
+        return int(tied[np.argmin(self.load[tied])])
+
+    def colour(self):
+        """DSatur: repeatedly take the course whose neighbours use the most distinct slots
+           (ties: most shared students, then largest) and give it its cheapest slot.
+        """
+        degree = np.asarray(self.graph.sum(axis=1)).ravel()
+        left = np.ones(len(self.courses), dtype=bool)
+        for _ in range(len(self.courses)):
+            saturation = np.count_nonzero(self.near, axis=1)
+            key = np.lexsort((-self.sizes, -degree, -saturation))  # last key sorts first
+            c = key[left[key]][0]
+            self._place(c, self._best(self._costs(c)))
+            left[c] = False
+
+    def improve(self, time_budget=2.0):
+        """Move single courses to cheaper slots until no move helps or time runs out."""
+        end = time.perf_counter() + time_budget
+        moves = 0
+        while time.perf_counter() < end:
+            moved = False
+            own = self.near[np.arange(len(self.courses)), self.slot_of] * CLASH
+            for c in np.argsort(-own, kind='stable'):
+                costs = self._costs(c)
+                best = self._best(costs)
+                if costs[best] < costs[self.slot_of[c]]:
+                    self._place(c, self.slot_of[c], sign=-1)
+                    self._place(c, best)
+                    moves += 1
+                    moved = True
+                if time.perf_counter() >= end:
+                    break
+            if not moved:
+                break
+        return moves
+
+    # -----------------------------------------------------------------
+    def conflicts(self):
+        """Shared students between course pairs in the same slot, on the same day and in
+           back-to-back slots (a student in three clashing courses counts three pairs).
+        """
+        slot_day = self.penalty == SAME_DAY
+        nearby = self.penalty == BACK_TO_BACK
+        here = self.slot_of
+
+        def pairs(mask):
+            return int((self.near * mask[here]).sum() // 2)
+
+        return {"same slot": int(self.near[np.arange(len(here)), here].sum() // 2),
+                "same day": pairs(slot_day), "back-to-back": pairs(nearby)}
+
+    def timetable(self):
+        """The assignment as in_timetable rows (dates in slot order, 'NO EXAM' when empty)."""
+        by_slot = [[] for _ in self.slots]
+        for c in np.argsort(self.courses, kind='stable'):
+            by_slot[self.slot_of[c]].append(self.courses[c])
+        rows = {}
+        for (date, day, slot), courses in zip(self.slots, by_slot):
+            row = rows.setdefault(date, {"Date": date, "Day": day, "Morning": "NO EXAM", "Evening": "NO EXAM"})
+            if courses:
+                row[slot] = "; ".join(courses)
+        df = pd.DataFrame(list(rows.values()), columns=["Date", "Day", "Morning", "Evening"])
+        dates = pd.to_datetime(df["Date"], errors='coerce')
+        if dates.notna().all():
+            df["Date"] = dates
+        return df
+
+    def course_table(self):
+        """One row per course: its slot, students and remaining shared students in that slot."""
+        here = self.slot_of
+        return pd.DataFrame({
+            "Course": self.courses,
+            "Date": [str(self.slots[s][0]).split()[0] for s in here],
+            "Slot": [self.slots[s][2] for s in here],
+            "Students": self.sizes,
+            "Clashing students": self.near[np.arange(len(here)), here],
+        }).sort_values(["Date", "Slot", "Course"], kind='stable')
+
+    def slot_table(self):
+        return pd.DataFrame({
+            "Date": [str(d).split()[0] for d, _, _ in self.slots],
+            "Slot": [s for _, _, s in self.slots],
+            "Courses": np.bincount(self.slot_of, minlength=len(self.slots)),
+            "Students": self.load,
+            "Seats": self.capacity,
+        })
+
+
+def plan_slots(alloc, slots=None, courses=None, time_budget=2.0):
+    """Assign the courses of a loaded SeatingAllocator to exam slots.
+       slots: [(date, day, slot), ...]; default: every cell of the current in_timetable.
+       courses: course codes to schedule; default: all of in_course_roll_mapping.
+       Per-slot capacity is the effective capacity of all rooms (buffer/density applied).
+    """
+    slots = slots or slots_from_timetable(alloc.timetable)
+    if not slots:
+        raise ValueError("No exam slots to assign courses to")
+    courses = [c for c in (courses or alloc.subject_rolls) if alloc.subject_rolls.get(c)]
+    capacity = sum(r['capacity_effective'] for r in alloc.room_capacity)
+
+    start = time.perf_counter()
+    graph, sizes = conflict_graph(alloc.subject_rolls, courses)
+    plan = Slotting(courses, graph, sizes, slots, capacity)
+    plan.colour()
+    coloured = plan.conflicts()
+    moves = plan.improve(time_budget)
+    alloc.logger.info("Slotted %d courses (%d conflict edges) into %d slots in %.2fs: "
+                      "after colouring %s, after %d moves %s", len(courses), graph.nnz // 2, len(slots),
+                      time.perf_counter() - start, coloured, moves, plan.conflicts())
+    too_big = sizes > capacity
+    if too_big.any():
+        alloc.logger.warning("%d courses have more students than the %d seats of a slot: %s",
+                             int(too_big.sum()), capacity, ", ".join(np.asarray(courses)[too_big][:10]))
+    return plan
+
+
+def write_timetable(path, plan, alloc=None):
+    """Excel file with a ready in_timetable sheet plus Courses and Slots sheets; with
+       alloc, a Summary sheet compares exam load (exam_load.py) of the current and the
+       new timetable.
+    """
+    timetable = plan.timetable()
+    with pd.ExcelWriter(path, engine="xlsxwriter", datetime_format="yyyy-mm-dd") as writer:
+        timetable.to_excel(writer, sheet_name="in_timetable", index=False)
+        if alloc is not None:
+            _load_summary(alloc, timetable).to_excel(writer, sheet_name="Summary", index=False)
+        plan.course_table().to_excel(writer, sheet_name="Courses", index=False)
+        plan.slot_table().to_excel(writer, sheet_name="Slots", index=False)
+
+
+def _load_summary(alloc, timetable):
+    from types import SimpleNamespace
+    from exam_load import analyze
+
+    proposed = [{"Date": str(r.Date), "Day": r.Day,
+                 "Morning": [s.strip() for s in r.Morning.split(";")],
+                 "Evening": [s.strip() for s in r.Evening.split(";")]} for r in timetable.itertuples()]
+    current = analyze(alloc).summary()
+    new = analyze(SimpleNamespace(timetable=proposed, subject_rolls=alloc.subject_rolls,
+                                  roster=alloc.roster)).summary()
+    return pd.DataFrame({"Metric": current["Metric"], "Current timetable": current["Students"],
+                         "Proposed timetable": new["Students"]})
+
+
+# ---------------------------------------------------------------------
+def benchmark(n_cohorts=440, cohort_courses=5, cohort_students=90, n_electives=300, days=15, seed=0):
+    """Synthetic campus: every cohort (branch + year) sits its core courses together and
+       each student adds one elective shared across cohorts (2,500 courses by default).
+       Returns seconds and conflicts after colouring / local search.
+    """
+    from types import SimpleNamespace
+
+    rng = np.random.default_rng(seed)
+    subject_rolls = {}
+    for k in range(n_cohorts):
+        rolls = [f"S{k:03d}{i:03d}" for i in range(cohort_students)]
+        for j in range(cohort_courses):
+            subject_rolls[f"K{k:03d}-{j}"] = rolls
+        for roll, e in zip(rolls, rng.integers(0, n_electives, cohort_students)):
+            subject_rolls.setdefault(f"E{e:03d}", []).append(roll)
+    logger = logging.getLogger("slotting.benchmark")
+    logger.addHandler(logging.NullHandler())
+    logger.propagate = False
+    students = n_cohorts * cohort_students
+    alloc = SimpleNamespace(subject_rolls=subject_rolls, logger=logger,
+                            room_capacity=[{'capacity_effective': 60}] * (students // 20))
+    slots = slots_from_dates("2026-05-01", days)
+
+    start = time.perf_counter()
+    plan = plan_slots(alloc, slots=slots, time_budget=2.0)
+    return {"courses": len(plan.courses), "students": students, "edges": plan.graph.nnz // 2,
+            "slots": len(slots), "seconds": time.perf_counter() - start, "conflicts": plan.conflicts()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a clash-free in_timetable from an exam workbook.")
+    parser.add_argument("input", nargs="?", help="input Excel workbook")
+    parser.add_argument("--out", default="op_timetable.xlsx")
+    parser.add_argument("--start", help="first exam date (default: reuse the dates of in_timetable)")
+    parser.add_argument("--days", type=int, help="exam days from --start (Sundays skipped)")
+    parser.add_argument("--timetabled-only", action="store_true",
+                        help="only schedule courses of the current in_timetable")
+    parser.add_argument("--buffer", type=int, default=0, help="buffer seats per room")
+    parser.add_argument("--density", choices=["Dense", "Sparse"], default="Dense")
+    parser.add_argument("--time-budget", type=float, default=2.0, help="seconds of local search")
+    parser.add_argument("--profile", action="store_true",
+                        help="sample the run's stacks into profile.collapsed next to --out")
+    parser.add_argument("--benchmark", action="store_true", help="time a synthetic 2,500-course campus")
+    args = parser.parse_args(argv)
+    if args.benchmark:
+        for label, value in benchmark().items():
+            print(f"{label}: {value:.3f}" if isinstance(value, float) else f"{label}: {value}")
+        return 0
+    if not args.input:
+        parser.error("input workbook required")
+    if bool(args.start) != bool(args.days):
+        parser.error("--start and --days go together")
+
+    from seating_allocator import SeatingAllocator
+    logger = logging.getLogger("slotting")
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+    from profiler import PROFILE_FILE, profiled
+    profile = os.path.join(os.path.dirname(os.path.abspath(args.out)), PROFILE_FILE) if args.profile else None
+    with profiled(profile, logger):
+        alloc = SeatingAllocator(args.input, buffer=args.buffer, density=args.density, outdir=".", logger=logger)
+        alloc.load_inputs()
+        slots = slots_from_dates(args.start, args.days) if args.start else None
+        courses = None
+        if args.timetabled_only:
+            courses = [s.strip() for e in alloc.timetable for slot in SLOTS for s in e[slot] if s != 'NO EXAM']
+        plan = plan_slots(alloc, slots=slots, courses=courses, time_budget=args.time_budget)
+        write_timetable(args.out, plan, alloc)
+    print(f"{args.out}: {plan.conflicts()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#file with the pytest setup: the modules live flat in final_project/, next to this folder
+import logging
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_INPUT = os.path.join(ROOT, "input", "input_data_tt.xlsx")
+
+
+@pytest.fixture
+def logger():
+    """Logger for the code under test; records reach caplog, nothing goes to the console."""
+    return logging.getLogger("tests")
+
+
+@pytest.fixture
+def make_allocator(tmp_path, logger):
+    """SeatingAllocator over the sample workbook writing into a fresh folder under tmp_path."""
+    from seating_allocator import SeatingAllocator
+
+    def make(input_file=SAMPLE_INPUT, outdir=None, **kwargs):
+        outdir = outdir or tmp_path / f"out{len(os.listdir(tmp_path))}"
+        return SeatingAllocator(input_file, outdir=str(outdir), logger=logger, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def loaded(make_allocator):
+    """make_allocator with the inputs already loaded (load_inputs)."""
+    def load(*args, **kwargs):
+        alloc = make_allocator(*args, **kwargs)
+        alloc.load_inputs()
+        return alloc
+
+    return load
+
+
+@pytest.fixture
+def allocated(loaded):
+    """loaded, then allocated over every day (allocate_all_days)."""
+    def allocate(*args, **kwargs):
+        alloc = loaded(*args, **kwargs)
+        alloc.allocate_all_days()
+        return alloc
+
+    return allocate
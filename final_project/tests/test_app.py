@@ -0,0 +1,105 @@
+#file with the tests of the Streamlit app's run_allocation (app.py, run without a server)
+import importlib.util
+import io
+import logging
+import os
+import threading
+import zipfile
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT, SAMPLE_INPUT
+from memory_budget import STRATEGIES, STRATEGY_TEXT
+
+
+class Upload:
+    """What st.file_uploader returns, as far as run_allocation uses it."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self._data = data
+
+    def getbuffer(self):
+        return memoryview(self._data)
+
+
+@pytest.fixture(scope="module")
+def app():
+    """app.py imported once in bare mode; it reads photos/ relative to the working directory."""
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        spec = importlib.util.spec_from_file_location("seating_app", os.path.join(ROOT, "app.py"))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        yield module
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture
+def sample_upload():
+    with open(SAMPLE_INPUT, "rb") as f:
+        return Upload("input_data_tt.xlsx", f.read())
+
+
+def sampler_threads():
+    return [t for t in threading.enumerate() if t.name == "stack-sampler"]
+
+
+def test_run_returns_the_zipped_outputs(app, sample_upload):
+    data = app.run_allocation(sample_upload, 0, "Dense", booklet="slot", profile=True)
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        names = zf.namelist()
+    assert "op_overall_seating_arrangement.xlsx" in names and "profile.collapsed" in names
+    assert any(n.endswith(".pdf") for n in names)
+    assert not sampler_threads()
+
+
+def test_failed_run_stops_the_profiler_and_keeps_its_profile(app):
+    app.st.session_state.pop("failed_profile", None)
+    with pytest.raises(Exception):
+        app.run_allocation(Upload("broken.xlsx", b"not a workbook"), 0, "Dense", profile=True)
+    assert not sampler_threads()
+    assert isinstance(app.st.session_state.pop("failed_profile"), bytes)
+
+
+def test_failed_run_releases_the_logger(app, sample_upload):
+    with pytest.raises(Exception):
+        app.run_allocation(Upload("broken.xlsx", b"not a workbook"), 0, "Dense")
+    logger = logging.getLogger("seating")
+    assert not getattr(logger, "_is_configured", False) and not logger.handlers
+
+    data = app.run_allocation(sample_upload, 0, "Dense", booklet="slot")
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        assert b"Loaded" in zf.read("seating.log")  # the next run logs to its own file
+
+
+def zip_contents(zf):
+    """{name: bytes} of every entry except the run's own log."""
+    return {n: zf.read(n) for n in zf.namelist() if n != "seating.log"}
+
+
+def test_tiny_budget_serves_the_zip_from_disk(app, sample_upload):
+    plain = app.run_allocation(sample_upload, 0, "Dense", booklet="slot")
+    path = app.run_allocation(sample_upload, 0, "Dense", booklet="slot", memory_budget_mb=1)
+    assert isinstance(path, str) and os.path.exists(path)  # outlives the run's temp dir
+
+    with zipfile.ZipFile(io.BytesIO(plain)) as a, zipfile.ZipFile(path) as b:
+        expected, got = zip_contents(a), zip_contents(b)
+        log = b.read("seating.log").decode()
+    for name in STRATEGIES:  # 1 MB switches every bounded strategy on
+        assert STRATEGY_TEXT[name].split("{")[0] in log
+    assert sorted(got) == sorted(expected)
+    for name in expected:
+        if name.endswith(".xlsx"):
+            pd.testing.assert_frame_equal(pd.read_excel(io.BytesIO(got[name])),
+                                          pd.read_excel(io.BytesIO(expected[name])))
+
+    app.offer_download(path)  # st.download_button accepts the open file
+    assert not os.path.exists(path)
+
+
+def test_download_button_takes_bytes(app, sample_upload):
+    app.offer_download(b"PK\x05\x06" + bytes(18))
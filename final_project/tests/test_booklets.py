@@ -0,0 +1,41 @@
+#file with the tests of the attendance booklets (one PDF per slot, bookmarks per room and subject)
+import os
+import re
+
+import pytest
+
+pytest.importorskip("reportlab")
+
+from conftest import ROOT
+
+PHOTOS = os.path.join(ROOT, "photos")
+NO_IMAGE = os.path.join(PHOTOS, "no_image_available.jpg")
+
+
+def sheets_of(alloc):
+    """(date, slot, building, room, subject) of every attendance sheet."""
+    return {(str(a["date"]).split()[0], str(a["slot"]), str(a.get("building")), str(a["room"]), str(a["subject"]))
+            for allocs in alloc.allocations.values() for a in allocs}
+
+
+@pytest.mark.parametrize("mode", ["slot", "building"])
+def test_one_booklet_per_slot_with_bookmarks(allocated, tmp_path, mode):
+    alloc = allocated()
+    pdf_dir = tmp_path / "pdf"
+    alloc.generate_attendance_pdfs(PHOTOS, NO_IMAGE, pdf_outdir=str(pdf_dir), booklet=mode)
+    sheets = sheets_of(alloc)
+    keys = {s[:3] if mode == "building" else s[:2] for s in sheets}
+
+    files = sorted(os.listdir(pdf_dir))
+    assert len(files) == len(keys)
+    assert all(re.fullmatch(r"\d{4}_\d{2}_\d{2}_\w+\.pdf", f) for f in files)
+    for name in files:
+        data = (pdf_dir / name).read_bytes()
+        assert data.startswith(b"%PDF") and b"/Outlines" in data
+    pages = sum(len(re.findall(rb"/Type /Page\b", (pdf_dir / f).read_bytes())) for f in files)
+    assert pages >= len(sheets)  # every sheet starts on a new page
+
+
+def test_unknown_booklet_mode(allocated):
+    with pytest.raises(ValueError):
+        allocated().generate_attendance_pdfs(PHOTOS, NO_IMAGE, booklet="room")
@@ -0,0 +1,83 @@
+#file with the tests of the headless batch runner (seating_arrangement.py)
+import json
+import os
+import shutil
+
+import pytest
+
+from conftest import SAMPLE_INPUT
+from seating_arrangement import build_jobs, main, parse_args
+
+
+@pytest.fixture
+def workbooks(tmp_path):
+    """Two copies of the sample workbook with the same file name, in different folders."""
+    paths = []
+    for folder in ("a", "b"):
+        os.makedirs(tmp_path / folder)
+        paths.append(str(tmp_path / folder / "exam.xlsx"))
+        shutil.copy(SAMPLE_INPUT, paths[-1])
+    return paths
+
+
+def test_run_ids_are_unique_per_workbook(workbooks, tmp_path):
+    jobs = build_jobs(parse_args(["--input", *workbooks, workbooks[0], "--outdir", str(tmp_path / "out")]))
+    assert [j["run_id"] for j in jobs] == ["exam", "exam_1", "exam_2"]
+    assert len({j["outdir"] for j in jobs}) == 3
+    assert all(j["outdir"].startswith(str(tmp_path / "out") + os.sep) for j in jobs)
+
+
+def test_single_workbook_writes_into_outdir(workbooks, tmp_path):
+    jobs = build_jobs(parse_args(["--input", workbooks[0], "--outdir", str(tmp_path / "out")]))
+    assert jobs[0]["outdir"] == str(tmp_path / "out")
+
+
+@pytest.mark.parametrize("workers", ["1", "3"])
+def test_batch_summary_and_exit_code(workbooks, tmp_path, capsys, workers):
+    summary_file = tmp_path / "summary.json"
+    missing = str(tmp_path / "missing.xlsx")
+    code = main(["--input", *workbooks, missing, "--outdir", str(tmp_path / "out"), "--no-pdf",
+                 "--workers", workers, "--summary", str(summary_file)])
+    summary = json.loads(summary_file.read_text(encoding="utf-8"))
+    assert code == 1
+    assert summary == json.loads(capsys.readouterr().out)
+    assert (summary["ok"], summary["failed"]) == (2, 1)
+
+    good, other, bad = summary["runs"]  # input order, whatever order the workers finish in
+    assert good["status"] == other["status"] == "ok"
+    assert good["students_seated"] == other["students_seated"] > 0
+    assert os.path.exists(os.path.join(good["outdir"], "op_overall_seating_arrangement.xlsx"))
+    assert bad["status"] == "failed" and bad["input"] == missing and bad["error"]
+    assert os.path.exists(bad["log"])
+
+
+def test_all_runs_ok_exit_zero(workbooks, tmp_path, capsys):
+    assert main(["--input", workbooks[0], "--outdir", str(tmp_path / "out"), "--no-pdf", "--workers", "1"]) == 0
+    assert json.loads(capsys.readouterr().out)["failed"] == 0
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_verbose_prints_the_logs_of_every_run(workbooks, tmp_path, capfd, workers):
+    assert main(["--input", *workbooks, "--outdir", str(tmp_path / "out"), "--no-pdf",
+                 "--workers", workers, "--verbose"]) == 0
+    err = capfd.readouterr().err
+    for run_id in ("exam", "exam_1"):  # worker processes log through the parent's queue
+        assert f"seating.{run_id} | " in err
+    assert "| DEBUG |" not in err
+
+
+def test_sharded_run_from_the_cli(workbooks, tmp_path, capsys):
+    outdir = tmp_path / "out"
+    assert main(["--input", workbooks[0], "--outdir", str(outdir), "--no-pdf", "--shards", "2"]) == 0
+    assert json.loads(capsys.readouterr().out)["ok"] == 1
+    assert os.path.exists(outdir / "op_overall_seating_arrangement.xlsx")
+    assert sorted(os.listdir(outdir / "logs")) == ["shard_00.log", "shard_01.log"]
+    assert not os.path.exists(outdir / "_shards")
+
+
+def test_exam_load_report_from_the_cli(workbooks, tmp_path, capsys):
+    outdir = tmp_path / "out"
+    assert main(["--input", workbooks[0], "--outdir", str(outdir), "--no-pdf", "--exam-load"]) == 0
+    run = json.loads(capsys.readouterr().out)["runs"][0]
+    assert os.path.exists(outdir / "op_exam_load.xlsx")
+    assert run["exam_load"] and all(count >= 0 for count in run["exam_load"].values())
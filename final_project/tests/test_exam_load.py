@@ -0,0 +1,51 @@
+#file with the tests of the sparse exam-load analytics (exam_load.py) against the plain loops
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from exam_load import SLOTS, analyze, _naive_metrics
+from roster import Roster
+
+
+def synthetic_campus(seed, n_students=300, n_courses=40, n_days=8):
+    """Random enrolments (with some duplicate rows) over a timetable with a gap day."""
+    rng = np.random.default_rng(seed)
+    rolls = [f"2401CS{i:04d}" for i in range(n_students)]
+    subject_rolls = {f"C{c:02d}": [] for c in range(n_courses)}
+    for roll in rolls:
+        for c in rng.integers(0, n_courses, rng.integers(1, 7)):
+            subject_rolls[f"C{c:02d}"].append(roll)
+    subject_rolls["C00"] += subject_rolls["C00"][:3]  # duplicate enrolment rows
+    slots = rng.integers(0, 2 * n_days, n_courses)
+    timetable = []
+    for d in range(n_days):
+        if d == 3:
+            continue  # no exams that day: windows still count calendar days
+        entry = {'Date': str(pd.Timestamp("2026-05-01") + pd.Timedelta(days=d)).split()[0]}
+        for pos, slot in enumerate(SLOTS):
+            entry[slot] = [f"C{c:02d}" for c in np.flatnonzero(slots == 2 * d + pos)] or ['NO EXAM']
+        timetable.append(entry)
+    return SimpleNamespace(timetable=timetable, subject_rolls=subject_rolls, roster=Roster.from_rolls(rolls))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("window_days", [1, 3])
+def test_sparse_metrics_match_naive_loops(seed, window_days):
+    alloc = synthetic_campus(seed)
+    load = analyze(alloc, window_days=window_days)
+    naive = _naive_metrics(alloc.timetable, alloc.subject_rolls, window_days=window_days)
+    for i, roll in enumerate(load.rolls):
+        expected = naive.get(roll, (0, 0, 0, 0))
+        got = (load.same_slot[i], load.same_day[i], load.back_to_back[i], load.window_max[i])
+        assert tuple(int(v) for v in got) == expected, roll
+
+
+def test_exceptions_list_every_flagged_student_once():
+    alloc = synthetic_campus(1)
+    report = analyze(alloc, window_days=3, max_exams=2).exceptions()
+    naive = _naive_metrics(alloc.timetable, alloc.subject_rolls, window_days=3)
+    expected = {roll for roll, (slot, day, b2b, window) in naive.items() if slot or day or b2b or window > 2}
+    assert report["Roll"].is_unique
+    assert set(report["Roll"]) == expected
@@ -0,0 +1,21 @@
+#file with the tests of deferred heavy imports (bench_imports.py measures the same probe)
+import pytest
+
+from bench_imports import TARGETS, measure
+
+# phase modules that need their heavy dependency themselves
+PHASE_DEPS = {
+    "attendance_pdf": ["reportlab"],
+    "exam_load": ["scipy"],
+    "slotting": ["scipy"],
+}
+
+
+@pytest.mark.parametrize("module", [m for m in TARGETS if m not in PHASE_DEPS])
+def test_module_imports_without_heavy_dependencies(module):
+    assert measure(module, repeat=1)["heavy_deps_loaded"] == []
+
+
+@pytest.mark.parametrize("module", list(PHASE_DEPS))
+def test_phase_brings_its_own_dependency(module):
+    assert measure(module, repeat=1)["heavy_deps_loaded"] == PHASE_DEPS[module]
@@ -0,0 +1,47 @@
+#file with the tests of the queue-based logging (logging_setup.py) and ProgressLog
+import logging
+import queue
+
+from instrumentation import ProgressLog
+from logging_setup import close_logger, setup_logging
+
+
+def test_close_logger_drains_the_queue(tmp_path):
+    logfile = tmp_path / "seating.log"
+    logger = setup_logging(logfile=str(logfile), name="tests.queue", console=False)
+    assert setup_logging(logfile=str(logfile), name="tests.queue") is logger  # configured once
+    for i in range(1000):
+        logger.debug("line %d", i)
+    close_logger(logger)
+
+    assert logfile.read_text().count("| DEBUG | line") == 1000
+    assert logger.handlers == [] and not logger._is_configured
+
+    again = setup_logging(logfile=str(tmp_path / "next.log"), name="tests.queue", console=False)
+    again.info("second run")
+    close_logger(again)
+    assert "second run" in (tmp_path / "next.log").read_text()
+
+
+def test_parent_queue_gets_info_records_only(tmp_path):
+    parent = queue.SimpleQueue()
+    logger = setup_logging(logfile=str(tmp_path / "run.log"), name="tests.parent", console=False,
+                           parent_queue=parent)
+    logger.debug("detail")
+    logger.info("summary")
+    close_logger(logger)
+
+    forwarded = []
+    while not parent.empty():
+        forwarded.append(parent.get().getMessage())
+    assert forwarded == ["summary"]
+
+
+def test_progress_log_aggregates_ticks(caplog):
+    caplog.set_level(logging.INFO, logger="tests")
+    progress = ProgressLog(logging.getLogger("tests"), "PDFs", total=5, every=3600)
+    for ok in (True, True, False, True, True):
+        progress.tick(ok=ok)
+    progress.done()
+    assert len(caplog.records) == 1  # no per-item lines, one summary at the end
+    assert caplog.records[0].getMessage().startswith("PDFs done: 5/5 (1 failed")
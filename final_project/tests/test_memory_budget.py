@@ -0,0 +1,95 @@
+#file with the tests of the memory-budget governor (memory_budget.py)
+import os
+import sqlite3
+import zipfile
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT, SAMPLE_INPUT
+from memory_budget import STRATEGIES, disk_archive, plan_memory, prescan
+
+
+def test_prescan_counts_rows_without_loading():
+    scan = prescan(SAMPLE_INPUT)
+    assert scan["mapping_rows"] > 0
+    assert scan["slots"] > 0
+
+
+def test_generous_budget_keeps_the_default_pipeline():
+    plan = plan_memory({"mapping_rows": 10_000, "slots": 20}, 10_000)
+    assert not any(plan.enabled.values())
+    assert not plan.over_budget
+
+
+@pytest.mark.parametrize("budget_mb", [300, 240, 220, 210, 150])
+def test_strategies_switch_on_in_order_until_the_estimate_fits(budget_mb):
+    scan = {"mapping_rows": 300_000, "slots": 40}
+    plan = plan_memory(scan, budget_mb)
+    enabled = [name for name in STRATEGIES if plan.enabled[name]]
+    assert enabled == [name for name in STRATEGIES if name != "disk_archive"][:len(enabled)]
+    if not plan.over_budget and enabled:
+        # one strategy fewer would not have fitted
+        fewer = plan_memory(scan, budget_mb)
+        fewer.enabled[enabled[-1]] = False
+        assert fewer.over_budget
+
+
+def test_archive_counts_only_when_the_caller_buffers_a_zip():
+    scan = {"mapping_rows": 300_000, "slots": 40}
+    assert plan_memory(scan, 250, archive=True).enabled["disk_archive"]
+    assert not plan_memory(scan, 250).enabled["disk_archive"]
+
+
+def test_disk_archive_zips_the_folder_into_a_file(tmp_path):
+    (tmp_path / "src" / "day1").mkdir(parents=True)
+    (tmp_path / "src" / "a.txt").write_text("a")
+    (tmp_path / "src" / "day1" / "b.txt").write_text("b")
+    path = disk_archive(str(tmp_path / "src"))
+    try:
+        assert not path.startswith(str(tmp_path))
+        with zipfile.ZipFile(path) as zf:
+            assert {n: zf.read(n) for n in zf.namelist() if not n.endswith("/")} == {"a.txt": b"a", "day1/b.txt": b"b"}
+    finally:
+        os.remove(path)
+
+
+# ---------------------------------------------------------------------
+def output_files(outdir):
+    return sorted(os.path.relpath(os.path.join(d, f), outdir) for d, _, files in os.walk(outdir) for f in files)
+
+
+def run_pipeline(allocated, **kwargs):
+    photos = os.path.join(ROOT, "photos")
+    alloc = allocated(**kwargs)
+    alloc.write_outputs()
+    alloc.generate_attendance_pdfs(photos, os.path.join(photos, "no_image_available.jpg"), booklet="slot")
+    return alloc
+
+
+def test_tiny_budget_gives_the_same_outputs(allocated):
+    pytest.importorskip("reportlab")
+    plain = run_pipeline(allocated)
+    bounded = run_pipeline(allocated, memory_budget_mb=1)
+
+    plan = bounded.memory_plan
+    assert plan.over_budget
+    assert plan.as_dict()["strategies"] == ["chunked_ingestion", "streaming_writers", "release_slots"]
+    assert bounded.stream_chunksize and bounded.streaming_writers and bounded.release_slots
+    assert not bounded.allocations  # every slot was released after its PDFs
+
+    files = output_files(plain.outdir)
+    assert files == output_files(bounded.outdir)
+    for name in files:
+        a, b = os.path.join(plain.outdir, name), os.path.join(bounded.outdir, name)
+        if name.endswith(".xlsx"):
+            pd.testing.assert_frame_equal(pd.read_excel(a), pd.read_excel(b))
+        elif name.endswith(".pdf"):
+            assert os.path.getsize(a) == os.path.getsize(b)
+        elif name.endswith(".sqlite"):
+            assert seat_rows(a) == seat_rows(b)
+
+
+def seat_rows(path):
+    with sqlite3.connect(path) as conn:
+        return sorted(conn.execute("SELECT * FROM seats").fetchall())
@@ -0,0 +1,95 @@
+#file with the tests of the packed photo bundle (photo_bundle.py)
+import os
+import shutil
+
+import pytest
+
+from conftest import ROOT
+from photo_bundle import PhotoBundle, build_bundle, photo_index
+
+
+@pytest.fixture
+def photos(tmp_path):
+    """A writable copy of a few sample photos."""
+    src = os.path.join(ROOT, "photos")
+    folder = tmp_path / "photos"
+    folder.mkdir()
+    for name in sorted(os.listdir(src))[:6]:
+        shutil.copy(os.path.join(src, name), folder / name)
+    return folder
+
+
+def assert_bundle_matches(bundle_path, folder):
+    expected = photo_index(str(folder))
+    with PhotoBundle(str(bundle_path)) as bundle:
+        assert set(bundle.index) == set(expected)
+        for roll, path in expected.items():
+            with open(path, "rb") as fh:
+                data = fh.read()
+            assert bytes(bundle.get(roll)) == data
+            assert bundle.open(roll).read() == data
+        assert bundle.get("missing") is None and bundle.open("missing") is None
+
+
+def test_round_trip_and_incremental_updates(photos, tmp_path):
+    bundle_path = tmp_path / "photos.bundle"
+    first = build_bundle(str(photos), str(bundle_path))
+    assert first["added"] == len(photo_index(str(photos)))
+    assert_bundle_matches(bundle_path, photos)
+
+    names = sorted(os.listdir(photos))
+    os.remove(photos / names[0])
+    with open(photos / names[1], "ab") as fh:
+        fh.write(b"changed")
+    shutil.copy(photos / names[2], photos / "9999XX99.jpg")
+    stats = build_bundle(str(photos), str(bundle_path))
+    assert (stats["added"], stats["updated"], stats["removed"]) == (1, 1, 1)
+    assert_bundle_matches(bundle_path, photos)
+
+    assert build_bundle(str(photos), str(bundle_path))["unchanged"] == len(photo_index(str(photos)))
+
+
+def test_stale_bundle_is_rewritten(photos, tmp_path):
+    bundle_path = tmp_path / "photos.bundle"
+    build_bundle(str(photos), str(bundle_path))
+    for name in sorted(os.listdir(photos))[1:]:
+        os.remove(photos / name)
+    build_bundle(str(photos), str(bundle_path))
+    assert_bundle_matches(bundle_path, photos)
+    assert os.path.getsize(bundle_path) < 2 * os.path.getsize(photos / os.listdir(photos)[0]) + 1024
+
+
+def test_damaged_bundle_is_rebuilt(photos, tmp_path):
+    bundle_path = tmp_path / "photos.bundle"
+    bundle_path.write_bytes(b"not a bundle")
+    with pytest.raises(ValueError):
+        PhotoBundle(str(bundle_path))
+    build_bundle(str(photos), str(bundle_path))
+    assert_bundle_matches(bundle_path, photos)
+
+
+def test_photo_index_prefers_jpg(tmp_path):
+    (tmp_path / "R1.png").write_bytes(b"png")
+    (tmp_path / "R1.jpg").write_bytes(b"jpg")
+    (tmp_path / "R2.png").write_bytes(b"png")
+    (tmp_path / "notes.txt").write_bytes(b"")
+    index = photo_index(str(tmp_path))
+    assert {r: os.path.basename(p) for r, p in index.items()} == {"R1": "R1.jpg", "R2": "R2.png"}
+
+
+def test_booklets_from_the_bundle_match_the_photo_folder(allocated, tmp_path):
+    pytest.importorskip("reportlab")
+    photos_dir = os.path.join(ROOT, "photos")
+    no_image = os.path.join(photos_dir, "no_image_available.jpg")
+    bundle_path = tmp_path / "photos.bundle"
+    build_bundle(photos_dir, str(bundle_path))
+
+    alloc = allocated()
+    alloc.generate_attendance_pdfs(photos_dir, no_image, pdf_outdir=str(tmp_path / "dir"), booklet="slot")
+    alloc.generate_attendance_pdfs(photos_dir, no_image, pdf_outdir=str(tmp_path / "bundle"), booklet="slot",
+                                   photo_bundle=str(bundle_path))
+
+    names = sorted(os.listdir(tmp_path / "dir"))
+    assert names == sorted(os.listdir(tmp_path / "bundle"))
+    for name in names:  # same pages and images; only timestamps and document ids differ
+        assert os.path.getsize(tmp_path / "dir" / name) == os.path.getsize(tmp_path / "bundle" / name)
@@ -0,0 +1,69 @@
+#file with the tests of the sampling profiler (profiler.py)
+import json
+import time
+
+from conftest import SAMPLE_INPUT
+from profiler import PROFILE_FILE, StackSampler, profiled
+from seating_arrangement import main
+
+
+def busy_leaf(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def read_collapsed(path):
+    counts = {}
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            stack, _, count = line.rstrip("\n").rpartition(" ")
+            counts[stack] = int(count)
+    return counts
+
+
+def test_profiled_block_writes_collapsed_stacks(tmp_path):
+    path = tmp_path / PROFILE_FILE
+    with profiled(str(path), interval=0.002) as sampler:
+        busy_leaf(0.2)
+    counts = read_collapsed(path)
+    assert sum(counts.values()) == sampler.samples > 0
+    leaf = "busy_leaf (test_profiler.py)"
+    assert any(stack.endswith(leaf) for stack in counts)
+    assert all(";" in stack and stack.split(";")[-1] != "" for stack in counts)
+    assert 0 <= sampler.overhead < 1
+
+
+def test_profiling_off_yields_nothing(tmp_path):
+    with profiled(None) as sampler:
+        pass
+    assert sampler is None
+
+
+def test_add_collapsed_merges_under_a_root_frame(tmp_path):
+    part = tmp_path / "shard.collapsed"
+    part.write_text("main (a.py);work (a.py) 3\nmain (a.py) 1\n", encoding="utf-8")
+    sampler = StackSampler()
+    sampler.counts["main (a.py)"] = 2
+    sampler.add_collapsed(str(part), prefix="shard_00")
+    sampler.add_collapsed(str(part))
+    out = tmp_path / "merged.collapsed"
+    sampler.write(str(out))
+    assert read_collapsed(out) == {
+        "main (a.py)": 3,
+        "main (a.py);work (a.py)": 3,
+        "shard_00;main (a.py)": 1,
+        "shard_00;main (a.py);work (a.py)": 3,
+    }
+
+
+def test_cli_profile(tmp_path, capsys):
+    outdir = tmp_path / "out"
+    assert main(["--input", SAMPLE_INPUT, "--outdir", str(outdir), "--no-pdf", "--shards", "2",
+                 "--profile", "--profile-interval", "2"]) == 0
+    run = json.loads(capsys.readouterr().out)["runs"][0]
+    assert run["profile"]["file"] == str(outdir / PROFILE_FILE)
+    assert run["profile"]["samples"] > 0
+    stacks = read_collapsed(outdir / PROFILE_FILE)
+    assert any(stack.startswith("shard_00;") for stack in stacks)  # the shards' own samples
+    assert not list((outdir / "logs").glob("*.collapsed"))
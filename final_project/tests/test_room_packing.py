@@ -0,0 +1,159 @@
+#file with the tests of the per-slot room packers (room_packing.py)
+import os
+import random
+
+import pandas as pd
+import pytest
+
+from room_packing import greedy_pack, optimized_pack, rooms_lower_bound, plan_score
+
+
+def random_slot(rng, n_subjects, n_rooms, fill=0.8):
+    capacities = [rng.choice([20, 30, 40, 60, 90]) for _ in range(n_rooms)]
+    total = int(sum(capacities) * fill)
+    cuts = sorted(rng.sample(range(1, total), n_subjects - 1))
+    sizes = [b - a for a, b in zip([0] + cuts, cuts + [total])]
+    return sizes, capacities
+
+
+def check_plan(plan, sizes, capacities, subject_caps=None):
+    """Every student seated exactly once, no room over capacity (or over its subject cap)."""
+    assert len(plan) == len(sizes)
+    load = [0] * len(capacities)
+    for size, pieces in zip(sizes, plan):
+        assert sum(c for _, c in pieces) == size
+        rooms = [r for r, _ in pieces]
+        assert len(rooms) == len(set(rooms))  # one piece per room and subject
+        for r, c in pieces:
+            assert c > 0
+            load[r] += c
+            if subject_caps is not None:
+                assert c <= subject_caps[r]
+    assert all(l <= cap for l, cap in zip(load, capacities))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimized_pack_seats_everybody_within_capacity(seed):
+    rng = random.Random(seed)
+    sizes, capacities = random_slot(rng, rng.randint(2, 12), rng.randint(3, 15))
+    buildings = [rng.choice("AB") for _ in capacities]
+    plan, info = optimized_pack(sizes, capacities, buildings, time_budget=0.05)
+    check_plan(plan, sizes, capacities)
+    assert info["lower_bound"] <= info["rooms_packed"] <= info["rooms_greedy"]
+    assert info["rooms_packed"] == plan_score(plan)[0]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_optimized_pack_keeps_subject_caps(seed):
+    rng = random.Random(seed)
+    sizes, capacities = random_slot(rng, rng.randint(3, 12), rng.randint(4, 15), fill=0.6)
+    caps = [(c + 1) // 2 for c in capacities]
+    plan, info = optimized_pack(sizes, capacities, time_budget=0.05, subject_caps=caps)
+    if info["fallback"]:
+        check_plan(plan, sizes, capacities)  # greedy's second pass may exceed a cap
+    else:
+        check_plan(plan, sizes, capacities, caps)
+
+
+def test_optimized_pack_reports_rooms_too_small():
+    plan, info = optimized_pack([50, 40], [30, 30, 20], time_budget=0.01)
+    assert plan is None
+    assert info["lower_bound"] is None
+
+
+def test_rooms_lower_bound():
+    assert rooms_lower_bound([10, 25], [30, 20, 5]) == 2
+    assert rooms_lower_bound([30], [30, 20]) == 1
+    assert rooms_lower_bound([], [30]) == 0
+    assert rooms_lower_bound([40], [30, 5]) is None
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_lower_bound_against_brute_force(seed):
+    rng = random.Random(seed)
+    capacities = [rng.randint(5, 40) for _ in range(rng.randint(1, 7))]
+    need = rng.randint(1, sum(capacities))
+    best = min(bin(mask).count("1") for mask in range(1, 2 ** len(capacities))
+               if sum(c for i, c in enumerate(capacities) if mask >> i & 1) >= need)
+    assert rooms_lower_bound([need], capacities) == best
+
+
+# ---------------------------------------------------------------------
+def allocate_slot(alloc, sizes, capacities, grids=None):
+    """Run SeatingAllocator.allocate_subject over one slot, deducting seats as allocate_all_days does."""
+    pool = [{'building': 'B', 'room_code': str(r), 'capacity_effective': c} for r, c in enumerate(capacities)]
+    for room, grid in zip(pool, grids or []):
+        room['grid'] = grid
+    plan, leftover = [], []
+    for s, size in enumerate(sizes):
+        assignments, pending = alloc.allocate_subject(f"S{s}", [f"{s}_{i}" for i in range(size)], pool)
+        pieces = []
+        for a in assignments:
+            r = int(a['room'])
+            pool[r]['capacity_effective'] -= len(a['rolls'])
+            pieces.append((r, len(a['rolls'])))
+        plan.append(pieces)
+        leftover.append(len(pending))
+    return plan, leftover
+
+
+@pytest.fixture
+def allocator(make_allocator):
+    return make_allocator("unused.xlsx")
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_pack_matches_allocate_subject(allocator, seed):
+    rng = random.Random(seed)
+    sizes, capacities = random_slot(rng, rng.randint(2, 10), rng.randint(2, 12), fill=rng.choice([0.7, 1.0]))
+    if seed % 4 == 0:
+        sizes[0] += 15  # more students than seats: both report the same leftover
+    assert greedy_pack(sizes, capacities) == allocate_slot(allocator, sizes, capacities)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_greedy_pack_matches_allocate_subject_with_seat_layout(allocator, seed):
+    allocator.seat_layout = True
+    rng = random.Random(seed)
+    sizes, capacities = random_slot(rng, rng.randint(2, 10), rng.randint(2, 12), fill=0.7)
+    grids = [(-(-c // 6), 6) for c in capacities]
+    caps = [min(c, (rows * cols + 1) // 2) for c, (rows, cols) in zip(capacities, grids)]
+    assert greedy_pack(sizes, capacities, caps) == allocate_slot(allocator, sizes, capacities, grids)
+
+
+def seated(alloc):
+    """{(date, slot, subject): sorted rolls} over every room of the run."""
+    out = {}
+    for allocs in alloc.allocations.values():
+        for a in allocs:
+            out.setdefault((str(a['date']), a['slot'], a['subject']), []).extend(a['rolls'])
+    return {k: sorted(v) for k, v in out.items()}
+
+
+def test_optimize_mode_seats_the_same_students_in_fewer_rooms(allocated):
+    runs = {}
+    for packing in ("greedy", "optimize"):
+        alloc = allocated(packing=packing)
+        alloc.write_outputs()
+        runs[packing] = alloc
+    greedy, packed = runs["greedy"], runs["optimize"]
+
+    assert seated(packed) == seated(greedy)
+    report = pd.read_excel(os.path.join(packed.outdir, "op_packing_report.xlsx"))
+    assert (report["Rooms (packed)"] <= report["Rooms (greedy)"]).all()
+    assert report["Rooms (packed)"].sum() < report["Rooms (greedy)"].sum()
+    assert not os.path.exists(os.path.join(greedy.outdir, "op_packing_report.xlsx"))
+
+
+def test_unknown_packing_mode(make_allocator):
+    with pytest.raises(ValueError):
+        make_allocator(packing="fastest")
+
+
+def test_optimize_mode_keeps_seat_layouts_conflict_free(allocated):
+    alloc = allocated(packing="optimize", seat_layout=True)
+    alloc.write_outputs()
+    layout = pd.read_excel(os.path.join(alloc.outdir, "op_seat_layout_report.xlsx"))
+    report = pd.read_excel(os.path.join(alloc.outdir, "op_packing_report.xlsx"))
+    assert layout["Conflicting seats"].sum() == 0
+    assert report["Rooms (packed)"].sum() < report["Rooms (greedy)"].sum()
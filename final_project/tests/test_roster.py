@@ -0,0 +1,42 @@
+#file with the tests of the roll-number parser and roster (roster.py)
+import numpy as np
+import pandas as pd
+
+from roster import ROLL_PATTERN, Roster, benchmark, parse_rolls
+
+
+def test_parse_rolls_parts():
+    parsed = parse_rolls(["2511AI07", " 2101CS123 ", "AI123", None, "2511AI07"])
+    assert parsed["Roll"].tolist()[:3] == ["2511AI07", "2101CS123", "AI123"]
+    assert parsed["Year"].tolist() == [25, 21, pd.NA, pd.NA, 25]
+    assert parsed["Program"].tolist() == [11, 1, pd.NA, pd.NA, 11]
+    assert parsed["Branch"].astype(object).tolist()[:3] == ["AI", "CS", "AI"]
+    assert parsed["Serial"].tolist() == [7, 123, 123, pd.NA, 7]
+
+
+def test_parse_rolls_matches_per_row_regex():
+    rng = np.random.default_rng(0)
+    rolls = pd.Series([f"{y}{p}{b}{s:02d}" for y, p, b, s in zip(
+        rng.integers(14, 26, 2000), rng.choice(["01", "11", "21"], 2000),
+        rng.choice(["AI", "CS", "MM"], 2000), rng.integers(1, 100, 2000))])
+    regex = rolls.str.extract(ROLL_PATTERN)
+    parsed = parse_rolls(rolls)
+    assert (parsed["Branch"].astype(object) == regex["branch"]).all()
+    assert (parsed["Year"].astype(int) == regex["year"].astype(int)).all()
+    assert (parsed["Serial"].astype(int) == regex["serial"].astype(int)).all()
+
+
+def test_roster_dedupes_and_looks_up_ids():
+    roster = Roster.from_rolls(["2511AI07", "2511AI07", "", None, "2101CS12"],
+                               names={"2511AI07": "Asha"})
+    assert len(roster) == 2
+    assert roster.ids(["2101CS12", "missing", " 2511AI07"]).tolist() == [1, -1, 0]
+    frame = roster.frame()
+    assert frame["Name"].iloc[0] == "Asha" and pd.isna(frame["Name"].iloc[1])
+    assert frame["Branch"].astype(object).tolist() == ["AI", "CS"]
+
+
+def test_benchmark_covers_distinct_and_repeated_rolls():
+    results = benchmark(n_rolls=20_000)
+    assert results["unique"]["distinct rolls"] == 20_000
+    assert results["duplicated"]["distinct rolls"] < 20_000
@@ -0,0 +1,89 @@
+#file with the tests of the seat lookup index and its service (seat_index.py)
+import json
+import os
+import threading
+from http.server import ThreadingHTTPServer
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from seat_index import SEAT_INDEX_FILE, SeatIndex, make_handler, main
+
+
+@pytest.fixture
+def run(allocated):
+    """Allocated sample workbook with its outputs (seat index included) written."""
+    alloc = allocated()
+    alloc.write_outputs()
+    return alloc
+
+
+def seats(alloc):
+    """(roll, date, slot, subject, room) of every allocated seat."""
+    return sorted((roll, str(a['date']).split()[0], a['slot'], a['subject'], a['room'])
+                  for allocs in alloc.allocations.values() for a in allocs for roll in a['rolls'])
+
+
+def test_index_holds_every_allocated_seat(run):
+    index = SeatIndex(os.path.join(run.outdir, SEAT_INDEX_FILE))
+    try:
+        rows = index._query("SELECT roll, name, date, slot, subject, building, room FROM seats", [])
+    finally:
+        index.close()
+    assert sorted((r['roll'], r['date'], r['slot'], r['subject'], r['room']) for r in rows) == seats(run)
+    assert all(r['name'] == run.roll_name_map.get(r['roll'], "Unknown Name") for r in rows)
+
+
+def test_roll_and_room_lookups(run):
+    roll, date, slot, subject, room = seats(run)[0]
+    index = SeatIndex(os.path.join(run.outdir, SEAT_INDEX_FILE))
+    try:
+        mine = index.lookup_roll(roll)
+        assert [(r['date'], r['slot'], r['subject'], r['room']) for r in mine] == \
+            sorted((d, s, c, rm) for rl, d, s, c, rm in seats(run) if rl == roll)
+        assert all(r['slot'] == slot for r in index.lookup_roll(roll, date=date, slot=slot))
+        in_room = {r['roll'] for r in index.lookup_room(date + " 00:00:00", slot, room)}
+        assert in_room == {rl for rl, d, s, c, rm in seats(run) if (d, s, rm) == (date, slot, room)}
+        assert index.lookup_roll("NOBODY") == []
+    finally:
+        index.close()
+
+
+def test_missing_index_is_reported(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SeatIndex(str(tmp_path / SEAT_INDEX_FILE))
+
+
+def test_http_service(run):
+    roll, date, slot, subject, room = seats(run)[0]
+    index = SeatIndex(os.path.join(run.outdir, SEAT_INDEX_FILE))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(index))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    def get(path):
+        try:
+            with urlopen(base + path) as resp:
+                return resp.status, json.load(resp)
+        except HTTPError as e:
+            return e.code, json.load(e)
+
+    try:
+        status, body = get(f"/roll/{roll}")
+        assert status == 200 and body == index.lookup_roll(roll)
+        status, body = get(f"/room/{room}?date={date}&slot={slot}")
+        assert status == 200 and roll in {r['roll'] for r in body}
+        assert get(f"/room/{room}")[0] == 400
+        assert get("/elsewhere")[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+        index.close()
+
+
+def test_cli_lookup(run, capsys):
+    roll = seats(run)[0][0]
+    assert main([os.path.join(run.outdir, SEAT_INDEX_FILE), "--roll", roll]) == 0
+    assert {r['roll'] for r in json.loads(capsys.readouterr().out)} == {roll}
@@ -0,0 +1,79 @@
+#file with the tests of the seat-layout stage (seat_layout.py)
+import os
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from seat_layout import conflicts, layout_room, seats_of, default_grid
+
+
+def random_counts(rng, n_seats, n_subjects, fill):
+    """Subject sizes filling `fill` of the seats, none above half the seats (rounded up)."""
+    half = (n_seats + 1) // 2
+    total = int(n_seats * fill)
+    counts = [0] * n_subjects
+    for _ in range(total):
+        open_ = [s for s in range(n_subjects) if counts[s] < half]
+        if not open_:
+            break
+        counts[rng.choice(open_)] += 1
+    return counts
+
+
+def test_conflicts_marks_both_neighbours():
+    grid = np.array([[0, 0, 1],
+                     [1, -1, 1]])
+    assert conflicts(grid).tolist() == [[True, True, True],
+                                        [False, False, True]]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_layout_room_is_conflict_free(seed):
+    rng = random.Random(seed)
+    rows, cols = rng.randint(1, 10), rng.randint(1, 10)
+    counts = random_counts(rng, rows * cols, rng.randint(2, 5), rng.choice([0.5, 0.8, 1.0]))
+    grid, bad = layout_room(counts, rows, cols)
+    assert grid.shape == (rows, cols)
+    assert [int((grid == s).sum()) for s in range(len(counts))] == counts
+    assert bad == 0
+    assert not conflicts(grid).any()
+
+
+def test_layout_room_reports_unavoidable_conflicts():
+    # 5 students of one subject on 3x3 seats fit one colour; 6 cannot avoid a neighbour
+    assert layout_room([5, 4], 3, 3)[1] == 0
+    grid, bad = layout_room([6, 3], 3, 3)
+    assert bad == int(conflicts(grid).sum()) > 0
+
+
+def test_layout_room_rejects_overfull_room():
+    with pytest.raises(ValueError):
+        layout_room([7, 6], 3, 4)
+
+
+def test_seat_labels():
+    grid, _ = layout_room([2], 2, 2)
+    assert seats_of(grid, 0) == ["R1C1", "R2C2"]
+    assert default_grid(45) == (8, 6)
+
+
+def test_sample_run_with_seat_layout(allocated):
+    plain = allocated()
+    alloc = allocated(seat_layout=True)
+    alloc.write_outputs()
+
+    def seated(a):
+        return sorted(r for allocs in a.allocations.values() for x in allocs for r in x['rolls'])
+    assert seated(alloc) == seated(plain)
+
+    for allocs in alloc.allocations.values():
+        rooms = {}
+        for a in allocs:
+            assert len(a['seats']) == len(a['rolls'])
+            rooms.setdefault(a['room'], []).extend(a['seats'])
+        assert all(len(set(seats)) == len(seats) for seats in rooms.values())  # one student per seat
+
+    report = pd.read_excel(os.path.join(alloc.outdir, "op_seat_layout_report.xlsx"))
+    assert len(report) and report['Conflicting seats'].sum() == 0
@@ -0,0 +1,46 @@
+#file with the tests of sharded runs (sharding.py): same result as one run
+import os
+
+import pandas as pd
+import pytest
+
+import memory_budget
+from sharding import plan_shards, run_sharded
+
+
+def output_files(outdir):
+    return sorted(os.path.relpath(os.path.join(d, f), outdir) for d, _, files in os.walk(outdir) for f in files
+                  if not f.endswith(".log"))
+
+
+def test_shards_cover_the_timetable_in_order(loaded):
+    alloc = loaded()
+    shards = plan_shards(alloc.timetable, alloc.subject_rolls, 3)
+    dates = [str(e['Date']).split()[0] for e in alloc.timetable]
+    assert len(shards) == 3
+    assert [d for shard in shards for d in shard] == dates
+
+
+@pytest.mark.parametrize("workers, shared", [(1, True), (1, False), (2, True)])
+def test_sharded_run_matches_single_run(loaded, workers, shared):
+    single = loaded()
+    single.allocate_all_days()
+    single.write_outputs()
+
+    alloc = loaded()
+    run_sharded(alloc, 3, workers=workers, shared=shared)
+    assert dict(alloc.allocations) == dict(single.allocations)
+    assert output_files(alloc.outdir) == output_files(single.outdir)
+    overall = "op_overall_seating_arrangement.xlsx"
+    pd.testing.assert_frame_equal(pd.read_excel(os.path.join(alloc.outdir, overall)),
+                                  pd.read_excel(os.path.join(single.outdir, overall)))
+
+
+def test_memory_plan_is_made_once(loaded, monkeypatch):
+    scans = []
+    prescan = memory_budget.prescan
+    monkeypatch.setattr(memory_budget, "prescan", lambda *a: scans.append(a) or prescan(*a))
+    alloc = loaded(memory_budget_mb=50)
+    run_sharded(alloc, 3, workers=1)
+    assert len(scans) == 1  # the coordinator's pre-scan; the shards reuse its plan
+    assert alloc.release_slots and alloc.streaming_writers
@@ -0,0 +1,38 @@
+#file with the tests of the shared-memory inputs (shared_data.py)
+import pytest
+
+from shared_data import SharedInputs
+
+
+@pytest.mark.parametrize("n_dates", [None, 2])
+def test_attached_inputs_match_the_workbook(make_allocator, loaded, n_dates):
+    coordinator = loaded()
+    dates = None
+    if n_dates:
+        dates = [str(e['Date']).split()[0] for e in coordinator.timetable][:n_dates]
+
+    parsed = loaded(dates=dates)
+    published = SharedInputs.publish(coordinator)
+    try:
+        attached = make_allocator(dates=dates)
+        attached.load_shared(published.handle)
+    finally:
+        published.close()
+
+    assert attached.timetable == parsed.timetable
+    wanted = set(attached.subject_rolls)
+    assert wanted and attached.roll_name_map
+    assert {c: parsed.subject_rolls[c] for c in wanted} == dict(attached.subject_rolls)
+    for roll, courses in attached.roll_courses.items():
+        assert courses == [c for c in parsed.roll_courses[roll] if c in wanted]
+    assert all(parsed.roll_name_map[r] == n for r, n in attached.roll_name_map.items())
+    assert attached.room_capacity == parsed.room_capacity
+
+
+def test_published_block_is_released(loaded):
+    alloc = loaded()
+    published = SharedInputs.publish(alloc)
+    handle = published.handle
+    published.close()
+    with pytest.raises(FileNotFoundError):
+        SharedInputs.attach(handle)
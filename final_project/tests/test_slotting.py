@@ -0,0 +1,77 @@
+#file with the tests of the exam slotting engine (slotting.py)
+import os
+from itertools import combinations
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from slotting import SLOTS, conflict_graph, plan_slots, slots_from_dates, write_timetable
+
+
+def campus(seed, logger, n_cohorts=12, cohort_courses=4, cohort_students=30, n_electives=10):
+    """Cohorts sitting all their core courses, plus electives taken across cohorts."""
+    rng = np.random.default_rng(seed)
+    subject_rolls = {}
+    for k in range(n_cohorts):
+        rolls = [f"24{k:02d}CS{i:03d}" for i in range(cohort_students)]
+        for j in range(cohort_courses):
+            subject_rolls[f"K{k:02d}_{j}"] = list(rolls)
+        for e in rng.integers(0, n_electives, 2):
+            subject_rolls.setdefault(f"E{e:02d}", []).extend(rolls[:5])
+    rooms = [{'capacity_effective': 200}, {'capacity_effective': 200}]
+    return SimpleNamespace(subject_rolls=subject_rolls, room_capacity=rooms, timetable=[], logger=logger)
+
+
+def brute_force_conflicts(alloc, plan):
+    """Shared students per pair of courses in the same slot, counted by a loop over pairs."""
+    slot = dict(zip(plan.courses, plan.slot_of))
+    same = 0
+    for a, b in combinations(plan.courses, 2):
+        if slot[a] == slot[b]:
+            same += len(set(alloc.subject_rolls[a]) & set(alloc.subject_rolls[b]))
+    return same
+
+
+def test_conflict_graph_counts_shared_students_once():
+    rolls = {"A": ["r1", "r2", "r2"], "B": ["r2", "r3"], "C": ["r4"]}
+    graph, sizes = conflict_graph(rolls, ["A", "B", "C"])
+    assert graph.toarray().tolist() == [[0, 1, 0], [1, 0, 0], [0, 0, 0]]
+    assert sizes.tolist() == [2, 2, 1]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_plan_is_clash_free_and_within_capacity(seed, logger):
+    alloc = campus(seed, logger)
+    plan = plan_slots(alloc, slots=slots_from_dates("2026-05-04", 6), time_budget=0.5)
+    assert (plan.slot_of >= 0).all()
+    assert (plan.load <= plan.capacity).all()
+    assert plan.conflicts()["same slot"] == brute_force_conflicts(alloc, plan) == 0
+
+
+def test_conflicts_match_brute_force_when_slots_are_short(logger):
+    alloc = campus(0, logger)
+    plan = plan_slots(alloc, slots=slots_from_dates("2026-05-04", 1), time_budget=0.1)
+    assert plan.conflicts()["same slot"] == brute_force_conflicts(alloc, plan) > 0
+
+
+def test_timetable_lists_every_course_once(logger):
+    alloc = campus(1, logger)
+    plan = plan_slots(alloc, slots=slots_from_dates("2026-05-04", 6), time_budget=0.1)
+    cells = [c for col in ("Morning", "Evening") for cell in plan.timetable()[col]
+             if cell != "NO EXAM" for c in cell.split("; ")]
+    assert sorted(cells) == sorted(alloc.subject_rolls)
+
+
+def test_sample_timetable_without_clashes(loaded, tmp_path):
+    alloc = loaded()
+    courses = [s.strip() for e in alloc.timetable for slot in SLOTS for s in e[slot] if s != 'NO EXAM']
+    plan = plan_slots(alloc, courses=courses, time_budget=0.5)
+    assert plan.conflicts()["same slot"] == 0
+
+    out = os.path.join(tmp_path, "op_timetable.xlsx")
+    write_timetable(out, plan, alloc)
+    sheets = pd.read_excel(out, sheet_name=None)
+    assert list(sheets) == ["in_timetable", "Summary", "Courses", "Slots"]
+    assert sorted(sheets["Courses"].iloc[:, 0]) == sorted(plan.courses)
@@ -0,0 +1,61 @@
+#file with the tests of streaming ingestion of in_course_roll_mapping (seating_allocator.py)
+import logging
+import re
+
+import pandas as pd
+import pytest
+
+from conftest import SAMPLE_INPUT
+from instrumentation import current_rss_mb, timed_phase
+from seating_allocator import iter_sheet_chunks
+
+
+def test_chunks_concatenate_to_the_sheet():
+    sheet = pd.read_excel(SAMPLE_INPUT, sheet_name="in_course_roll_mapping")
+    chunks = list(iter_sheet_chunks(SAMPLE_INPUT, "in_course_roll_mapping", chunksize=1000))
+    assert all(len(c) <= 1000 for c in chunks)
+    streamed = pd.concat(chunks, ignore_index=True)
+    assert streamed["rollno"].tolist() == sheet["rollno"].astype(str).tolist()
+    assert streamed["course_code"].tolist() == sheet["course_code"].tolist()
+
+
+def test_missing_sheet_is_reported():
+    with pytest.raises(ValueError, match="in_missing"):
+        list(iter_sheet_chunks(SAMPLE_INPUT, "in_missing"))
+
+
+@pytest.mark.parametrize("chunksize", [7, 997, 50000])
+def test_streamed_load_matches_whole_sheet(loaded, chunksize):
+    whole = loaded()
+    streamed = loaded(stream_chunksize=chunksize)
+    assert streamed.subject_rolls == whole.subject_rolls
+    assert streamed.roll_courses == whole.roll_courses
+    assert streamed.roll_name_map == whole.roll_name_map
+    assert streamed.course_roll_map is None  # the sheet is never held as a whole
+
+
+def test_mapping_from_a_csv_file(loaded, tmp_path):
+    csv = tmp_path / "mapping.csv"
+    pd.read_excel(SAMPLE_INPUT, sheet_name="in_course_roll_mapping").to_csv(csv, index=False)
+    whole = loaded()
+    streamed = loaded(stream_chunksize=500, course_roll_file=str(csv))
+    assert streamed.subject_rolls == whole.subject_rolls
+
+
+def test_timed_phase_logs_the_phase(caplog, logger):
+    with caplog.at_level(logging.INFO, logger="tests"):
+        with timed_phase(logger, "demo"):
+            pass
+    assert any(r.getMessage().startswith("Phase demo took") for r in caplog.records)
+
+
+def test_timed_phase_reports_the_phase_rss_change(caplog, logger):
+    if current_rss_mb() is None:
+        pytest.skip("no /proc/self/statm on this platform")
+    with caplog.at_level(logging.INFO, logger="tests"):
+        with timed_phase(logger, "grow"):
+            data = b"x" * (64 * 1024 * 1024)
+    message = caplog.records[-1].getMessage()
+    match = re.search(r"RSS \+([\d.]+) MB, process peak so far", message)
+    assert match and float(match.group(1)) >= 60, message
+    del data
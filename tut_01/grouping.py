@@ -0,0 +1,319 @@
+#file with the group assignment strategies used by tut01.py (vectorized, no per-student loops)
+import io
+import math
+import time
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+
+# 2511AI07 -> year 25, program 11, branch AI, serial 07 (year/program/serial are optional,
+# so short forms such as AI123 still give a branch). Same parser as final_project/roster.py,
+# kept here so this tool runs on its own.
+ROLL_PATTERN = r'(?P<year>\d{2})?(?P<program>\d{2})?(?P<branch>[A-Z]+)(?P<serial>\d+)?'
+
+
+def parse_rolls(values):
+    """Parse roll numbers into Roll, Year, Program, Branch, Serial columns.
+       Each distinct roll is parsed once and broadcast back with one take;
+       parts that are not present are NaN, Branch is categorical.
+    """
+    rolls = pd.Series(values).reset_index(drop=True)
+    if rolls.dtype != object:
+        rolls = rolls.astype(object)
+    mask = rolls.notna()
+    rolls[mask] = rolls[mask].astype(str).str.strip()
+    codes, uniques = pd.factorize(rolls)
+    parts = pd.Series(uniques, dtype=object).str.extract(ROLL_PATTERN)
+
+    def expand(col, dtype):
+        column = parts[col].astype(dtype)
+        taken = column.take(np.where(codes >= 0, codes, 0)).reset_index(drop=True)
+        return taken.where(codes >= 0)
+
+    return pd.DataFrame({
+        "Roll": rolls,
+        "Year": expand("year", "Int16"),
+        "Program": expand("program", "Int16"),
+        "Branch": expand("branch", "category"),
+        "Serial": expand("serial", "Int32"),
+    })
+
+def students_per_group(total_students, n):
+    """Group size used by both strategies: ceil(total / n)."""
+    if n is None or int(n) < 1:
+        raise ValueError("Number of groups must be at least 1")
+    return max(1, math.ceil(total_students / int(n)))
+
+
+def branch_codes(branches):
+    """Return (codes, branch_names) with branches ordered largest first (ties by name).
+       Students without a branch get code -1.
+    """
+    branches = pd.Series(branches).reset_index(drop=True)
+    sizes = branches.value_counts()
+    ordered = sorted(sizes.index, key=lambda b: (-sizes[b], b))
+    codes = pd.Categorical(branches, categories=ordered).codes.astype(np.int64)
+    return codes, ordered
+
+
+def _rank_within_branch(codes):
+    """0,1,2,... for the students of each branch, in their original order."""
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes, minlength=1)
+    starts = np.cumsum(counts) - counts
+    rank = np.empty(len(codes), dtype=np.int64)
+    rank[order] = np.arange(len(codes)) - np.repeat(starts, counts)
+    return rank
+
+
+def _branchwise_sequence(codes):
+    """Dealing order of the branchwise mix: round r deals student r of every branch,
+       branches in size order. Does not depend on the number of groups.
+    """
+    return np.lexsort((codes, _rank_within_branch(codes)))
+
+
+def _uniform_sequence(codes):
+    """Dealing order of the uniform mix: branch by branch, original order inside a branch."""
+    return np.argsort(codes, kind="stable")
+
+
+def _ids_from_sequence(sequence, x, n_students):
+    """Student at position p of the dealing sequence goes to group p // x."""
+    ids = np.empty(n_students, dtype=np.int64)
+    ids[sequence] = np.arange(len(sequence)) // x
+    return ids
+
+
+def branchwise_mix_ids(branches, n):
+    """Branchwise mix: take one student from each branch in turn (largest branch first)
+       and fill groups of ceil(total / n) one after another.
+       Returns a 0-based group id per student (-1 for students without a branch).
+    """
+    codes, _ = branch_codes(branches)
+    x = students_per_group(len(codes), n)
+    ids = np.full(len(codes), -1, dtype=np.int64)
+    valid = np.flatnonzero(codes >= 0)
+    if len(valid) == 0:
+        return ids
+    sequence = _branchwise_sequence(codes[valid])
+    ids[valid] = _ids_from_sequence(sequence, x, len(valid))
+    return ids
+
+
+def branchwise_positions(branches):
+    """Position of each student in the branchwise dealing order (-1 without a branch);
+       pass to split_groups so group rows come out in the order students were dealt.
+    """
+    codes, _ = branch_codes(branches)
+    positions = np.full(len(codes), -1, dtype=np.int64)
+    valid = np.flatnonzero(codes >= 0)
+    positions[valid[_branchwise_sequence(codes[valid])]] = np.arange(len(valid))
+    return positions
+
+
+def uniform_mix_ids(branches, n):
+    """Uniform mix: list students branch by branch (largest branch first) and cut the
+       list into consecutive groups of ceil(total / n).
+       Returns a 0-based group id per student (-1 for students without a branch).
+    """
+    codes, _ = branch_codes(branches)
+    x = students_per_group(len(codes), n)
+    ids = np.full(len(codes), -1, dtype=np.int64)
+    valid = np.flatnonzero(codes >= 0)
+    if len(valid) == 0:
+        return ids
+    sequence = _uniform_sequence(codes[valid])
+    ids[valid] = _ids_from_sequence(sequence, x, len(valid))
+    return ids
+
+
+def split_groups(df, group_ids, n_groups=None, positions=None):
+    """Split df into one DataFrame per group id (0..n_groups-1, empty groups included).
+       Rows inside a group follow `positions` (e.g. branchwise_positions), else df order.
+    """
+    group_ids = np.asarray(group_ids)
+    if n_groups is None:
+        n_groups = int(group_ids.max()) + 1 if len(group_ids) else 0
+    if positions is None:
+        order = np.argsort(group_ids, kind="stable")
+    else:
+        order = np.lexsort((np.asarray(positions), group_ids))
+    sorted_ids = group_ids[order]
+    bounds = np.searchsorted(sorted_ids, np.arange(n_groups + 1))
+    return [df.iloc[order[bounds[g]:bounds[g + 1]]] for g in range(n_groups)]
+
+
+def ordered_roster(df, branch_col="Branch"):
+    """All students branch by branch (largest branch first, original order inside a branch).
+       Students without a branch are dropped, as in the per-branch lists.
+    """
+    codes, _ = branch_codes(df[branch_col])
+    keep = np.flatnonzero(codes >= 0)
+    order = keep[np.argsort(codes[keep], kind="stable")]
+    return df.iloc[order].reset_index(drop=True)
+
+
+def group_stats(branches, group_ids, n_groups, branch_names):
+    """Branch counts per group as one crosstab: columns Group, <branch>..., one row per group."""
+    ids = np.asarray(group_ids)
+    valid = ids >= 0
+    counts = pd.crosstab(ids[valid], np.asarray(branches)[valid])
+    counts = counts.reindex(index=range(n_groups), columns=branch_names, fill_value=0)
+    counts.insert(0, "Group", [f"Group{i}" for i in range(1, n_groups + 1)])
+    return counts.reset_index(drop=True).rename_axis(columns=None)
+
+
+def sweep_group_counts(branches, candidates):
+    """Compare branchwise and uniform mixes for many candidate group counts.
+       The dealing orders do not depend on n, so they are computed once; each candidate
+       then costs one bincount. Returns one row per (n, strategy) with:
+       - Groups: non-empty groups, Min size / Max size
+       - Branch spread: mean over branches of (max - min) count across non-empty groups
+       - Imbalance: share of students that would have to move for every group to
+         match the overall branch mix (0 = perfect)
+    """
+    codes, names = branch_codes(branches)
+    k = codes[codes >= 0]
+    total, n_branches = len(k), len(names)
+    rows = []
+    if total == 0:
+        return pd.DataFrame(rows)
+    branch_share = np.bincount(k, minlength=n_branches) / total
+    for strategy, sequence in [("Branchwise", _branchwise_sequence(k)), ("Uniform", _uniform_sequence(k))]:
+        k_seq = k[sequence]  # branch of the student at each dealing position
+        positions = np.arange(total)
+        for n in candidates:
+            x = students_per_group(total, n)
+            n_groups = -(-total // x)  # non-empty groups
+            counts = np.bincount((positions // x) * n_branches + k_seq,
+                                 minlength=n_groups * n_branches).reshape(n_groups, n_branches)
+            sizes = counts.sum(axis=1)
+            ideal = sizes[:, None] * branch_share[None, :]
+            rows.append({
+                "n": int(n),
+                "Strategy": strategy,
+                "Groups": n_groups,
+                "Min size": int(sizes.min()),
+                "Max size": int(sizes.max()),
+                "Branch spread": round(float((counts.max(axis=0) - counts.min(axis=0)).mean()), 2),
+                "Imbalance": round(float(np.abs(counts - ideal).sum() / (2 * total)), 4),
+            })
+    return pd.DataFrame(rows)
+
+
+def stratify_columns(df, columns, bands=4):
+    """Stratum label per student for each column. Numeric columns with more than
+       `bands` distinct values (e.g. CGPA) are cut into quantile bands.
+    """
+    strata = pd.DataFrame(index=df.index)
+    for col in columns:
+        values = df[col]
+        if pd.api.types.is_numeric_dtype(values) and values.nunique() > bands:
+            values = pd.qcut(values, q=bands, duplicates="drop")
+        strata[col] = values
+    return strata
+
+
+def stratified_group_ids(df, columns, n, bands=4):
+    """Balance groups on several columns at once: sort students by the composite
+       stratum (first column most significant) and deal them out cyclically, so
+       every group gets floor/ceil of each stratum. O(n log n).
+    """
+    n = int(n)
+    if n < 1:
+        raise ValueError("Number of groups must be at least 1")
+    strata = stratify_columns(df, columns, bands)
+    keys = [pd.factorize(strata[col], sort=True)[0] for col in columns]
+    order = np.lexsort(keys[::-1]) if keys else np.arange(len(df))
+    ids = np.empty(len(df), dtype=np.int64)
+    ids[order] = np.arange(len(df)) % n
+    return ids, strata
+
+
+def balance_stats(strata, group_ids, n_groups):
+    """Per-group balance report: Size plus, for each column, the largest deviation of
+       any value's count from its ideal share (total / n_groups).
+       Returns (summary DataFrame, {column: per-group count crosstab}).
+    """
+    ids = np.asarray(group_ids)
+    summary = pd.DataFrame({"Group": [f"Group{i}" for i in range(1, n_groups + 1)]})
+    summary["Size"] = np.bincount(ids, minlength=n_groups)
+    counts_by_col = {}
+    for col in strata.columns:
+        counts = pd.crosstab(ids, strata[col].to_numpy()).reindex(index=range(n_groups), fill_value=0)
+        ideal = counts.sum(axis=0).to_numpy() / n_groups
+        summary[f"{col} max deviation"] = np.abs(counts.to_numpy() - ideal).max(axis=1).round(2)
+        counts.columns = counts.columns.astype(str)
+        counts.insert(0, "Group", summary["Group"].to_numpy())
+        counts_by_col[col] = counts.reset_index(drop=True).rename_axis(columns=None)
+    return summary, counts_by_col
+
+
+def build_zip(csv_folders, sheets, excel_name="final_groups.xlsx"):
+    """Build a zip entirely in memory and return its bytes.
+       csv_folders: {folder: [(file name, DataFrame), ...]} written as CSV
+       sheets: {sheet name: DataFrame} written into one workbook `excel_name`
+    """
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for folder, frames in csv_folders.items():
+            for name, frame in frames:
+                zipf.writestr(f"{folder}/{name}", frame.to_csv(index=False))
+
+        excel = io.BytesIO()
+        with pd.ExcelWriter(excel, engine="openpyxl") as writer:
+            for sheet_name, frame in sheets.items():
+                frame.to_excel(writer, sheet_name=sheet_name[:31], index=False)
+        zipf.writestr(excel_name, excel.getvalue())
+    return buf.getvalue()
+
+
+def numbered(groups):
+    """[(groupN.csv, DataFrame), ...] for a list of group DataFrames."""
+    return [(f"group{i}.csv", group) for i, group in enumerate(groups, start=1)]
+
+
+def build_assignment_zip(branch_lists, branchwise_groups, uniform_groups, branchwise_stats, uniform_stats):
+    """Build assignment.zip entirely in memory and return its bytes.
+       Layout: student_groups/<BRANCH>.csv, branchwise_mix/groupN.csv,
+       uniform_mix/groupN.csv and final_groups.xlsx.
+    """
+    return build_zip(
+        {
+            "student_groups": [(f"{branch}.csv", group) for branch, group in branch_lists],
+            "branchwise_mix": numbered(branchwise_groups),
+            "uniform_mix": numbered(uniform_groups),
+        },
+        {"Branchwise_Mix": branchwise_stats, "Uniform_Mix": uniform_stats},
+    )
+
+
+def benchmark(n_students=100_000, n_groups=1_000, n_branches=12, seed=0):
+    """Time both strategies on a synthetic roster; returns seconds per strategy."""
+    rng = np.random.default_rng(seed)
+    names = np.array([f"B{i:02d}" for i in range(n_branches)])
+    branches = names[rng.integers(0, n_branches, n_students)]
+    timings = {}
+    for label, fn in [("branchwise", branchwise_mix_ids), ("uniform", uniform_mix_ids)]:
+        start = time.perf_counter()
+        fn(branches, n_groups)
+        timings[label] = time.perf_counter() - start
+
+    roster = pd.DataFrame({
+        "Branch": branches,
+        "Year": rng.integers(20, 26, n_students),
+        "Gender": np.array(["F", "M"])[rng.integers(0, 2, n_students)],
+        "CGPA": rng.uniform(5, 10, n_students).round(2),
+    })
+    start = time.perf_counter()
+    stratified_group_ids(roster, ["Branch", "Year", "Gender", "CGPA"], n_groups)
+    timings["stratified"] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == "__main__":
+    for label, secs in benchmark().items():
+        print(f"{label}: {secs * 1000:.1f} ms for 100k students / 1000 groups")
@@ -0,0 +1,5 @@
+#file with the pytest setup: the modules live flat in tut_01/, next to this folder
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,217 @@
+#file with the tests of the group strategies (grouping.py) against the original per-student loops
+import io
+import math
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from grouping import (
+    balance_stats, branch_codes, branchwise_mix_ids, branchwise_positions, build_assignment_zip, group_stats, ordered_roster, parse_rolls, split_groups,
+    stratified_group_ids, students_per_group, sweep_group_counts, uniform_mix_ids,
+)
+
+
+def random_branches(seed, n_students=None):
+    rng = np.random.default_rng(seed)
+    n_students = n_students or int(rng.integers(1, 300))
+    names = np.array(["AI", "CB", "CE", "CS", "EE", "ME", "MM"])[:int(rng.integers(1, 8))]
+    return names[rng.integers(0, len(names), n_students)]
+
+
+def branch_queues(branches):
+    """{branch: [student index, ...]} largest branch first (ties by name), as tut01 sorts them."""
+    _, ordered = branch_codes(branches)
+    return {b: [i for i, x in enumerate(branches) if x == b] for b in ordered}
+
+
+def loop_branchwise(branches, n):
+    """The original round robin: one student of each branch in turn into the first group with room."""
+    x = math.ceil(len(branches) / n)
+    queues = branch_queues(branches)
+    groups = [[] for _ in range(n)]
+    while any(queues.values()):
+        for queue in queues.values():
+            if queue:
+                student = queue.pop(0)
+                next(g for g in groups if len(g) < x).append(student)
+    return groups
+
+
+def loop_uniform(branches, n):
+    """The original uniform mix: branch by branch, cut into consecutive groups of x."""
+    x = math.ceil(len(branches) / n)
+    students = [s for queue in branch_queues(branches).values() for s in queue]
+    return [students[i:i + x] for i in range(0, len(students), x)]
+
+
+def ids_of(groups, n_students):
+    ids = np.full(n_students, -1)
+    for g, members in enumerate(groups):
+        ids[members] = g
+    return ids
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_branchwise_matches_round_robin(seed):
+    branches = random_branches(seed)
+    n = int(np.random.default_rng(seed).integers(1, 40))
+    expected = ids_of(loop_branchwise(branches, n), len(branches))
+    assert branchwise_mix_ids(branches, n).tolist() == expected.tolist()
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_uniform_matches_consecutive_cut(seed):
+    branches = random_branches(seed)
+    n = int(np.random.default_rng(seed).integers(1, 40))
+    expected = ids_of(loop_uniform(branches, n), len(branches))
+    assert uniform_mix_ids(branches, n).tolist() == expected.tolist()
+
+
+def test_students_without_branch_get_no_group():
+    branches = np.array(["CS", None, "EE", "CS"], dtype=object)
+    assert branchwise_mix_ids(branches, 2).tolist() == [0, -1, 0, 1]
+    assert uniform_mix_ids(branches, 2).tolist() == [0, -1, 1, 0]
+
+
+def test_group_count_must_be_positive():
+    with pytest.raises(ValueError):
+        students_per_group(10, 0)
+
+
+def test_split_groups_keeps_empty_groups():
+    df = pd.DataFrame({"Roll": list("abcd")})
+    groups = split_groups(df, [2, 0, 2, 0], n_groups=4)
+    assert [g["Roll"].tolist() for g in groups] == [["b", "d"], [], ["a", "c"], []]
+
+
+def loop_counts(groups, branches, branch_names):
+    """The original per-group table: Group, then a manual count per branch name."""
+    rows = []
+    for g, members in enumerate(groups, start=1):
+        counts = {}
+        for b in branches[members]:
+            counts[b] = counts.get(b, 0) + 1
+        rows.append({"Group": f"Group{g}", **{b: counts.get(b, 0) for b in branch_names}})
+    return pd.DataFrame(rows, columns=["Group"] + branch_names)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_group_stats_match_manual_counts(seed):
+    branches = random_branches(seed)
+    n = int(np.random.default_rng(seed).integers(1, 20))
+    names = sorted(set(branches))
+    for loop, fn in [(loop_branchwise, branchwise_mix_ids), (loop_uniform, uniform_mix_ids)]:
+        groups = [g for g in loop(branches, n) if g]
+        ids = fn(branches, n)
+        stats = group_stats(branches, ids, int(ids.max()) + 1, names)
+        pd.testing.assert_frame_equal(stats, loop_counts(groups, branches, names), check_dtype=False)
+
+
+def test_ordered_roster_lists_branches_largest_first():
+    df = pd.DataFrame({"Roll": ["a", "b", "c", "d", "e"], "Branch": ["EE", "CS", None, "CS", "AI"]})
+    assert ordered_roster(df)["Roll"].tolist() == ["b", "d", "e", "a"]
+
+
+def test_assignment_zip_keeps_the_folder_layout():
+    df = pd.DataFrame({"Roll": ["a", "b", "c"], "Branch": ["CS", "EE", "CS"]})
+    branches = df["Branch"].to_numpy()
+    names = ["CS", "EE"]
+    ids = branchwise_mix_ids(branches, 2)
+    groups = split_groups(df, ids, 2)
+    stats = group_stats(branches, ids, 2, names)
+    data = build_assignment_zip(list(df.groupby("Branch")), groups, groups, stats, stats)
+
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        assert sorted(zipf.namelist()) == [
+            "branchwise_mix/group1.csv", "branchwise_mix/group2.csv", "final_groups.xlsx",
+            "student_groups/CS.csv", "student_groups/EE.csv",
+            "uniform_mix/group1.csv", "uniform_mix/group2.csv",
+        ]
+        assert pd.read_csv(zipf.open("student_groups/CS.csv"))["Roll"].tolist() == ["a", "c"]
+        sheets = pd.read_excel(io.BytesIO(zipf.read("final_groups.xlsx")), sheet_name=None)
+    assert list(sheets) == ["Branchwise_Mix", "Uniform_Mix"]
+    pd.testing.assert_frame_equal(sheets["Branchwise_Mix"], stats, check_dtype=False)
+
+
+def random_roster(seed, n_students=500):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Branch": np.array(["CS", "EE", "ME", "CE"])[rng.integers(0, 4, n_students)],
+        "Gender": np.array(["F", "M"])[rng.integers(0, 2, n_students)],
+        "CGPA": rng.uniform(5, 10, n_students).round(2),
+    })
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_stratified_groups_get_floor_or_ceil_of_every_stratum(seed):
+    df = random_roster(seed)
+    n = int(np.random.default_rng(seed).integers(1, 40))
+    columns = ["Branch", "Gender", "CGPA"]
+    ids, strata = stratified_group_ids(df, columns, n)
+
+    sizes = np.bincount(ids, minlength=n)
+    assert sizes.max() - sizes.min() <= 1
+    composite = strata.astype(str).agg("|".join, axis=1)
+    for key in [strata["Branch"], composite]:
+        counts = pd.crosstab(ids, key.to_numpy()).reindex(index=range(n), fill_value=0)
+        assert (counts.max() - counts.min()).max() <= 1
+
+    summary, counts_by_col = balance_stats(strata, ids, n)
+    assert summary["Size"].tolist() == sizes.tolist()
+    assert (summary["Branch max deviation"] < 1).all()
+    assert set(counts_by_col) == set(columns)
+    assert counts_by_col["CGPA"].shape[1] == 1 + 4  # Group + four CGPA bands
+
+
+def test_stratified_groups_reject_zero_groups():
+    with pytest.raises(ValueError):
+        stratified_group_ids(random_roster(0), ["Branch"], 0)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_sweep_matches_the_groups_each_n_would_produce(seed):
+    branches = random_branches(seed)
+    candidates = [1, 2, 3, 7, 13, 40]
+    sweep = sweep_group_counts(branches, candidates).set_index(["n", "Strategy"])
+    names = sorted(set(branches))
+    share = pd.Series(branches).value_counts().reindex(names).to_numpy() / len(branches)
+
+    for n in candidates:
+        for strategy, fn in [("Branchwise", branchwise_mix_ids), ("Uniform", uniform_mix_ids)]:
+            ids = fn(branches, n)
+            counts = pd.crosstab(ids, branches).reindex(columns=names, fill_value=0).to_numpy()
+            sizes = counts.sum(axis=1)
+            row = sweep.loc[(n, strategy)]
+            assert row["Groups"] == len(counts)
+            assert (row["Min size"], row["Max size"]) == (sizes.min(), sizes.max())
+            spread = (counts.max(axis=0) - counts.min(axis=0)).mean()
+            assert row["Branch spread"] == pytest.approx(spread, abs=0.005)
+            imbalance = np.abs(counts - sizes[:, None] * share).sum() / (2 * len(branches))
+            assert row["Imbalance"] == pytest.approx(imbalance, abs=5e-5)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_group_rows_follow_the_dealing_order(seed):
+    branches = random_branches(seed)
+    n = int(np.random.default_rng(seed).integers(1, 20))
+    students = ordered_roster(pd.DataFrame({"Roll": [f"r{i}" for i in range(len(branches))], "Branch": branches}))
+    rolls = students["Roll"].to_numpy()
+    b = students["Branch"].to_numpy()
+
+    branchwise = split_groups(students, branchwise_mix_ids(b, n), n, positions=branchwise_positions(b))
+    assert [g["Roll"].tolist() for g in branchwise] == [rolls[g].tolist() for g in loop_branchwise(b, n)]
+    uniform_ids = uniform_mix_ids(b, n)
+    uniform = split_groups(students, uniform_ids, int(uniform_ids.max()) + 1)
+    assert [g["Roll"].tolist() for g in uniform] == [rolls[g].tolist() for g in loop_uniform(b, n)]
+
+
+def test_parse_rolls_splits_long_and_short_rolls():
+    parsed = parse_rolls(pd.Series([" 2511AI07", "CS123", None, "2511AI07"]))
+    assert parsed["Roll"].tolist()[:2] == ["2511AI07", "CS123"]
+    assert parsed["Branch"].astype(object).tolist()[:2] == ["AI", "CS"]
+    assert parsed["Year"].tolist()[0] == 25 and pd.isna(parsed["Year"][1])
+    assert parsed["Serial"].tolist()[0] == 7
+    assert parsed.iloc[2].isna().all()
+    assert parsed.iloc[3].equals(parsed.iloc[0].rename(3))
@@ -0,0 +1,14 @@
+#file with the tests of the Streamlit page (tut01.py), run headless through AppTest
+import os
+
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_group_count_starts_at_one():
+    at = AppTest.from_file(os.path.join(ROOT, "tut01.py")).run()
+    assert not at.exception
+    num = at.number_input[0]
+    assert num.min == 1 and num.value == 1
+    assert num.set_value(0).run().number_input[0].value == 1  # clamped, never 0
@@ -1,7 +1,15 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+import hashlib
+import io
 import logging
 from datetime import datetime
+from matching import (
+    preference_ranks, priority_order, default_capacity,
+    serial_dictatorship, min_cost_assignment, choice_histogram, AuctionBudgetExceeded,
+)
+from ingest import read_preferences
 
 # Configure logging
 logging.basicConfig(
@@ -25,7 +33,7 @@ def count_faculty_columns(df, cgpa_col='CGPA'):
         logger.error(f"Error counting faculty columns: {str(e)}")
         raise
 
-def allocate_students(df, cgpa_col='CGPA'):
+def allocate_students(df, cgpa_col='CGPA', faculty_cols=None):
     """
     Allocate students to faculties using mod n algorithm:
     1. Sort students by CGPA (descending)
@@ -37,29 +45,18 @@ def allocate_students(df, cgpa_col='CGPA'):
         df_sorted = df.sort_values(by=cgpa_col, ascending=False).reset_index(drop=True)
         logger.info(f"Sorted {len(df_sorted)} students by CGPA (descending)")
 
-        # Get faculty columns dynamically
-        faculty_cols = count_faculty_columns(df_sorted, cgpa_col)
+        # Get faculty columns dynamically (unless the caller already has them)
+        if faculty_cols is None:
+            faculty_cols = count_faculty_columns(df_sorted, cgpa_col)
         n_faculties = len(faculty_cols)
-
-        allocations = []
+        if n_faculties == 0:
+            raise ValueError(f"No faculty columns found after '{cgpa_col}'")
 
         # Allocate: i-th student (after sorting) gets faculty at position (i mod n)
-        for i in range(len(df_sorted)):
-            row = df_sorted.iloc[i]
-
-            # Faculty column index based on mod n
-            fac_index = i % n_faculties
-            allocated_faculty = faculty_cols[fac_index]
-
-            allocations.append({
-                'Roll': row['Roll'],
-                'Name': row['Name'],
-                'Email': row['Email'],
-                'CGPA': row['CGPA'],
-                'Allocated': allocated_faculty
-            })
-
-        alloc_df = pd.DataFrame(allocations)
+        alloc_df = df_sorted[['Roll', 'Name', 'Email', 'CGPA']].copy()
+        fac_index = np.arange(len(df_sorted)) % n_faculties
+        alloc_df['Allocated'] = np.asarray(faculty_cols, dtype=object)[fac_index]
+
         logger.info(f"Successfully allocated {len(alloc_df)} students")
         return alloc_df
 
@@ -67,33 +64,76 @@ def allocate_students(df, cgpa_col='CGPA'):
         logger.error(f"Error in allocation: {str(e)}")
         raise
 
-def compute_faculty_preference_stats(df, cgpa_col='CGPA'):
+ROUND_ROBIN = "Round-robin (mod n)"
+SERIAL_DICTATORSHIP = "Preferences: CGPA-priority serial dictatorship"
+MIN_COST = "Preferences: minimum total rank"
+MIN_COST_TIME_BUDGET = 10.0  # seconds before the min-cost auction falls back to serial dictatorship
+
+def allocate_by_preference(df, faculty_cols, method=SERIAL_DICTATORSHIP, capacity=None, cgpa_col='CGPA',
+                           ranks=None, time_budget=MIN_COST_TIME_BUDGET):
+    """
+    Allocate students using their preference ranks under per-faculty capacity limits.
+    ranks: precomputed students x faculties rank matrix (default: read from df[faculty_cols])
+    time_budget: seconds allowed for MIN_COST; past it the allocation falls back to SERIAL_DICTATORSHIP
+    Returns (allocation DataFrame sorted by CGPA with the rank each student got, choice histogram,
+             the method actually used)
+    """
+    try:
+        if ranks is None:
+            ranks = preference_ranks(df, faculty_cols)
+        order = priority_order(df, cgpa_col)
+        if capacity is None:
+            capacity = default_capacity(len(df), len(faculty_cols))
+        capacity = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (len(faculty_cols),))
+
+        assigned = None
+        if method == MIN_COST:
+            try:
+                assigned = min_cost_assignment(ranks, capacity, time_budget=time_budget)
+            except AuctionBudgetExceeded as e:
+                logger.warning(f"{e}; falling back to {SERIAL_DICTATORSHIP}")
+                method = SERIAL_DICTATORSHIP
+        if assigned is None:
+            assigned = serial_dictatorship(ranks, order, capacity)
+
+        alloc_df = df[['Roll', 'Name', 'Email', 'CGPA']].iloc[order].reset_index(drop=True)
+        alloc_df['Allocated'] = np.asarray(faculty_cols, dtype=object)[assigned[order]]
+        alloc_df['Choice'] = ranks[order, assigned[order]]
+
+        logger.info(f"Allocated {len(alloc_df)} students by preference ({method})")
+        return alloc_df, choice_histogram(ranks, assigned), method
+
+    except Exception as e:
+        logger.error(f"Error in preference allocation: {str(e)}")
+        raise
+
+def compute_faculty_preference_stats(df, cgpa_col='CGPA', faculty_cols=None):
     """
     Compute statistics of how many times each faculty was selected at each preference level (1-n)
     """
     try:
-        faculty_cols = count_faculty_columns(df, cgpa_col)
+        if faculty_cols is None:
+            faculty_cols = count_faculty_columns(df, cgpa_col)
         n_faculties = len(faculty_cols)
 
-        # Initialize statistics dictionary
-        pref_stats = {}
-        for fac in faculty_cols:
-            pref_stats[fac] = {i: 0 for i in range(1, n_faculties + 1)}
+        # Preference matrix (students x faculties); non-numeric cells become NaN
+        prefs = df[faculty_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        prefs = np.trunc(prefs)
+        valid = np.isfinite(prefs) & (prefs >= 1) & (prefs <= n_faculties)
 
-        # Count preferences
-        for _, row in df.iterrows():
-            for fac in faculty_cols:
-                try:
-                    pref_value = int(row[fac])
-                    if 1 <= pref_value <= n_faculties:
-                        pref_stats[fac][pref_value] += 1
-                except Exception as e:
-                    logger.warning(f"Invalid preference value for faculty {fac}: {row[fac]}")
+        n_invalid = int(prefs.size - valid.sum())
+        if n_invalid:
+            logger.warning(f"Ignored {n_invalid} invalid preference values")
+
+        # One histogram over (faculty, preference) pairs
+        fac_idx = np.broadcast_to(np.arange(n_faculties), prefs.shape)[valid]
+        pref_idx = prefs[valid].astype(np.int64) - 1
+        counts = np.bincount(fac_idx * n_faculties + pref_idx, minlength=n_faculties * n_faculties)
 
         # Create DataFrame
-        pref_df = pd.DataFrame(pref_stats).T
-        pref_df.columns = [f'Count Pref {i}' for i in range(1, n_faculties + 1)]
-        pref_df.index.name = 'Fac'
+        pref_df = pd.DataFrame(counts.reshape(n_faculties, n_faculties),
+                               index=pd.Index(faculty_cols, name='Fac'),
+                               columns=[f'Count Pref {i}' for i in range(1, n_faculties + 1)])
         pref_df = pref_df.reset_index()
 
         logger.info("Successfully computed faculty preference statistics")
@@ -103,6 +143,43 @@ def compute_faculty_preference_stats(df, cgpa_col='CGPA'):
         logger.error(f"Error computing preference stats: {str(e)}")
         raise
 
+# Cached computation: keyed by the SHA-256 of the uploaded bytes, so reruns triggered by
+# downloads or widget changes never re-parse or re-allocate the same file.
+MAX_CACHED_FILES = 4      # parsed inputs kept (LRU eviction)
+MAX_CACHED_RESULTS = 16   # (file, method, capacity) results kept (LRU eviction)
+
+def file_digest(data):
+    """SHA-256 of the uploaded file contents, used as the cache key"""
+    return hashlib.sha256(data).hexdigest()
+
+@st.cache_resource(max_entries=MAX_CACHED_FILES, show_spinner=False)
+def load_preferences(digest, _data):
+    """Parse the upload once per file hash (shared, read-only PreferenceData)"""
+    logger.info(f"Parsing upload {digest[:12]}")
+    return read_preferences(io.BytesIO(_data))
+
+@st.cache_data(max_entries=MAX_CACHED_RESULTS, show_spinner=False)
+def compute_results(digest, method, capacity, _data):
+    """
+    Run the allocation once per (file hash, method, capacity).
+    Returns (allocation_df, pref_stats_df, choice_df or None, allocation CSV bytes, stats CSV bytes,
+             method actually used)
+    """
+    prefs = load_preferences(digest, _data)
+    choice_df = None
+    used = method
+    if method == ROUND_ROBIN:
+        allocation_df = allocate_students(prefs.info, faculty_cols=prefs.faculty_cols)
+    else:
+        allocation_df, choice_df, used = allocate_by_preference(
+            prefs.info, prefs.faculty_cols, method=method, capacity=capacity,
+            ranks=prefs.rank_matrix())
+    pref_stats_df = prefs.stats_frame()
+    logger.info(f"Computed results for {digest[:12]} ({used}, capacity={capacity})")
+    return (allocation_df, pref_stats_df, choice_df,
+            allocation_df.to_csv(index=False).encode('utf-8'),
+            pref_stats_df.to_csv(index=False).encode('utf-8'), used)
+
 # Streamlit UI
 st.set_page_config(page_title="BTP/MTP Faculty Allocation", layout="wide")
 
@@ -111,7 +188,7 @@ st.markdown("""
 This application allocates students to faculties based on:
 - **Dynamic faculty detection**
 - **CGPA sorted in (descending order)**
-- **Round-robin Allocation**
+- **Round-robin Allocation**, or **preference-based allocation** with per-faculty capacity
 """)
 
 st.divider()
@@ -125,23 +202,45 @@ uploaded_file = st.file_uploader(
 
 if uploaded_file is not None:
     try:
-        # Read the input file
-        input_df = pd.read_csv(uploaded_file)
-        logger.info(f"File uploaded: {uploaded_file.name}, Shape: {input_df.shape}")
+        # Read the input file in chunks (compact integer ranks), once per file contents
+        data = uploaded_file.getvalue()
+        digest = file_digest(data)
+        prefs = load_preferences(digest, data)
+        faculty_cols = prefs.faculty_cols
+        if st.session_state.get("upload_digest") != digest:
+            st.session_state["upload_digest"] = digest
+            logger.info(f"File uploaded: {uploaded_file.name}, Shape: ({len(prefs)}, {len(faculty_cols) + 4}), "
+                        f"in memory: {prefs.memory_bytes() / 1e6:.1f} MB")
+            if prefs.n_invalid:
+                logger.warning(f"Ignored {prefs.n_invalid} invalid preference values")
 
         st.success(f"File uploaded successfully!")
 
         # Display input data preview
         with st.expander("Visualize Student Preferences"):
-            st.dataframe(input_df.head(10))
-
-        # Process button
+            st.dataframe(pd.read_csv(io.BytesIO(data), nrows=10))
+
+        method = st.radio("Allocation method", [ROUND_ROBIN, SERIAL_DICTATORSHIP, MIN_COST],
+                          help=f"Minimum total rank is optimal but slow when most students rank the "
+                               f"faculties alike; after {MIN_COST_TIME_BUDGET:g}s it falls back to "
+                               f"serial dictatorship.")
+        capacity = None
+        if method != ROUND_ROBIN:
+            capacity = st.number_input("Max students per faculty", min_value=1,
+                                       value=int(default_capacity(len(prefs), max(1, len(faculty_cols)))[0]))
+
+        # Process button: remember which results are on screen, so the download reruns keep them
+        run_key = (digest, method, None if capacity is None else int(capacity))
         if st.button("Initialize allocation", type="primary"):
+            st.session_state["results_key"] = run_key
+
+        if st.session_state.get("results_key") == run_key:
             with st.spinner("Processing allocation..."):
                 try:
-                    # Perform allocation
-                    allocation_df = allocate_students(input_df)
-                    pref_stats_df = compute_faculty_preference_stats(input_df)
+                    allocation_df, pref_stats_df, choice_df, csv1, csv2, used = compute_results(*run_key, data)
+                    if used != method:
+                        st.warning(f"{method} did not finish within {MIN_COST_TIME_BUDGET:g}s "
+                                   f"(preference lists too similar); showing {used} instead.")
 
                     # st.divider()
                     # st.subheader("Summary Statistics")
@@ -150,12 +249,16 @@ if uploaded_file is not None:
                     with col_a:
                         st.metric("Number of Students", len(allocation_df))
                     with col_b:
-                        st.metric("Number of Faculties", len(count_faculty_columns(input_df)))
+                        st.metric("Number of Faculties", len(faculty_cols))
                     with col_c:
                         st.metric("Average CGPA", f"{allocation_df['CGPA'].mean():.2f}")
 
                     st.success("Allocation completed successfully!")
 
+                    if choice_df is not None:
+                        st.subheader("Students by preference received")
+                        st.dataframe(choice_df, hide_index=True)
+
                     # Display results
                     col1, col2 = st.columns(2)
 
@@ -164,7 +267,6 @@ if uploaded_file is not None:
                         # st.dataframe(allocation_df, height=400)
 
                         # Download allocation
-                        csv1 = allocation_df.to_csv(index=False).encode('utf-8')
                         st.download_button(
                             label="Download Allocation CSV",
                             data=csv1,
@@ -178,7 +280,6 @@ if uploaded_file is not None:
                         # st.dataframe(pref_stats_df, height=400)
 
                         # Download stats
-                        csv2 = pref_stats_df.to_csv(index=False).encode('utf-8')
                         st.download_button(
                             label="Download Statistics CSV",
                             data=csv2,
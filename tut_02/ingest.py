@@ -0,0 +1,115 @@
+#file for typed, chunked reading of large preference CSVs
+import numpy as np
+import pandas as pd
+
+INFO_COLS = ['Roll', 'Name', 'Email']
+
+
+def normalize_rolls(values):
+    """Rolls as stripped strings in one vectorized pass (missing values stay NaN);
+       same rule as the seating tool's final_project/roster.py.
+    """
+    rolls = pd.Series(values).reset_index(drop=True)
+    if rolls.dtype != object:
+        rolls = rolls.astype(object)
+    mask = rolls.notna()
+    rolls[mask] = rolls[mask].astype(str).str.strip()
+    return rolls
+
+
+class PreferenceData:
+    """Compact in-memory form of a preference file.
+       - info: Roll, Name, Email, CGPA (float32) per student
+       - ranks: students x faculties preference ranks (uint8/uint16, 0 = invalid or missing)
+       - faculty_cols: faculty names in file order
+       - pref_counts: faculties x preference levels histogram, accumulated while reading
+       - n_invalid: number of preference cells that were not a rank in 1..n_faculties
+    """
+
+    def __init__(self, info, ranks, faculty_cols, pref_counts, n_invalid):
+        self.info = info
+        self.ranks = ranks
+        self.faculty_cols = faculty_cols
+        self.pref_counts = pref_counts
+        self.n_invalid = n_invalid
+
+    def __len__(self):
+        return len(self.info)
+
+    def rank_matrix(self):
+        """Ranks as used by the matching engines (invalid -> n_faculties + 1)."""
+        n_faculties = len(self.faculty_cols)
+        return np.where(self.ranks == 0, n_faculties + 1, self.ranks).astype(np.int32)
+
+    def stats_frame(self):
+        """Same table as compute_faculty_preference_stats: Fac, Count Pref 1..n."""
+        n_faculties = len(self.faculty_cols)
+        pref_df = pd.DataFrame(self.pref_counts,
+                               index=pd.Index(self.faculty_cols, name='Fac'),
+                               columns=[f'Count Pref {i}' for i in range(1, n_faculties + 1)])
+        return pref_df.reset_index()
+
+    def memory_bytes(self):
+        return int(self.info.memory_usage(deep=True).sum() + self.ranks.nbytes + self.pref_counts.nbytes)
+
+
+def _rank_dtype(n_faculties):
+    return np.uint8 if n_faculties < np.iinfo(np.uint8).max else np.uint16
+
+
+def read_preferences(source, cgpa_col='CGPA', chunksize=5000):
+    """Read a preference CSV in chunks of `chunksize` rows.
+       Faculty columns (everything after `cgpa_col`) are stored as small unsigned
+       integers and the preference histogram is accumulated chunk by chunk, so the
+       full file is never held as an inferred-dtype DataFrame.
+       `source` is a path or a seekable file object (e.g. a Streamlit upload).
+    """
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    header = pd.read_csv(source, nrows=0).columns.tolist()
+    if cgpa_col not in header:
+        raise ValueError(f"Column '{cgpa_col}' not found in the preference file")
+    faculty_cols = header[header.index(cgpa_col) + 1:]
+    n_faculties = len(faculty_cols)
+    rank_dtype = _rank_dtype(n_faculties)
+    keep_cols = [c for c in INFO_COLS if c in header] + [cgpa_col] + faculty_cols
+
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    reader = pd.read_csv(
+        source,
+        usecols=keep_cols,
+        dtype={c: str for c in INFO_COLS if c in header},
+        chunksize=chunksize,
+    )
+
+    info_parts, rank_parts = [], []
+    pref_counts = np.zeros(n_faculties * n_faculties, dtype=np.int64)
+    n_invalid = 0
+    fac_index = np.arange(n_faculties)
+    for chunk in reader:
+        prefs = chunk[faculty_cols].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float32)
+        prefs = np.trunc(prefs)
+        valid = np.isfinite(prefs) & (prefs >= 1) & (prefs <= n_faculties)
+        n_invalid += int(prefs.size - valid.sum())
+
+        fac_idx = np.broadcast_to(fac_index, prefs.shape)[valid]
+        pref_counts += np.bincount(fac_idx * n_faculties + prefs[valid].astype(np.int64) - 1,
+                                   minlength=n_faculties * n_faculties)
+        rank_parts.append(np.where(valid, prefs, 0).astype(rank_dtype))
+
+        info = chunk[[c for c in INFO_COLS if c in chunk.columns]].copy()
+        if 'Roll' in info.columns:
+            info['Roll'] = normalize_rolls(info['Roll']).to_numpy()
+        info['CGPA'] = pd.to_numeric(chunk[cgpa_col], errors='coerce').astype(np.float32)
+        info_parts.append(info)
+
+    if info_parts:
+        info = pd.concat(info_parts, ignore_index=True)
+        ranks = np.concatenate(rank_parts)
+    else:
+        info = pd.DataFrame(columns=INFO_COLS + ['CGPA'])
+        ranks = np.zeros((0, n_faculties), dtype=rank_dtype)
+
+    return PreferenceData(info, ranks, faculty_cols,
+                          pref_counts.reshape(n_faculties, n_faculties), n_invalid)
@@ -0,0 +1,24 @@
+#file with the pytest setup: app.py lives in tut_02/, next to this folder
+import importlib
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SAMPLE_INPUT = os.path.join(ROOT, "input_btp_mtp_allocation.csv")
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    """app.py imported once. Importing it builds the Streamlit page (bare mode, no server)
+       and opens app.log in the working directory, so that happens in a scratch folder.
+    """
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        return importlib.import_module("app")
+    finally:
+        os.chdir(cwd)
@@ -0,0 +1,98 @@
+#file with the tests of the allocation helpers in app.py against the original per-row loops
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SAMPLE_INPUT
+
+
+def loop_allocate(df, faculty_cols):
+    """The original allocation: sort by CGPA, i-th student gets faculty i mod n."""
+    df_sorted = df.sort_values(by="CGPA", ascending=False).reset_index(drop=True)
+    rows = []
+    for i in range(len(df_sorted)):
+        row = df_sorted.iloc[i]
+        rows.append({"Roll": row["Roll"], "Name": row["Name"], "Email": row["Email"],
+                     "CGPA": row["CGPA"], "Allocated": faculty_cols[i % len(faculty_cols)]})
+    return pd.DataFrame(rows)
+
+
+def loop_preference_stats(df, faculty_cols):
+    """The original histogram: one int() per cell, out-of-range and invalid cells skipped."""
+    n = len(faculty_cols)
+    stats = {fac: {i: 0 for i in range(1, n + 1)} for fac in faculty_cols}
+    for _, row in df.iterrows():
+        for fac in faculty_cols:
+            try:
+                value = int(row[fac])
+                if 1 <= value <= n:
+                    stats[fac][value] += 1
+            except Exception:
+                pass
+    out = pd.DataFrame(stats).T
+    out.columns = [f"Count Pref {i}" for i in range(1, n + 1)]
+    out.index.name = "Fac"
+    return out.reset_index()
+
+
+@pytest.fixture
+def sample():
+    return pd.read_csv(SAMPLE_INPUT)
+
+
+def test_allocation_matches_the_row_loop(app, sample):
+    faculty_cols = app.count_faculty_columns(sample)
+    assert faculty_cols[0] == "ABM" and len(faculty_cols) == 18
+    pd.testing.assert_frame_equal(app.allocate_students(sample), loop_allocate(sample, faculty_cols))
+
+
+def test_allocation_without_faculty_columns_fails(app, sample):
+    with pytest.raises(ValueError):
+        app.allocate_students(sample[["Roll", "Name", "Email", "CGPA"]])
+
+
+def test_preference_stats_match_the_cell_loop(app, sample):
+    faculty_cols = app.count_faculty_columns(sample)
+    pd.testing.assert_frame_equal(app.compute_faculty_preference_stats(sample),
+                                  loop_preference_stats(sample, faculty_cols), check_dtype=False)
+
+
+def test_preference_stats_skip_invalid_cells(app, sample, caplog):
+    messy = sample.head(30).astype({"ABM": object, "AE": object})
+    messy.loc[0, "ABM"] = "x"
+    messy.loc[1, "ABM"] = np.nan
+    messy.loc[2, "AE"] = 99
+    messy.loc[3, "AE"] = 0
+    faculty_cols = app.count_faculty_columns(messy)
+    pd.testing.assert_frame_equal(app.compute_faculty_preference_stats(messy),
+                                  loop_preference_stats(messy, faculty_cols), check_dtype=False)
+    assert "Ignored 4 invalid preference values" in caplog.text
+
+
+def test_results_are_cached_per_file_contents(app):
+    with open(SAMPLE_INPUT, "rb") as f:
+        data = f.read()
+    digest = app.file_digest(data)
+    assert digest == app.file_digest(bytes(data)) != app.file_digest(data + b"\n")
+
+    prefs = app.load_preferences(digest, data)
+    assert app.load_preferences(digest, data) is prefs  # parsed once, shared between reruns
+
+    for method in [app.ROUND_ROBIN, app.SERIAL_DICTATORSHIP]:
+        first = app.compute_results(digest, method, None, data)
+        again = app.compute_results(digest, method, None, data)
+        pd.testing.assert_frame_equal(first[0], again[0])
+        assert first[3] == again[3] == first[0].to_csv(index=False).encode("utf-8")
+
+
+def test_min_cost_falls_back_to_serial_dictatorship(app, sample, caplog):
+    faculty_cols = app.count_faculty_columns(sample)
+    serial, _, used = app.allocate_by_preference(sample, faculty_cols, method=app.SERIAL_DICTATORSHIP)
+    assert used == app.SERIAL_DICTATORSHIP
+    fallback, _, used = app.allocate_by_preference(sample, faculty_cols, method=app.MIN_COST, time_budget=0)
+    assert used == app.SERIAL_DICTATORSHIP
+    pd.testing.assert_frame_equal(fallback, serial)
+    assert "falling back" in caplog.text
+
+    _, _, used = app.allocate_by_preference(sample, faculty_cols, method=app.MIN_COST)
+    assert used == app.MIN_COST
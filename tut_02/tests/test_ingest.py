@@ -0,0 +1,39 @@
+#file with the tests of the chunked preference reader (ingest.py) against a plain read_csv
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import SAMPLE_INPUT
+from ingest import read_preferences
+from matching import preference_ranks
+
+
+@pytest.mark.parametrize("chunksize", [1, 7, 5000])
+def test_chunked_read_matches_a_plain_read(app, chunksize):
+    df = pd.read_csv(SAMPLE_INPUT)
+    faculty_cols = app.count_faculty_columns(df)
+    data = read_preferences(SAMPLE_INPUT, chunksize=chunksize)
+
+    assert len(data) == len(df) and data.faculty_cols == faculty_cols
+    assert data.ranks.dtype == np.uint8 and data.n_invalid == 0
+    assert data.rank_matrix().tolist() == preference_ranks(df, faculty_cols).tolist()
+    pd.testing.assert_frame_equal(data.stats_frame(), app.compute_faculty_preference_stats(df), check_dtype=False)
+    assert data.info["Roll"].tolist() == df["Roll"].tolist()
+    np.testing.assert_allclose(data.info["CGPA"], df["CGPA"], rtol=1e-6)
+
+
+def test_invalid_cells_and_uploads():
+    upload = io.BytesIO(b"Roll,Name,Email,CGPA,A,B\n r1 ,n1,e1,8.5,1,x\nr2,n2,e2,7.0,2,1\nr3,n3,e3,9.0,,3\n")
+    upload.read()  # a Streamlit upload may already have been read
+    data = read_preferences(upload, chunksize=2)
+    assert data.info["Roll"].tolist() == ["r1", "r2", "r3"]  # rolls are stripped
+    assert data.ranks.tolist() == [[1, 0], [2, 1], [0, 0]]
+    assert data.n_invalid == 3
+    assert data.pref_counts.tolist() == [[1, 1], [1, 0]]
+
+
+def test_missing_cgpa_column():
+    with pytest.raises(ValueError):
+        read_preferences(io.BytesIO(b"Roll,Name,A\nr1,n1,1\n"))
@@ -0,0 +1,78 @@
+#file with the tests of the preference engines (matching.py) against plain loops and a reference solver
+import numpy as np
+import pandas as pd
+import pytest
+
+from matching import (
+    AuctionBudgetExceeded, choice_histogram, default_capacity, min_cost_assignment, mod_n_assignment,
+    preference_ranks, priority_order, serial_dictatorship,
+)
+
+
+def random_instance(seed):
+    rng = np.random.default_rng(seed)
+    n_students, n_faculties = int(rng.integers(1, 40)), int(rng.integers(1, 8))
+    ranks = (np.argsort(rng.random((n_students, n_faculties)), axis=1) + 1).astype(np.int32)
+    capacity = rng.integers(0, n_students, n_faculties)
+    capacity[0] += n_students - min(capacity.sum(), n_students)  # enough seats in total
+    order = np.argsort(-rng.uniform(5, 10, n_students), kind="stable")
+    return ranks, capacity, order
+
+
+def loop_serial_dictatorship(ranks, order, capacity):
+    """Each student in turn takes their best-ranked faculty that still has a seat."""
+    remaining = list(capacity)
+    assigned = [None] * len(ranks)
+    for i in order:
+        open_faculties = [j for j in range(ranks.shape[1]) if remaining[j] > 0]
+        j = min(open_faculties, key=lambda f: (ranks[i][f], f))
+        assigned[i] = j
+        remaining[j] -= 1
+    return np.array(assigned)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_serial_dictatorship_matches_the_loop(seed):
+    ranks, capacity, order = random_instance(seed)
+    assert serial_dictatorship(ranks, order, capacity).tolist() == \
+        loop_serial_dictatorship(ranks, order, capacity).tolist()
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_min_cost_is_optimal(seed):
+    optimize = pytest.importorskip("scipy.optimize")
+    ranks, capacity, _ = random_instance(seed)
+    assigned = min_cost_assignment(ranks, capacity)
+
+    assert (np.bincount(assigned, minlength=len(capacity)) <= capacity).all()
+    # reference: one column per seat, solved as a plain linear assignment
+    seats = np.repeat(np.arange(len(capacity)), capacity)
+    rows, cols = optimize.linear_sum_assignment(ranks[:, seats])
+    best = ranks[rows, seats[cols]].sum()
+    assert ranks[np.arange(len(ranks)), assigned].sum() == best
+
+
+def test_engines_need_enough_seats():
+    ranks = np.ones((3, 2), dtype=np.int32)
+    for fn in [lambda: serial_dictatorship(ranks, np.arange(3), [1, 1]), lambda: min_cost_assignment(ranks, [1, 1])]:
+        with pytest.raises(ValueError):
+            fn()
+
+
+def test_ranks_order_and_histogram():
+    df = pd.DataFrame({"CGPA": [7.0, 9.5, 8.0], "A": [1, 2, "x"], "B": [2, 1, 9]})
+    ranks = preference_ranks(df, ["A", "B"])
+    assert ranks.tolist() == [[1, 2], [2, 1], [3, 3]]  # invalid cells rank after every real choice
+    order = priority_order(df)
+    assert order.tolist() == [1, 2, 0]
+    assert mod_n_assignment(order, 2).tolist() == [0, 0, 1]
+    assert default_capacity(3, 2).tolist() == [2, 2]
+
+    hist = choice_histogram(ranks, np.array([0, 1, 0]))
+    assert hist.to_dict("list") == {"Choice": [1, 3], "Students": [2, 1]}
+
+
+def test_min_cost_stops_at_its_time_budget():
+    ranks = np.tile(np.arange(1, 31, dtype=np.int32), (600, 1))  # everybody ranks the faculties alike
+    with pytest.raises(AuctionBudgetExceeded):
+        min_cost_assignment(ranks, default_capacity(600, 30), time_budget=0)